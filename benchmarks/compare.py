@@ -0,0 +1,72 @@
+"""Compare two benchmark result files.
+
+Reports the change of every scenario's wall time and worst event loop lag
+and exits with status 1 if any of them regressed by more than the
+threshold::
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+METRICS = ("seconds", "loop_lag_max_ms")
+# Ignore changes below these absolute values, which are mostly noise
+NOISE_FLOOR = {"seconds": 0.005, "loop_lag_max_ms": 5.0}
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[tuple[str, str, float, float, bool]]:
+    """Return ``(scenario, metric, baseline, current, regressed)`` rows."""
+    rows = []
+    for scenario, result in current["results"].items():
+        previous = baseline["results"].get(scenario)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            old = previous.get(metric)
+            new = result.get(metric)
+            if old is None or new is None:
+                continue
+            regressed = (
+                new - old > NOISE_FLOOR[metric] and new > old * (1 + threshold)
+            )
+            rows.append((scenario, metric, old, new, regressed))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Compare result files from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative increase counted as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    if baseline.get("parameters") != current.get("parameters"):
+        print("Warning: the runs used different parameters")
+
+    rows = compare(baseline, current, args.threshold)
+    for scenario, metric, old, new, regressed in rows:
+        change = (new - old) / old * 100 if old else 0.0
+        print(
+            "%-18s %-16s %10.3f -> %10.3f %+7.1f%%%s"
+            % (scenario, metric, old, new, change, "  REGRESSION" if regressed else "")
+        )
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""Run the offline benchmark suite.
+
+Synthetic repositories are generated in a temporary directory and served
+by a local stand-in for GitHub, so the whole install, list and remove
+pipeline runs without network access::
+
+    python -m benchmarks.run --languages 10 --models 50 --output results.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import resource
+import sys
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+from custom_components.wakeword_installer import install_state, response_cache
+from custom_components.wakeword_installer.loop_monitor import LoopLagMonitor
+from custom_components.wakeword_installer.repository_manager import RepositoryManager
+
+from .server import FakeGitHub
+from .synthetic import (
+    SyntheticRepository,
+    generate_repository,
+    parse_size_distribution,
+)
+
+RESULTS_SCHEMA = 1
+MANAGER_MODULE = "custom_components.wakeword_installer.repository_manager"
+MANIFEST = (
+    Path(__file__).parent.parent
+    / "custom_components"
+    / "wakeword_installer"
+    / "manifest.json"
+)
+
+
+class BenchmarkHass:
+    """The parts of Home Assistant the repository manager uses."""
+
+    def __init__(self) -> None:
+        """Initialize the stand-in."""
+        self.data: dict[str, Any] = {}
+
+    async def async_add_executor_job(
+        self, target: Callable[..., Any], *args: Any
+    ) -> Any:
+        """Run a function in the default executor."""
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+
+class MemoryStore:
+    """Storage helper that keeps data in memory instead of ``.storage``."""
+
+    def __init__(self, hass: Any, version: int, key: str) -> None:
+        """Initialize the store."""
+        self._data_func: Callable[[], Any] | None = None
+
+    async def async_load(self) -> Any:
+        """Return the saved data."""
+        return self._data_func() if self._data_func else None
+
+    def async_delay_save(self, data_func: Callable[[], Any], delay: float = 0) -> None:
+        """Remember the data to save."""
+        self._data_func = data_func
+
+    async def async_save(self, data: Any) -> None:
+        """Keep the saved data."""
+        self._data_func = lambda: data
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of the process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _installed_usage(install_path: Path) -> tuple[int, int]:
+    """Return the number and total size of installed models."""
+    sizes = [path.stat().st_size for path in install_path.glob("*.tflite")]
+    return len(sizes), sum(sizes)
+
+
+async def _measure(func: Callable[[], Awaitable[Any]]) -> dict[str, Any]:
+    """Run a coroutine and return its wall time, CPU time, loop lag and RSS."""
+    async with LoopLagMonitor(keep_samples=True) as monitor:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        result = await func()
+        seconds = time.perf_counter() - started
+        cpu_seconds = time.process_time() - cpu_started
+    return {
+        "result": result,
+        "seconds": seconds,
+        "cpu_seconds": cpu_seconds,
+        **monitor.summary(),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def _bench_install(
+    install_path: Path,
+    repo: SyntheticRepository,
+    languages: list[str],
+    server: FakeGitHub,
+) -> dict[str, Any]:
+    """Install languages of a repository into an empty directory."""
+    manager = RepositoryManager(BenchmarkHass())
+    requests = server.requests
+    served = server.bytes_served
+    try:
+        with patch("%s.WAKEWORD_INSTALL_PATH" % MANAGER_MODULE, str(install_path)):
+            result = await _measure(
+                lambda: manager.install_wakewords(repo.url, languages, repo.name)
+            )
+            result.pop("result")
+            files, written = _installed_usage(install_path)
+            result.update(
+                languages=len(languages),
+                files=files,
+                bytes_written=written,
+                bytes_served=server.bytes_served - served,
+                requests=server.requests - requests,
+                megabytes_per_second=written / result["seconds"] / 1e6,
+            )
+            stats = manager.last_download_stats
+            if stats is not None:
+                result["last_download"] = {
+                    **stats._asdict(),
+                    "megabytes_per_second": stats.megabytes_per_second,
+                    "cpu_ms_per_megabyte": stats.cpu_ms_per_megabyte,
+                }
+
+            reinstall = await _measure(
+                lambda: manager.install_wakewords(repo.url, languages, repo.name)
+            )
+            result["reinstall_up_to_date_seconds"] = reinstall["seconds"]
+    finally:
+        await manager.close()
+    return result
+
+
+async def _bench_index(
+    install_path: Path, repo: SyntheticRepository, server: FakeGitHub
+) -> dict[str, dict[str, Any]]:
+    """Measure listing and removing over a directory with many models."""
+    results = {
+        "install_many": await _bench_install(
+            install_path, repo, repo.languages, server
+        )
+    }
+
+    # A new manager has no index yet and builds it from the directory
+    manager = RepositoryManager(BenchmarkHass())
+    try:
+        with patch("%s.WAKEWORD_INSTALL_PATH" % MANAGER_MODULE, str(install_path)):
+            for name, func in (
+                ("list_cold", manager.get_installed_wakewords),
+                ("list_warm", manager.get_installed_wakewords),
+                (
+                    "remove_language",
+                    lambda: manager.remove_wakewords(repo.name, repo.languages[:1]),
+                ),
+                (
+                    "remove_repository",
+                    lambda: manager.remove_repository_wakewords(repo.name),
+                ),
+            ):
+                files, _ = _installed_usage(install_path)
+                result = await _measure(func)
+                result.pop("result")
+                result["files"] = files
+                results[name] = result
+    finally:
+        await manager.close()
+    return results
+
+
+async def async_run(args: argparse.Namespace) -> dict[str, Any]:
+    """Generate the repositories, run all scenarios and return the results."""
+    with tempfile.TemporaryDirectory(prefix="wakeword-bench-") as temp_dir:
+        temp_path = Path(temp_dir)
+
+        started = time.perf_counter()
+        models = generate_repository(
+            temp_path / "models",
+            "bench",
+            "models",
+            args.languages,
+            args.models,
+            parse_size_distribution(args.sizes),
+            args.seed,
+        )
+        many = generate_repository(
+            temp_path / "many",
+            "bench",
+            "many",
+            args.index_languages,
+            args.index_models,
+            parse_size_distribution("fixed:%d" % args.index_model_size),
+            args.seed,
+        )
+        generation_seconds = time.perf_counter() - started
+
+        server = FakeGitHub([models, many])
+        base_url = await server.start()
+        try:
+            with (
+                patch.multiple(
+                    MANAGER_MODULE,
+                    GITHUB_URL=base_url,
+                    GITHUB_API_URL="%s/api" % base_url,
+                    GITHUB_RAW_URL="%s/raw" % base_url,
+                ),
+                patch.object(install_state, "Store", MemoryStore),
+                patch.object(response_cache, "Store", MemoryStore),
+            ):
+                results = {
+                    "install_all": await _bench_install(
+                        temp_path / "install-all", models, models.languages, server
+                    ),
+                    "install_one": await _bench_install(
+                        temp_path / "install-one", models, models.languages[:1], server
+                    ),
+                }
+                results.update(
+                    await _bench_index(temp_path / "install-many", many, server)
+                )
+        finally:
+            await server.stop()
+
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "integration_version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "languages": args.languages,
+            "models": args.models,
+            "sizes": args.sizes,
+            "index_languages": args.index_languages,
+            "index_models": args.index_models,
+            "index_model_size": args.index_model_size,
+            "seed": args.seed,
+            "repository_bytes": models.total_size,
+        },
+        "generation_seconds": generation_seconds,
+        "results": results,
+    }
+
+
+def _print_summary(report: dict[str, Any]) -> None:
+    """Print a short table of the results."""
+    print(
+        "%-18s %10s %8s %12s %10s"
+        % ("scenario", "seconds", "files", "lag max ms", "rss MB")
+    )
+    for name, result in report["results"].items():
+        print(
+            "%-18s %10.3f %8d %12.1f %10.1f"
+            % (
+                name,
+                result["seconds"],
+                result.get("files", 0),
+                result["loop_lag_max_ms"],
+                result["peak_rss_mb"],
+            )
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--languages", type=int, default=10)
+    parser.add_argument("--models", type=int, default=50, help="models per language")
+    parser.add_argument(
+        "--sizes",
+        default="lognormal:200000:0.8",
+        help="model size distribution: fixed:SIZE, uniform:MIN:MAX or "
+        "lognormal:MEDIAN:SIGMA (bytes)",
+    )
+    parser.add_argument("--index-languages", type=int, default=20)
+    parser.add_argument(
+        "--index-models", type=int, default=250, help="models per language"
+    )
+    parser.add_argument("--index-model-size", type=int, default=4096)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=Path, help="write the results as JSON to this file"
+    )
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(async_run(args))
+    _print_summary(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
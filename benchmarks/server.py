@@ -0,0 +1,124 @@
+"""Local HTTP server standing in for GitHub during benchmarks."""
+from __future__ import annotations
+
+from aiohttp import web
+
+from .synthetic import SyntheticRepository
+
+
+class FakeGitHub:
+    """Serve synthetic repositories over the GitHub endpoints the integration uses.
+
+    API requests are served below ``/api``, raw files below ``/raw`` and
+    archives at the same paths as on github.com. Commit lookups and trees
+    carry ETags and answer conditional requests with 304.
+    """
+
+    def __init__(self, repositories: list[SyntheticRepository]) -> None:
+        """Initialize the server."""
+        self._repositories = {
+            "%s/%s" % (repo.owner, repo.name): repo for repo in repositories
+        }
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+        self.requests = 0
+        self.bytes_served = 0
+
+    async def start(self) -> str:
+        """Start serving on a free local port and return the base URL."""
+        app = web.Application(middlewares=[self._count])
+        app.router.add_get(
+            "/api/repos/{owner}/{repo}/commits/{ref}", self._handle_commit
+        )
+        app.router.add_get(
+            "/api/repos/{owner}/{repo}/git/trees/{ref}", self._handle_tree
+        )
+        app.router.add_get(
+            "/api/repos/{owner}/{repo}/contents", self._handle_contents
+        )
+        app.router.add_get("/raw/{owner}/{repo}/{ref}/{path:.+}", self._handle_raw)
+        app.router.add_get(
+            "/{owner}/{repo}/archive/{ref:.+}.zip", self._handle_archive
+        )
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = "http://127.0.0.1:%d" % port
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler) -> web.StreamResponse:
+        """Count requests and the bytes of in-memory response bodies."""
+        self.requests += 1
+        response = await handler(request)
+        if isinstance(response, web.Response) and response.body is not None:
+            self.bytes_served += len(response.body)
+        return response
+
+    def _repository(self, request: web.Request) -> SyntheticRepository:
+        """Return the repository addressed by a request."""
+        key = "%s/%s" % (request.match_info["owner"], request.match_info["repo"])
+        if key not in self._repositories:
+            raise web.HTTPNotFound()
+        return self._repositories[key]
+
+    @staticmethod
+    def _conditional(request: web.Request, etag: str) -> bool:
+        """Return True if the client already has the current representation."""
+        return request.headers.get("If-None-Match") == etag
+
+    async def _handle_commit(self, request: web.Request) -> web.Response:
+        """Return the commit SHA of a ref."""
+        repo = self._repository(request)
+        etag = '"%s"' % repo.commit
+        if self._conditional(request, etag):
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=repo.commit, headers={"ETag": etag})
+
+    async def _handle_tree(self, request: web.Request) -> web.Response:
+        """Return the recursive tree of a repository."""
+        repo = self._repository(request)
+        etag = '"tree-%s"' % repo.commit
+        if self._conditional(request, etag):
+            return web.Response(status=304, headers={"ETag": etag})
+        tree = [
+            {"path": path, "type": "blob", "sha": sha, "size": size}
+            for path, (sha, size) in repo.blobs.items()
+        ]
+        return web.json_response(
+            {"sha": repo.commit, "tree": tree, "truncated": False},
+            headers={"ETag": etag},
+        )
+
+    async def _handle_contents(self, request: web.Request) -> web.Response:
+        """Return the top-level directories of a repository."""
+        repo = self._repository(request)
+        return web.json_response(
+            [{"name": language, "type": "dir"} for language in repo.languages]
+        )
+
+    async def _handle_raw(self, request: web.Request) -> web.StreamResponse:
+        """Return a single file of a repository."""
+        repo = self._repository(request)
+        path = request.match_info["path"]
+        if path not in repo.blobs:
+            raise web.HTTPNotFound()
+        self.bytes_served += repo.blobs[path][1]
+        return web.FileResponse(repo.root / path)
+
+    async def _handle_archive(self, request: web.Request) -> web.StreamResponse:
+        """Return the zip archive of a repository."""
+        repo = self._repository(request)
+        self.bytes_served += repo.archive.stat().st_size
+        return web.FileResponse(
+            repo.archive, headers={"ETag": '"archive-%s"' % repo.commit}
+        )
@@ -0,0 +1,108 @@
+"""Synthetic wakeword repositories for benchmarking."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import hashlib
+from pathlib import Path
+import random
+import zipfile
+
+SizeDistribution = Callable[[random.Random], int]
+
+
+@dataclass
+class SyntheticRepository:
+    """A generated repository checkout and its archive."""
+
+    owner: str
+    name: str
+    commit: str
+    root: Path
+    archive: Path
+    languages: list[str]
+    # path -> (git blob sha, size)
+    blobs: dict[str, tuple[str, int]] = field(default_factory=dict)
+
+    @property
+    def url(self) -> str:
+        """Return the GitHub URL the repository is installed from."""
+        return "https://github.com/%s/%s" % (self.owner, self.name)
+
+    @property
+    def total_size(self) -> int:
+        """Return the total size of all model files."""
+        return sum(size for _, size in self.blobs.values())
+
+
+def parse_size_distribution(spec: str) -> SizeDistribution:
+    """Parse a size distribution.
+
+    Supported forms are ``fixed:SIZE``, ``uniform:MIN:MAX`` and
+    ``lognormal:MEDIAN:SIGMA``, with sizes in bytes.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(":") if value]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: int(values[0])
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.randint(int(values[0]), int(values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        median, sigma = values
+        return lambda rng: max(1, int(rng.lognormvariate(0, sigma) * median))
+    raise ValueError("Invalid size distribution: %s" % spec)
+
+
+def git_blob_sha(data: bytes) -> str:
+    """Return the git blob SHA-1 of file contents."""
+    return hashlib.sha1(  # noqa: S324 - git object id, not for security
+        b"blob %d\0" % len(data) + data
+    ).hexdigest()
+
+
+def generate_repository(
+    directory: Path,
+    owner: str,
+    name: str,
+    languages: int,
+    models: int,
+    sizes: SizeDistribution,
+    seed: int = 0,
+) -> SyntheticRepository:
+    """Generate a repository with ``models`` files in each of ``languages``.
+
+    The checkout is written below ``directory / "tree"`` for serving single
+    files and a GitHub style archive with a ``<name>-<commit>/`` root is
+    written next to it.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    commit = hashlib.sha1(  # noqa: S324 - synthetic commit id
+        ("%s/%s/%d/%d/%d" % (owner, name, languages, models, seed)).encode()
+    ).hexdigest()
+    repo = SyntheticRepository(
+        owner=owner,
+        name=name,
+        commit=commit,
+        root=directory / "tree",
+        archive=directory / "archive.zip",
+        languages=["lang%02d" % index for index in range(languages)],
+    )
+
+    prefix = "%s-%s/" % (name, commit)
+    with zipfile.ZipFile(
+        repo.archive, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+    ) as archive:
+        archive.writestr(prefix + "README.md", b"Synthetic wakeword repository\n")
+        for language in repo.languages:
+            for index in range(models):
+                path = "%s/model_%04d.tflite" % (language, index)
+                # Model weights are close to incompressible
+                data = rng.randbytes(sizes(rng))
+                file_path = repo.root / path
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_path.write_bytes(data)
+                archive.writestr(prefix + path, data)
+                repo.blobs[path] = (git_blob_sha(data), len(data))
+
+    return repo
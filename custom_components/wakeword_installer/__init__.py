@@ -1,34 +1,78 @@
 """The Wakeword Installer integration."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterator
+from datetime import datetime
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import Platform
+from homeassistant.core import (
+    CoreState,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_REPOSITORIES, CONF_REPO_NAME
-from .repository_manager import RepositoryManager
+from .const import (
+    DOMAIN,
+    CONF_GITHUB_TOKEN,
+    CONF_MAX_CONCURRENT_INSTALLS,
+    CONF_MAX_INSTALLS_PER_HOST,
+    CONF_MIRROR_URL,
+    CONF_PATH_LAYOUT,
+    CONF_REF,
+    CONF_REPOSITORIES,
+    CONF_REPO_NAME,
+    CONF_STARTUP_DELAY,
+    CONF_UPDATE_INTERVAL,
+    CONF_WORKER_THREADS,
+    DATA_COORDINATORS,
+    DATA_ENTRIES,
+    DATA_MANAGER,
+    DATA_SETUP_DURATIONS,
+    DEFAULT_MAX_CONCURRENT_INSTALLS,
+    DEFAULT_MAX_INSTALLS_PER_HOST,
+    DEFAULT_STARTUP_DELAY,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WORKER_THREADS,
+)
+from .coordinator import WakewordUpdateCoordinator
+from .rate_limiter import PRIORITY_BACKGROUND
+from .reconciler import Reconciler
+from .repository_manager import RepositoryManager, async_get_repository_manager
 
 _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-PLATFORMS: list[str] = []
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.UPDATE]
 
 SERVICE_INSTALL_WAKEWORDS = "install_wakewords"
 SERVICE_REMOVE_WAKEWORDS = "remove_wakewords"
 SERVICE_REMOVE_REPOSITORY_WAKEWORDS = "remove_repository_wakewords"
 SERVICE_LIST_INSTALLED = "list_installed"
 SERVICE_REFRESH_REPOSITORIES = "refresh_repositories"
+SERVICE_REBUILD_INDEX = "rebuild_index"
+SERVICE_RECONCILE = "reconcile"
+SERVICE_GET_TRACES = "get_traces"
 
 SERVICE_INSTALL_SCHEMA = vol.Schema({
     vol.Optional("repository"): cv.string,
     vol.Optional("languages"): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("force", default=False): cv.boolean,
 })
 
 SERVICE_REMOVE_SCHEMA = vol.Schema({
@@ -40,6 +84,18 @@ SERVICE_REMOVE_REPOSITORY_SCHEMA = vol.Schema({
     vol.Required("repository"): cv.string,
 })
 
+SERVICE_RECONCILE_SCHEMA = vol.Schema({
+    vol.Optional("dry_run", default=False): cv.boolean,
+})
+
+SERVICE_REFRESH_REPOSITORIES_SCHEMA = vol.Schema({
+    vol.Optional("max_age"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+
+SERVICE_GET_TRACES_SCHEMA = vol.Schema({
+    vol.Optional("limit"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+})
+
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Wakeword Installer component."""
@@ -47,9 +103,26 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Wakeword Installer from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    """Set up Wakeword Installer from a config entry.
+
+    Setup only loads the persisted install state; a missing file index is
+    built by the reconciliation after Home Assistant has started. The
+    installed files are checked in the background and GitHub is not
+    contacted before Home Assistant has started, so setup time does not
+    grow with the number of repositories or models.
+    """
+    started = time.perf_counter()
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data.setdefault(DATA_ENTRIES, {})[entry.entry_id] = entry.data
+
+    repo_manager = async_get_repository_manager(hass)
+    _configure_repository_manager(repo_manager, entry)
+
+    coordinator = WakewordUpdateCoordinator(hass, entry, repo_manager)
+    await coordinator.async_load_initial_data()
+    domain_data.setdefault(DATA_COORDINATORS, {})[entry.entry_id] = coordinator
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     # Only register services once (first entry to load)
     if not hass.services.has_service(DOMAIN, SERVICE_INSTALL_WAKEWORDS):
@@ -57,41 +130,95 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Automatically install wakewords from all configured repositories
-    repositories = entry.data.get(CONF_REPOSITORIES, [])
-    if repositories:
-        hass.async_create_task(_async_install_wakewords(hass, repositories))
+    if entry.data.get(CONF_REPOSITORIES):
+        verify_task = hass.async_create_background_task(
+            repo_manager.async_verify_installed(), "wakeword_installer verify"
+        )
+        _async_defer_reconcile(hass, entry, verify_task)
 
+    duration = time.perf_counter() - started
+    domain_data.setdefault(DATA_SETUP_DURATIONS, {})[entry.entry_id] = duration
+    _LOGGER.debug("Set up entry %s in %.1f ms", entry.entry_id, duration * 1000)
     return True
 
 
-async def _async_install_wakewords(
-    hass: HomeAssistant, repositories: list[dict]
+@callback
+def _async_defer_reconcile(
+    hass: HomeAssistant, entry: ConfigEntry, verify_task: asyncio.Task
+) -> None:
+    """Reconcile the wakewords once Home Assistant has started.
+
+    The startup delay keeps downloads from competing with the rest of
+    Home Assistant's startup; it does not apply when an entry is reloaded
+    later. The reconciliation waits for the check of the installed files,
+    so files found missing are installed again.
+    """
+    delay = 0
+    if hass.state is not CoreState.running:
+        delay = entry.options.get(CONF_STARTUP_DELAY, DEFAULT_STARTUP_DELAY)
+
+    async def _async_run(now: datetime) -> None:
+        await verify_task
+        await _async_reconcile(hass)
+
+    @callback
+    def _async_started(hass: HomeAssistant) -> None:
+        entry.async_on_unload(async_call_later(hass, delay, _async_run))
+
+    entry.async_on_unload(async_at_started(hass, _async_started))
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply an updated config entry."""
+    coordinator = hass.data[DOMAIN][DATA_COORDINATORS][entry.entry_id]
+    if coordinator.repositories != entry.data.get(
+        CONF_REPOSITORIES, []
+    ) or coordinator.interval_minutes != entry.options.get(
+        CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+    ):
+        # Recreate the coordinator and the entities of the repositories
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    _configure_repository_manager(async_get_repository_manager(hass), entry)
+
+
+def _configure_repository_manager(
+    repo_manager: RepositoryManager, entry: ConfigEntry
 ) -> None:
-    """Install wakewords from configured repositories in the background."""
-    repo_manager = RepositoryManager(hass)
+    """Apply the limits, GitHub token and mirror of the entry options."""
+    repo_manager.set_install_limits(
+        max_concurrent_installs=entry.options.get(
+            CONF_MAX_CONCURRENT_INSTALLS, DEFAULT_MAX_CONCURRENT_INSTALLS
+        ),
+        max_installs_per_host=entry.options.get(
+            CONF_MAX_INSTALLS_PER_HOST, DEFAULT_MAX_INSTALLS_PER_HOST
+        ),
+    )
+    repo_manager.set_worker_threads(
+        entry.options.get(CONF_WORKER_THREADS, DEFAULT_WORKER_THREADS)
+    )
+    repo_manager.set_github_token(entry.options.get(CONF_GITHUB_TOKEN))
+    repo_manager.set_mirror_url(entry.options.get(CONF_MIRROR_URL))
+
+
+def _iter_repositories(hass: HomeAssistant) -> Iterator[dict[str, Any]]:
+    """Iterate over the repositories of all loaded config entries."""
+    entries = hass.data.get(DOMAIN, {}).get(DATA_ENTRIES, {})
+    for entry_data in entries.values():
+        yield from entry_data.get(CONF_REPOSITORIES, [])
+
+
+async def _async_reconcile(hass: HomeAssistant) -> None:
+    """Install, update and remove wakewords in the background."""
+    reconciler = Reconciler(async_get_repository_manager(hass))
+    repositories = list(_iter_repositories(hass))
     try:
-        for repo in repositories:
-            try:
-                languages = repo.get("selected_languages", [])
-                if not languages:
-                    continue
-                _LOGGER.info(
-                    "Installing wakewords from %s for languages: %s",
-                    repo[CONF_REPO_NAME],
-                    languages,
-                )
-                await repo_manager.install_wakewords(
-                    repo["repo_url"], languages, repo[CONF_REPO_NAME]
-                )
-            except Exception as err:
-                _LOGGER.error(
-                    "Failed to install wakewords from %s: %s",
-                    repo.get(CONF_REPO_NAME, "unknown"),
-                    err,
-                )
-    finally:
-        await repo_manager.close()
+        plan = await reconciler.async_plan(repositories)
+        errors = await reconciler.async_apply(repositories, plan)
+        if errors:
+            _LOGGER.warning("Wakeword installation failed for: %s", list(errors))
+    except Exception as err:
+        _LOGGER.error("Failed to install wakewords: %s", err)
 
 
 def _register_services(hass: HomeAssistant) -> None:
@@ -99,82 +226,140 @@ def _register_services(hass: HomeAssistant) -> None:
 
     async def install_wakewords_service(call: ServiceCall) -> None:
         """Handle install wakewords service call."""
-        repo_manager = RepositoryManager(hass)
+        repo_manager = async_get_repository_manager(hass)
         try:
-            for entry_data in hass.data.get(DOMAIN, {}).values():
-                repositories = entry_data.get(CONF_REPOSITORIES, [])
-                target_repo = call.data.get("repository")
-                target_languages = call.data.get("languages")
-
-                for repo in repositories:
-                    if target_repo and repo[CONF_REPO_NAME] != target_repo:
-                        continue
-
-                    languages = target_languages or repo.get(
-                        "selected_languages", []
-                    )
-                    await repo_manager.install_wakewords(
-                        repo["repo_url"], languages, repo[CONF_REPO_NAME]
-                    )
+            target_repo = call.data.get("repository")
+            target_languages = call.data.get("languages")
+
+            repositories = [
+                repo
+                for repo in _iter_repositories(hass)
+                if not target_repo or repo[CONF_REPO_NAME] == target_repo
+            ]
+            if repositories:
+                await repo_manager.install_repositories(
+                    repositories, target_languages, force=call.data.get("force", False)
+                )
 
         except Exception as err:
             _LOGGER.error("Failed to install wakewords: %s", err)
-        finally:
-            await repo_manager.close()
 
     async def remove_wakewords_service(call: ServiceCall) -> None:
         """Handle remove wakewords service call."""
-        repo_manager = RepositoryManager(hass)
+        repo_manager = async_get_repository_manager(hass)
         try:
             repo_name = call.data["repository"]
             languages = call.data["languages"]
             await repo_manager.remove_wakewords(repo_name, languages)
         except Exception as err:
             _LOGGER.error("Failed to remove wakewords: %s", err)
-        finally:
-            await repo_manager.close()
 
     async def remove_repository_wakewords_service(call: ServiceCall) -> None:
         """Handle remove repository wakewords service call."""
-        repo_manager = RepositoryManager(hass)
+        repo_manager = async_get_repository_manager(hass)
         try:
             repo_name = call.data["repository"]
             await repo_manager.remove_repository_wakewords(repo_name)
         except Exception as err:
             _LOGGER.error("Failed to remove repository wakewords: %s", err)
-        finally:
-            await repo_manager.close()
 
-    async def list_installed_service(call: ServiceCall) -> None:
-        """Handle list installed wakewords service call."""
-        repo_manager = RepositoryManager(hass)
-        try:
-            installed = await repo_manager.get_installed_wakewords()
+    async def list_installed_service(call: ServiceCall) -> ServiceResponse:
+        """Handle list installed wakewords service call.
+
+        Answers from the in-memory install state without scanning the
+        install directory.
+        """
+        repo_manager = async_get_repository_manager(hass)
+        installed = await repo_manager.get_installed_wakewords()
+        if not call.return_response:
             _LOGGER.info("Installed wakewords: %s", installed)
+            return None
+
+        state = repo_manager.install_state
+        repositories = {}
+        for repo_name in state.repository_names:
+            record = state.get_repository(repo_name) or {}
+            repositories[repo_name] = {
+                "commit": record.get("commit"),
+                "languages": state.installed_languages(repo_name),
+                "models": state.file_count(repo_name),
+                "size": state.total_size(repo_name),
+            }
+        return {"repositories": repositories, "wakewords": installed}
+
+    async def refresh_repositories_service(call: ServiceCall) -> ServiceResponse:
+        """Handle refresh repositories service call.
+
+        All repositories are queried at once. Listings validated less than
+        ``max_age`` seconds ago are used as they are, others are revalidated
+        with a conditional request.
+        """
+        repo_manager = async_get_repository_manager(hass)
+        repositories = list(_iter_repositories(hass))
+        results = await asyncio.gather(
+            *(
+                repo_manager.get_available_languages(
+                    repo["repo_url"],
+                    priority=PRIORITY_BACKGROUND,
+                    ref=repo.get(CONF_REF),
+                    max_age=call.data.get("max_age"),
+                    path_layout=repo.get(CONF_PATH_LAYOUT),
+                )
+                for repo in repositories
+            ),
+            return_exceptions=True,
+        )
+
+        available = {}
+        errors = {}
+        for repo, result in zip(repositories, results):
+            repo_name = repo[CONF_REPO_NAME]
+            if isinstance(result, Exception):
+                _LOGGER.error("Failed to refresh %s: %s", repo_name, result)
+                errors[repo_name] = str(result)
+            else:
+                _LOGGER.info("Available languages for %s: %s", repo_name, result)
+                available[repo_name] = result
+        if not call.return_response:
+            return None
+        return {"languages": available, "errors": errors}
+
+    async def rebuild_index_service(call: ServiceCall) -> None:
+        """Handle rebuild index service call."""
+        repo_manager = async_get_repository_manager(hass)
+        try:
+            await repo_manager.async_rebuild_index(
+                [repo[CONF_REPO_NAME] for repo in _iter_repositories(hass)]
+            )
         except Exception as err:
-            _LOGGER.error("Failed to list installed wakewords: %s", err)
-        finally:
-            await repo_manager.close()
+            _LOGGER.error("Failed to rebuild wakeword index: %s", err)
 
-    async def refresh_repositories_service(call: ServiceCall) -> None:
-        """Handle refresh repositories service call."""
-        repo_manager = RepositoryManager(hass)
+    async def reconcile_service(call: ServiceCall) -> ServiceResponse:
+        """Handle reconcile service call."""
+        reconciler = Reconciler(async_get_repository_manager(hass))
+        repositories = list(_iter_repositories(hass))
+        dry_run = call.data.get("dry_run", False)
         try:
-            for entry_data in hass.data.get(DOMAIN, {}).values():
-                repositories = entry_data.get(CONF_REPOSITORIES, [])
-                for repo in repositories:
-                    languages = await repo_manager.get_available_languages(
-                        repo["repo_url"]
-                    )
-                    _LOGGER.info(
-                        "Available languages for %s: %s",
-                        repo[CONF_REPO_NAME],
-                        languages,
-                    )
+            plan = await reconciler.async_plan(repositories)
+            errors = {}
+            if not dry_run:
+                errors = await reconciler.async_apply(repositories, plan)
         except Exception as err:
-            _LOGGER.error("Failed to refresh repositories: %s", err)
-        finally:
-            await repo_manager.close()
+            _LOGGER.error("Failed to reconcile wakewords: %s", err)
+            raise HomeAssistantError("Reconcile failed: %s" % err) from err
+
+        if not call.return_response:
+            return None
+        return {
+            "dry_run": dry_run,
+            "operations": [operation._asdict() for operation in plan],
+            "errors": errors,
+        }
+
+    async def get_traces_service(call: ServiceCall) -> ServiceResponse:
+        """Handle get traces service call."""
+        repo_manager = async_get_repository_manager(hass)
+        return {"traces": repo_manager.traces.as_list(call.data.get("limit"))}
 
     hass.services.async_register(
         DOMAIN,
@@ -195,10 +380,34 @@ def _register_services(hass: HomeAssistant) -> None:
         schema=SERVICE_REMOVE_REPOSITORY_SCHEMA,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_LIST_INSTALLED, list_installed_service
+        DOMAIN,
+        SERVICE_LIST_INSTALLED,
+        list_installed_service,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH_REPOSITORIES,
+        refresh_repositories_service,
+        schema=SERVICE_REFRESH_REPOSITORIES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_REFRESH_REPOSITORIES, refresh_repositories_service
+        DOMAIN, SERVICE_REBUILD_INDEX, rebuild_index_service
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECONCILE,
+        reconcile_service,
+        schema=SERVICE_RECONCILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRACES,
+        get_traces_service,
+        schema=SERVICE_GET_TRACES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
     )
 
 
@@ -206,14 +415,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        domain_data = hass.data[DOMAIN]
+        domain_data[DATA_ENTRIES].pop(entry.entry_id)
+        domain_data.get(DATA_COORDINATORS, {}).pop(entry.entry_id, None)
+        domain_data.get(DATA_SETUP_DURATIONS, {}).pop(entry.entry_id, None)
 
-        # Only remove services when the last entry is unloaded
-        if not hass.data[DOMAIN]:
+        # Only remove services and the shared manager when the last entry is unloaded
+        if not domain_data[DATA_ENTRIES]:
             hass.services.async_remove(DOMAIN, SERVICE_INSTALL_WAKEWORDS)
             hass.services.async_remove(DOMAIN, SERVICE_REMOVE_WAKEWORDS)
             hass.services.async_remove(DOMAIN, SERVICE_REMOVE_REPOSITORY_WAKEWORDS)
             hass.services.async_remove(DOMAIN, SERVICE_LIST_INSTALLED)
             hass.services.async_remove(DOMAIN, SERVICE_REFRESH_REPOSITORIES)
+            hass.services.async_remove(DOMAIN, SERVICE_REBUILD_INDEX)
+            hass.services.async_remove(DOMAIN, SERVICE_RECONCILE)
+            hass.services.async_remove(DOMAIN, SERVICE_GET_TRACES)
+
+            repo_manager = domain_data.pop(DATA_MANAGER, None)
+            if repo_manager is not None:
+                await repo_manager.close()
 
     return unload_ok
@@ -0,0 +1,83 @@
+"""Binary sensors for the Wakeword Installer integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, CONF_REPO_NAME, DATA_COORDINATORS
+from .coordinator import WakewordUpdateCoordinator
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up an update available sensor for every configured repository."""
+    coordinator: WakewordUpdateCoordinator = hass.data[DOMAIN][DATA_COORDINATORS][
+        entry.entry_id
+    ]
+    async_add_entities(
+        WakewordUpdateAvailableSensor(coordinator, entry, repo)
+        for repo in coordinator.repositories
+    )
+
+
+class WakewordUpdateAvailableSensor(
+    CoordinatorEntity[WakewordUpdateCoordinator], BinarySensorEntity
+):
+    """Tell whether the head of a repository moved past the installed commit.
+
+    The latest commit comes from the coordinator's last check, the installed
+    one from the in-memory install state, so the sensor also follows
+    installs and removals that happen between checks.
+    """
+
+    _attr_device_class = BinarySensorDeviceClass.UPDATE
+
+    def __init__(
+        self,
+        coordinator: WakewordUpdateCoordinator,
+        entry: ConfigEntry,
+        repo: dict[str, Any],
+    ) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(coordinator)
+        self._repo_name = repo[CONF_REPO_NAME]
+        self._attr_unique_id = "%s_%s_update_available" % (
+            entry.entry_id,
+            self._repo_name,
+        )
+        self._attr_name = "%s wakeword update available" % self._repo_name
+
+    async def async_added_to_hass(self) -> None:
+        """Follow coordinator updates and changes of the install state."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.repo_manager.async_add_listener(
+                self._handle_coordinator_update
+            )
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the new state."""
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the latest commit is not installed."""
+        status = (self.coordinator.data or {}).get(self._repo_name, {})
+        latest = status.get("latest_commit")
+        if latest is None:
+            return None
+        install_state = self.coordinator.repo_manager.install_state
+        return install_state.installed_commit(self._repo_name) != latest
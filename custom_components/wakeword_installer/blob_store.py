@@ -0,0 +1,138 @@
+"""Content-addressed store for installed model files."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+import secrets
+import shutil
+from typing import BinaryIO
+
+_LOGGER = logging.getLogger(__name__)
+
+BLOB_DIR_NAME = "blobs"
+CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """Keep a single copy of every model, addressed by its SHA-256.
+
+    Installed files are hardlinks to their blob, so a model shipped under
+    several languages or by several repositories is written and stored
+    once. Where the filesystem does not support hardlinks the blob is
+    copied instead. The store does not count references itself; callers
+    release a blob once no installed file refers to it any more.
+
+    All methods block and must be run in the executor.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Initialize the store."""
+        self.root = root
+
+    def path(self, sha256: str) -> Path:
+        """Return the path of a blob."""
+        return self.root / sha256[:2] / sha256
+
+    def add_stream(self, source: BinaryIO) -> tuple[int, str]:
+        """Store the contents of a stream and return its size and SHA-256.
+
+        The data is written to a temporary file inside the store and only
+        moved into place once complete; if an identical blob already exists
+        the new copy is dropped.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Unlike mkstemp, open() honours the umask, so blobs and the models
+        # linked to them get the usual file mode instead of 0600.
+        part_path = self.root / (".%s.part" % secrets.token_hex(8))
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(part_path, "xb") as file:
+                while chunk := source.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    file.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            self._commit(part_path, sha256)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        return size, sha256
+
+    def add_file(self, file_path: Path) -> tuple[int, str]:
+        """Move a file into the store and return its size and SHA-256.
+
+        The file must be on the same filesystem as the store.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._commit(file_path, sha256)
+        return size, sha256
+
+    def add_copy(self, file_path: Path) -> tuple[int, str]:
+        """Store a copy of a file and return its size and SHA-256.
+
+        The file is only read to hash it when an identical blob exists
+        already, which is the common case when a local source is installed
+        again. Otherwise it is copied while hashing, so the blob matches its
+        hash even if the file changes in between.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(file_path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+            if self.path(digest.hexdigest()).exists():
+                return size, digest.hexdigest()
+            file.seek(0)
+            return self.add_stream(file)
+
+    def _commit(self, part_path: Path, sha256: str) -> None:
+        """Move a complete temporary file to its blob path."""
+        blob_path = self.path(sha256)
+        if blob_path.exists():
+            part_path.unlink()
+            return
+        blob_path.parent.mkdir(exist_ok=True)
+        os.replace(part_path, blob_path)
+
+    def link(self, sha256: str, destination: Path) -> os.stat_result:
+        """Atomically place a blob at a destination path and return its stat.
+
+        The destination is replaced, never written to, so other links to
+        the blob are not affected.
+        """
+        part_path = destination.with_name(".%s.part" % destination.name)
+        part_path.unlink(missing_ok=True)
+        try:
+            try:
+                os.link(self.path(sha256), part_path)
+            except OSError as err:
+                if not self.path(sha256).exists():
+                    raise
+                _LOGGER.debug("Copying %s, hardlink failed: %s", destination, err)
+                shutil.copyfile(self.path(sha256), part_path)
+            os.replace(part_path, destination)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        return destination.stat()
+
+    def release(self, sha256: str) -> None:
+        """Remove a blob that is no longer referenced."""
+        blob_path = self.path(sha256)
+        blob_path.unlink(missing_ok=True)
+        try:
+            blob_path.parent.rmdir()
+        except OSError:
+            # Other blobs share the directory
+            pass
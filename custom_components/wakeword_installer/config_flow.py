@@ -16,18 +16,60 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN, CONF_REPOSITORIES, CONF_REPO_URL, CONF_REPO_NAME, CONF_SELECTED_LANGUAGES
-from .repository_manager import RepositoryManager
+from .const import (
+    DOMAIN,
+    CONF_GITHUB_TOKEN,
+    CONF_MAX_CONCURRENT_INSTALLS,
+    CONF_MAX_INSTALLS_PER_HOST,
+    CONF_MIRROR_URL,
+    CONF_PATH_LAYOUT,
+    CONF_REF,
+    CONF_REPOSITORIES,
+    CONF_REPO_URL,
+    CONF_REPO_NAME,
+    CONF_SELECTED_LANGUAGES,
+    CONF_STARTUP_DELAY,
+    CONF_UPDATE_INTERVAL,
+    CONF_WORKER_THREADS,
+    DEFAULT_MAX_CONCURRENT_INSTALLS,
+    DEFAULT_MAX_INSTALLS_PER_HOST,
+    DEFAULT_PATH_LAYOUT,
+    DEFAULT_STARTUP_DELAY,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_WORKER_THREADS,
+)
+from .layout import PathLayout
+from .rate_limiter import RateLimitExceeded
+from .repository_manager import async_get_repository_manager
+from .sources import local_path
 
 _LOGGER = logging.getLogger(__name__)
 
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_REPO_URL): str,
+        vol.Optional(CONF_PATH_LAYOUT, default=DEFAULT_PATH_LAYOUT): str,
+        vol.Optional(CONF_REF): str,
     }
 )
 
 
+def _validate_path_layout(user_input: dict[str, Any]) -> str | None:
+    """Return the path layout from user input, or None if it is invalid."""
+    path_layout = user_input.get(CONF_PATH_LAYOUT, DEFAULT_PATH_LAYOUT).strip()
+    try:
+        PathLayout(path_layout)
+    except ValueError:
+        return None
+    return path_layout
+
+
+def _is_allowed_source(hass: HomeAssistant, repo_url: str) -> bool:
+    """Return False for a local source Home Assistant may not access."""
+    source_path = local_path(repo_url)
+    return source_path is None or hass.config.is_allowed_path(str(source_path))
+
+
 class WakewordInstallerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Wakeword Installer."""
 
@@ -51,10 +93,30 @@ class WakewordInstallerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors = {}
 
         repo_url = user_input[CONF_REPO_URL].strip()
-        repo_manager = RepositoryManager(self.hass)
+        path_layout = _validate_path_layout(user_input)
+        if path_layout is None:
+            return self.async_show_form(
+                step_id="user",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors={"base": "invalid_layout"},
+            )
+
+        if not await self.hass.async_add_executor_job(
+            _is_allowed_source, self.hass, repo_url
+        ):
+            return self.async_show_form(
+                step_id="user",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors={"base": "path_not_allowed"},
+            )
+
+        ref = user_input.get(CONF_REF, "").strip()
+        repo_manager = async_get_repository_manager(self.hass)
         try:
             repo_name = repo_manager._extract_repo_name(repo_url)
-            languages = await repo_manager.get_available_languages(repo_url)
+            languages = await repo_manager.get_available_languages(
+                repo_url, ref=ref or None, path_layout=path_layout
+            )
 
             if not languages:
                 errors["base"] = "no_languages_found"
@@ -62,17 +124,20 @@ class WakewordInstallerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 self.current_repo = {
                     CONF_REPO_NAME: repo_name,
                     CONF_REPO_URL: repo_url,
+                    CONF_PATH_LAYOUT: path_layout,
                 }
+                if ref:
+                    self.current_repo[CONF_REF] = ref
                 self.available_languages = languages
                 return await self.async_step_select_languages()
 
+        except RateLimitExceeded:
+            errors["base"] = "rate_limited"
         except HomeAssistantError:
             errors["base"] = "cannot_connect"
         except Exception:
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown"
-        finally:
-            await repo_manager.close()
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
@@ -145,6 +210,10 @@ class WakewordInstallerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
     """Handle options flow for Wakeword Installer."""
 
+    def __init__(self) -> None:
+        """Initialize the options flow."""
+        self.options: dict[str, Any] = {}
+
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -152,6 +221,7 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
         self.repositories = list(
             self.config_entry.data.get(CONF_REPOSITORIES, [])
         )
+        self.options = dict(self.config_entry.options)
         return await self.async_step_manage_repos()
 
     async def async_step_manage_repos(
@@ -170,7 +240,9 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
             return self.async_show_form(
                 step_id="manage_repos",
                 data_schema=vol.Schema({
-                    vol.Optional("action"): vol.In(["add", "remove", "install", "done"]),
+                    vol.Optional("action"): vol.In(
+                        ["add", "remove", "install", "settings", "done"]
+                    ),
                     vol.Optional("repo_to_remove"): vol.In(repo_list) if len(self.repositories) > 0 else str,
                 }),
                 description_placeholders={
@@ -186,8 +258,73 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
             return await self.async_step_remove_repo(user_input)
         elif action == "install":
             return await self.async_step_install_wakewords()
+        elif action == "settings":
+            return await self.async_step_settings()
         else:
-            return self.async_create_entry(title="", data={})
+            return self.async_create_entry(title="", data=self.options)
+
+    async def async_step_settings(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Configure installation settings."""
+        if user_input is None:
+            return self.async_show_form(
+                step_id="settings",
+                data_schema=vol.Schema({
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_INSTALLS,
+                        default=self.options.get(
+                            CONF_MAX_CONCURRENT_INSTALLS,
+                            DEFAULT_MAX_CONCURRENT_INSTALLS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_MAX_INSTALLS_PER_HOST,
+                        default=self.options.get(
+                            CONF_MAX_INSTALLS_PER_HOST,
+                            DEFAULT_MAX_INSTALLS_PER_HOST,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_UPDATE_INTERVAL,
+                        default=self.options.get(
+                            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=15, max=10080)),
+                    vol.Required(
+                        CONF_STARTUP_DELAY,
+                        default=self.options.get(
+                            CONF_STARTUP_DELAY, DEFAULT_STARTUP_DELAY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_WORKER_THREADS,
+                        default=self.options.get(
+                            CONF_WORKER_THREADS, DEFAULT_WORKER_THREADS
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+                    vol.Optional(
+                        CONF_GITHUB_TOKEN,
+                        description={
+                            "suggested_value": self.options.get(CONF_GITHUB_TOKEN)
+                        },
+                    ): str,
+                    vol.Optional(
+                        CONF_MIRROR_URL,
+                        description={
+                            "suggested_value": self.options.get(CONF_MIRROR_URL)
+                        },
+                    ): str,
+                }),
+            )
+
+        for key in (CONF_GITHUB_TOKEN, CONF_MIRROR_URL):
+            if not user_input.get(key):
+                # An empty field removes the setting
+                user_input.pop(key, None)
+                self.options.pop(key, None)
+        self.options.update(user_input)
+        return await self.async_step_manage_repos()
 
     async def async_step_add_repo(
         self, user_input: dict[str, Any] | None = None
@@ -201,17 +338,40 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
 
         errors = {}
         repo_url = user_input[CONF_REPO_URL].strip()
-        repo_manager = RepositoryManager(self.hass)
+        path_layout = _validate_path_layout(user_input)
+        if path_layout is None:
+            return self.async_show_form(
+                step_id="add_repo",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors={"base": "invalid_layout"},
+            )
+
+        if not await self.hass.async_add_executor_job(
+            _is_allowed_source, self.hass, repo_url
+        ):
+            return self.async_show_form(
+                step_id="add_repo",
+                data_schema=STEP_USER_DATA_SCHEMA,
+                errors={"base": "path_not_allowed"},
+            )
+
+        ref = user_input.get(CONF_REF, "").strip()
+        repo_manager = async_get_repository_manager(self.hass)
         try:
             repo_name = repo_manager._extract_repo_name(repo_url)
-            languages = await repo_manager.get_available_languages(repo_url)
+            languages = await repo_manager.get_available_languages(
+                repo_url, ref=ref or None, path_layout=path_layout
+            )
 
             if languages:
                 new_repo = {
                     CONF_REPO_NAME: repo_name,
                     CONF_REPO_URL: repo_url,
+                    CONF_PATH_LAYOUT: path_layout,
                     CONF_SELECTED_LANGUAGES: languages
                 }
+                if ref:
+                    new_repo[CONF_REF] = ref
                 self.repositories.append(new_repo)
 
                 self.hass.config_entries.async_update_entry(
@@ -221,10 +381,10 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
             else:
                 errors["base"] = "no_languages_found"
 
+        except RateLimitExceeded:
+            errors["base"] = "rate_limited"
         except Exception:
             errors["base"] = "unknown"
-        finally:
-            await repo_manager.close()
 
         if errors:
             return self.async_show_form(
@@ -243,7 +403,7 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
         if repo_to_remove and repo_to_remove != "No repositories configured":
             repo_name = repo_to_remove.split(" (")[0]
 
-            repo_manager = RepositoryManager(self.hass)
+            repo_manager = async_get_repository_manager(self.hass)
             try:
                 await repo_manager.remove_repository_wakewords(repo_name)
                 _LOGGER.info("Removed all wakeword files for repository: %s", repo_name)
@@ -251,8 +411,6 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
                 _LOGGER.error(
                     "Failed to remove wakeword files for %s: %s", repo_name, err
                 )
-            finally:
-                await repo_manager.close()
 
             self.repositories = [
                 repo for repo in self.repositories
@@ -270,23 +428,11 @@ class WakewordInstallerOptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Install wakewords from repositories."""
-        repo_manager = RepositoryManager(self.hass)
+        repo_manager = async_get_repository_manager(self.hass)
         try:
-            for repo in self.repositories:
-                try:
-                    await repo_manager.install_wakewords(
-                        repo[CONF_REPO_URL],
-                        repo[CONF_SELECTED_LANGUAGES],
-                        repo[CONF_REPO_NAME]
-                    )
-                except Exception as err:
-                    _LOGGER.error(
-                        "Failed to install wakewords from %s: %s",
-                        repo[CONF_REPO_NAME],
-                        err,
-                    )
-        finally:
-            await repo_manager.close()
+            await repo_manager.install_repositories(self.repositories)
+        except Exception as err:
+            _LOGGER.error("Failed to install wakewords: %s", err)
 
         return self.async_show_form(
             step_id="install_complete",
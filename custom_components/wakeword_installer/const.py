@@ -6,7 +6,31 @@ CONF_REPOSITORIES = "repositories"
 CONF_REPO_URL = "repo_url"
 CONF_REPO_NAME = "repo_name"
 CONF_SELECTED_LANGUAGES = "selected_languages"
+CONF_PATH_LAYOUT = "path_layout"
+CONF_REF = "ref"
+
+CONF_MAX_CONCURRENT_INSTALLS = "max_concurrent_installs"
+CONF_MAX_INSTALLS_PER_HOST = "max_installs_per_host"
+CONF_GITHUB_TOKEN = "github_token"
+CONF_UPDATE_INTERVAL = "update_interval"
+CONF_STARTUP_DELAY = "startup_delay"
+CONF_WORKER_THREADS = "worker_threads"
+CONF_MIRROR_URL = "mirror_url"
 
 WAKEWORD_INSTALL_PATH = "/share/openwakeword"
+# Hidden directory below the install path for downloads and cached archives
+CACHE_DIR_NAME = ".wakeword_installer"
+
+DEFAULT_NAME = "Wakeword Installer"
+
+DEFAULT_MAX_CONCURRENT_INSTALLS = 4
+DEFAULT_MAX_INSTALLS_PER_HOST = 2
+DEFAULT_PATH_LAYOUT = "{language}/**/*.tflite"
+DEFAULT_UPDATE_INTERVAL = 360  # minutes
+DEFAULT_STARTUP_DELAY = 60  # seconds
+DEFAULT_WORKER_THREADS = 2
 
-DEFAULT_NAME = "Wakeword Installer"
\ No newline at end of file
+DATA_ENTRIES = "entries"
+DATA_MANAGER = "repository_manager"
+DATA_COORDINATORS = "coordinators"
+DATA_SETUP_DURATIONS = "setup_durations"
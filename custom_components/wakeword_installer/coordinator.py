@@ -0,0 +1,142 @@
+"""Update coordinator checking repositories for new commits."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import random
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_REF,
+    CONF_REPOSITORIES,
+    CONF_REPO_NAME,
+    CONF_REPO_URL,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+)
+from .repository_manager import RepositoryManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# Random variation of every check interval
+UPDATE_JITTER = 0.1
+MIN_CHECK_INTERVAL = timedelta(minutes=1)
+
+
+class WakewordUpdateCoordinator(DataUpdateCoordinator[dict[str, dict[str, Any]]]):
+    """Check the repositories of a config entry for new upstream commits.
+
+    Repositories are checked one at a time, spread evenly over the update
+    interval with some jitter, so they never all poll at once. A check is a
+    conditional request for the head commit; repositories whose head moved
+    are installed again. The data maps repository names to their status.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        repo_manager: RepositoryManager,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.repo_manager = repo_manager
+        self.repositories: list[dict[str, Any]] = list(
+            entry.data.get(CONF_REPOSITORIES, [])
+        )
+        self.interval_minutes: int = entry.options.get(
+            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+        )
+        self._next_index = 0
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=self._next_interval(),
+        )
+
+    def _next_interval(self) -> timedelta:
+        """Return the delay before the next repository is checked."""
+        step = timedelta(minutes=self.interval_minutes) / max(
+            1, len(self.repositories)
+        )
+        jitter = random.uniform(-UPDATE_JITTER, UPDATE_JITTER)  # noqa: S311
+        return max(MIN_CHECK_INTERVAL, step * (1 + jitter))
+
+    async def async_load_initial_data(self) -> None:
+        """Set the status of all repositories from the install state."""
+        await self.repo_manager.async_load_state(build_index=False)
+        install_state = self.repo_manager.install_state
+        data = {}
+        for repo in self.repositories:
+            commit = install_state.installed_commit(repo[CONF_REPO_NAME])
+            data[repo[CONF_REPO_NAME]] = {
+                "installed_commit": commit,
+                "latest_commit": commit,
+                "last_checked": None,
+            }
+        self.data = data
+
+    async def _async_update_data(self) -> dict[str, dict[str, Any]]:
+        """Check the repository whose turn it is."""
+        data = dict(self.data or {})
+        if not self.repositories:
+            return data
+
+        repo = self.repositories[self._next_index % len(self.repositories)]
+        self._next_index += 1
+        self.update_interval = self._next_interval()
+
+        status = await self._async_check_repository(repo)
+        if status is not None:
+            data[repo[CONF_REPO_NAME]] = status
+        return data
+
+    async def async_check_repository(self, repo_name: str) -> None:
+        """Check a repository right away and publish its status."""
+        for repo in self.repositories:
+            if repo[CONF_REPO_NAME] == repo_name:
+                status = await self._async_check_repository(repo)
+                if status is not None:
+                    self.async_set_updated_data(
+                        {**(self.data or {}), repo_name: status}
+                    )
+                return
+
+    async def _async_check_repository(
+        self, repo: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Return the status of a repository, installing it if its head moved.
+
+        Returns None if the head commit could not be determined.
+        """
+        repo_name = repo[CONF_REPO_NAME]
+        latest = await self.repo_manager.async_get_latest_commit(
+            repo[CONF_REPO_URL], repo.get(CONF_REF)
+        )
+        if latest is None:
+            _LOGGER.warning("Could not check %s for updates", repo_name)
+            return None
+
+        installed = self.repo_manager.install_state.installed_commit(repo_name)
+        if installed != latest:
+            _LOGGER.info(
+                "Repository %s moved to %s, installing wakewords", repo_name, latest[:7]
+            )
+            results = await self.repo_manager.install_repositories([repo])
+            if results.get(repo_name):
+                _LOGGER.warning(
+                    "Update of %s failed: %s", repo_name, results[repo_name]
+                )
+            installed = self.repo_manager.install_state.installed_commit(repo_name)
+
+        return {
+            "installed_commit": installed,
+            "latest_commit": latest,
+            "last_checked": dt_util.utcnow().isoformat(),
+        }
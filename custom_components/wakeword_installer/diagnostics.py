@@ -0,0 +1,41 @@
+"""Diagnostics support for Wakeword Installer."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_GITHUB_TOKEN, CONF_MIRROR_URL, DATA_SETUP_DURATIONS, DOMAIN
+from .repository_manager import async_get_repository_manager
+
+# The mirror URL may contain credentials
+TO_REDACT = {CONF_GITHUB_TOKEN, CONF_MIRROR_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    repo_manager = async_get_repository_manager(hass)
+    setup_durations = hass.data.get(DOMAIN, {}).get(DATA_SETUP_DURATIONS, {})
+    download = repo_manager.last_download_stats
+    limiter = repo_manager.rate_limiter
+
+    return {
+        "entry": {
+            "data": dict(entry.data),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "setup_seconds": setup_durations.get(entry.entry_id),
+        "loop_lag_seconds": dict(repo_manager.loop_lag),
+        "worker_pool": repo_manager.worker_pool.stats()._asdict(),
+        "rate_limit": {
+            "limit": limiter.limit,
+            "remaining": limiter.remaining,
+            "reset_at": limiter.reset_at,
+        },
+        "last_download": download._asdict() if download is not None else None,
+        "traces": repo_manager.traces.as_list(),
+    }
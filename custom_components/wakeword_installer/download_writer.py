@@ -0,0 +1,121 @@
+"""Buffered file writer for streaming downloads to disk."""
+from __future__ import annotations
+
+from pathlib import Path
+import time
+from typing import BinaryIO, NamedTuple
+
+from homeassistant.core import HomeAssistant
+
+MIN_BUFFER_SIZE = 256 * 1024
+MAX_BUFFER_SIZE = 8 * 1024 * 1024
+# Aim for one write per interval, so slow links still flush regularly while
+# fast links write in large blocks.
+TARGET_FLUSH_INTERVAL = 0.5  # seconds
+
+
+class BufferedFileWriter:
+    """Coalesce downloaded chunks into large writes made in the executor.
+
+    Network chunks are collected in memory and written in one executor job
+    once the buffer is full. The buffer size adapts to the observed
+    throughput between ``MIN_BUFFER_SIZE`` and ``MAX_BUFFER_SIZE``. The CPU
+    time of the writes is measured on the executor thread doing them, so it
+    excludes the work of anything else running in the process.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        file_path: Path,
+        append: bool = False,
+        min_buffer_size: int = MIN_BUFFER_SIZE,
+        max_buffer_size: int = MAX_BUFFER_SIZE,
+    ) -> None:
+        """Initialize the writer."""
+        self.hass = hass
+        self.file_path = file_path
+        self._mode = "ab" if append else "wb"
+        self._min_buffer_size = min_buffer_size
+        self._max_buffer_size = max_buffer_size
+        self._buffer_size = min_buffer_size
+        self._buffer = bytearray()
+        self._file: BinaryIO | None = None
+        self._last_flush = 0.0
+        self.bytes_written = 0
+        self.write_calls = 0
+        self.cpu_seconds = 0.0
+
+    async def __aenter__(self) -> BufferedFileWriter:
+        """Open the file."""
+        self._file = await self.hass.async_add_executor_job(
+            open, self.file_path, self._mode
+        )
+        self._last_flush = time.monotonic()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Write the remaining data and close the file."""
+        try:
+            await self.flush()
+        finally:
+            if self._file is not None:
+                await self.hass.async_add_executor_job(self._file.close)
+                self._file = None
+
+    async def write(self, data: bytes) -> None:
+        """Buffer data and write it out once the buffer is full."""
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all buffered data to the file."""
+        if not self._buffer or self._file is None:
+            return
+
+        # Hand the buffer over instead of copying up to MAX_BUFFER_SIZE bytes
+        # on the event loop
+        data, self._buffer = self._buffer, bytearray()
+        await self.hass.async_add_executor_job(self._write_sync, self._file, data)
+        self.bytes_written += len(data)
+        self.write_calls += 1
+
+        now = time.monotonic()
+        elapsed = now - self._last_flush
+        self._last_flush = now
+        if elapsed > 0:
+            target = int(len(data) / elapsed * TARGET_FLUSH_INTERVAL)
+            self._buffer_size = max(
+                self._min_buffer_size, min(self._max_buffer_size, target)
+            )
+
+    def _write_sync(self, file: BinaryIO, data: bytearray) -> None:
+        """Write data to the file and count the thread's CPU time."""
+        started = time.thread_time()
+        file.write(data)
+        self.cpu_seconds += time.thread_time() - started
+
+
+class DownloadStats(NamedTuple):
+    """Throughput and cost of a completed download."""
+
+    bytes: int
+    seconds: float
+    # Spent by the writes on their executor threads
+    cpu_seconds: float
+    write_calls: int
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Return the throughput in MB/s."""
+        if self.seconds <= 0:
+            return 0.0
+        return self.bytes / self.seconds / 1e6
+
+    @property
+    def cpu_ms_per_megabyte(self) -> float:
+        """Return the CPU time spent writing per MB downloaded."""
+        if not self.bytes:
+            return 0.0
+        return self.cpu_seconds * 1000 / (self.bytes / 1e6)
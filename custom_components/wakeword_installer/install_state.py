@@ -0,0 +1,268 @@
+"""Persistent record of what has been installed from each repository."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "%s.install_state" % DOMAIN
+
+SAVE_DELAY = 5  # seconds
+
+
+class InstallState:
+    """Track what has been installed from each repository.
+
+    Besides the commit and languages of each repository, the state holds an
+    index of every installed file mapping it to its repository, language,
+    source path, size and hash. The index is ``None`` until it has been
+    built, e.g. when upgrading from a version that did not keep it. The
+    number of indexed files per hash tells when a blob of the blob store
+    is no longer referenced. The number and total size of the files of
+    each repository are kept up to date as files are added and removed,
+    so reading them is cheap.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the install state."""
+        self.hass = hass
+        self._repositories: dict[str, dict[str, Any]] = {}
+        self._files: dict[str, dict[str, Any]] | None = None
+        self._files_by_repo: dict[str, set[str]] = {}
+        self._references: Counter[str] = Counter()
+        self._bytes_by_repo: Counter[str] = Counter()
+        self._store: Store | None = None
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the install state from storage once."""
+        if self._loaded:
+            return
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            self._store = Store(self.hass, STORAGE_VERSION, STORAGE_KEY)
+            stored = await self._store.async_load()
+            if stored:
+                self._repositories = stored.get("repositories", {})
+                if "files" in stored:
+                    self._set_files(stored["files"])
+            self._loaded = True
+
+    @property
+    def index_built(self) -> bool:
+        """Return True if the file index is available."""
+        return self._files is not None
+
+    @property
+    def repository_names(self) -> list[str]:
+        """Return the names of all repositories with an install record."""
+        return list(self._repositories)
+
+    def get_repository(self, repo_name: str) -> dict[str, Any] | None:
+        """Return the install record of a repository."""
+        return self._repositories.get(repo_name)
+
+    def installed_commit(self, repo_name: str) -> str | None:
+        """Return the commit a repository was installed from."""
+        record = self._repositories.get(repo_name)
+        commit: str | None = record.get("commit") if record else None
+        return commit
+
+    def is_up_to_date(
+        self, repo_name: str, commit: str | None, languages: list[str]
+    ) -> bool:
+        """Return True if the languages are already installed from the commit."""
+        record = self._repositories.get(repo_name)
+        if commit is None or record is None or record.get("commit") != commit:
+            return False
+        return set(languages) <= set(record.get("languages", []))
+
+    def set_repository(
+        self,
+        repo_name: str,
+        repo_url: str,
+        commit: str | None,
+        languages: list[str],
+    ) -> None:
+        """Record a successful installation."""
+        record = self._repositories.get(repo_name)
+        if record is not None and commit is not None and record.get("commit") == commit:
+            # Same revision: the previously installed languages are still current
+            languages = sorted(set(record.get("languages", [])) | set(languages))
+
+        self._repositories[repo_name] = {
+            "repo_url": repo_url,
+            "commit": commit,
+            "languages": sorted(languages),
+            "installed_at": time.time(),
+        }
+        self._async_schedule_save()
+
+    def remove_repository(self, repo_name: str) -> None:
+        """Forget the install record of a repository."""
+        if self._repositories.pop(repo_name, None) is not None:
+            self._async_schedule_save()
+
+    def remove_languages(self, repo_name: str, languages: list[str]) -> None:
+        """Forget installed languages of a repository."""
+        record = self._repositories.get(repo_name)
+        if record is None:
+            return
+        record["languages"] = [
+            language for language in record["languages"] if language not in languages
+        ]
+        self._async_schedule_save()
+
+    def get_file(self, filename: str) -> dict[str, Any] | None:
+        """Return the index entry of an installed file."""
+        return (self._files or {}).get(filename)
+
+    def get_files(
+        self, repo_name: str, languages: list[str] | None = None
+    ) -> list[str]:
+        """Return the installed files of a repository, optionally by language."""
+        filenames = self._files_by_repo.get(repo_name, set())
+        if languages is None:
+            return sorted(filenames)
+        files = self._files or {}
+        return sorted(
+            filename
+            for filename in filenames
+            if files[filename]["language"] in languages
+        )
+
+    def installed_languages(self, repo_name: str) -> list[str]:
+        """Return the languages of a repository that are recorded or on disk."""
+        record = self._repositories.get(repo_name) or {}
+        files = self._files or {}
+        languages = set(record.get("languages", []))
+        languages.update(
+            files[filename]["language"]
+            for filename in self._files_by_repo.get(repo_name, set())
+        )
+        return sorted(languages)
+
+    def file_count(self, repo_name: str) -> int:
+        """Return the number of installed files of a repository."""
+        return len(self._files_by_repo.get(repo_name, ()))
+
+    def total_size(self, repo_name: str) -> int:
+        """Return the total size in bytes of the installed files of a repository."""
+        return self._bytes_by_repo[repo_name]
+
+    def references(self, sha256: str) -> int:
+        """Return how many installed files have the given content."""
+        return self._references[sha256]
+
+    def files_by_language(self) -> dict[str, list[str]]:
+        """Return all installed files grouped by language."""
+        installed: dict[str, list[str]] = {}
+        for filename, entry in (self._files or {}).items():
+            installed.setdefault(entry["language"], []).append(filename)
+        return installed
+
+    def add_file(
+        self,
+        filename: str,
+        repo_name: str,
+        language: str,
+        source: str,
+        size: int,
+        sha256: str,
+        git_sha: str | None = None,
+        stat: list[int] | None = None,
+    ) -> None:
+        """Record an installed file.
+
+        The git blob SHA is cached for the file's size, modification time
+        and inode given by ``stat``.
+        """
+        if self._files is None:
+            self._files = {}
+        previous = self._files.get(filename)
+        if previous is not None:
+            self._files_by_repo.get(previous["repo"], set()).discard(filename)
+            self._unreference(previous)
+
+        self._files[filename] = {
+            "repo": repo_name,
+            "language": language,
+            "source": source,
+            "size": size,
+            "sha256": sha256,
+            "git_sha": git_sha,
+            "stat": stat,
+        }
+        self._files_by_repo.setdefault(repo_name, set()).add(filename)
+        self._bytes_by_repo[repo_name] += size
+        self._references[sha256] += 1
+        self._async_schedule_save()
+
+    def remove_file(self, filename: str) -> None:
+        """Forget an installed file."""
+        if self._files is None:
+            return
+        entry = self._files.pop(filename, None)
+        if entry is None:
+            return
+        self._files_by_repo.get(entry["repo"], set()).discard(filename)
+        self._unreference(entry)
+        self._async_schedule_save()
+
+    def replace_files(self, files: dict[str, dict[str, Any]]) -> None:
+        """Replace the whole file index."""
+        self._set_files(files)
+        self._async_schedule_save()
+
+    def _set_files(self, files: dict[str, dict[str, Any]]) -> None:
+        """Set the file index and its per-repository lookup."""
+        self._files = dict(files)
+        self._files_by_repo = {}
+        self._bytes_by_repo = Counter()
+        self._references = Counter()
+        for filename, entry in self._files.items():
+            self._files_by_repo.setdefault(entry["repo"], set()).add(filename)
+            self._bytes_by_repo[entry["repo"]] += entry.get("size") or 0
+            if entry.get("sha256"):
+                self._references[entry["sha256"]] += 1
+
+    def _unreference(self, entry: dict[str, Any]) -> None:
+        """Drop the size and content reference of a file index entry."""
+        self._bytes_by_repo[entry["repo"]] -= entry.get("size") or 0
+        if self._bytes_by_repo[entry["repo"]] <= 0:
+            del self._bytes_by_repo[entry["repo"]]
+        sha256 = entry.get("sha256")
+        if sha256 and self._references[sha256] > 0:
+            self._references[sha256] -= 1
+            if not self._references[sha256]:
+                del self._references[sha256]
+
+    async def async_flush(self) -> None:
+        """Write the install state to storage now instead of after the save delay."""
+        if self._loaded and self._store is not None:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule writing the install state to storage."""
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        data: dict[str, Any] = {"repositories": self._repositories}
+        if self._files is not None:
+            data["files"] = self._files
+        return data
@@ -0,0 +1,97 @@
+"""Repository path layouts for locating wakeword models."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import re
+from typing import NamedTuple
+
+LANGUAGE_PLACEHOLDER = "{language}"
+
+
+class PlannedFile(NamedTuple):
+    """A repository file selected for installation."""
+
+    path: str
+    language: str
+    size: int
+
+
+class PathLayout:
+    """Match repository paths against a layout such as ``{language}/**/*.tflite``.
+
+    Layout segments are separated by ``/``. ``**`` matches any number of
+    directories, ``*`` and ``?`` match within a single segment and
+    ``{language}`` captures the language of the file. The layout is compiled
+    to a single regular expression once, so classifying a path is one match
+    plus a set lookup regardless of how many languages are selected.
+    """
+
+    def __init__(self, layout: str) -> None:
+        """Compile the layout."""
+        if layout.count(LANGUAGE_PLACEHOLDER) != 1:
+            raise ValueError(
+                "Layout must contain %s exactly once" % LANGUAGE_PLACEHOLDER
+            )
+
+        segments = layout.strip("/").split("/")
+        if segments[-1] == "**":
+            raise ValueError("Layout must end with a file name pattern")
+
+        self.layout = layout
+        pattern = ""
+        for segment in segments[:-1]:
+            if segment == "**":
+                pattern += "(?:[^/]+/)*"
+            elif not segment:
+                raise ValueError("Layout must not contain empty segments")
+            else:
+                pattern += _translate_segment(segment) + "/"
+        pattern += _translate_segment(segments[-1])
+        self._regex = re.compile(pattern + r"\Z")
+
+    def match(self, path: str) -> str | None:
+        """Return the language of a path, or None if it does not match."""
+        match = self._regex.match(path)
+        return match.group("language") if match else None
+
+    def plan(
+        self,
+        entries: Iterable[tuple[str, int]],
+        selected_languages: Iterable[str],
+        strip_root: bool = False,
+    ) -> list[PlannedFile]:
+        """Select the ``(path, size)`` entries of the selected languages.
+
+        With ``strip_root`` the first path segment is ignored when matching,
+        as in GitHub archives where every entry lives below ``<repo>-<ref>/``.
+        """
+        selected = set(selected_languages)
+        planned = []
+        for path, size in entries:
+            relative = path
+            if strip_root:
+                _, _, relative = path.partition("/")
+            language = self.match(relative)
+            if language is not None and language in selected:
+                planned.append(PlannedFile(path, language, size))
+        return planned
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate one glob segment to a regular expression."""
+    pattern = ""
+    rest = segment
+    while rest:
+        if rest.startswith(LANGUAGE_PLACEHOLDER):
+            pattern += "(?P<language>[^/]+?)"
+            rest = rest[len(LANGUAGE_PLACEHOLDER) :]
+        elif rest[0] == "*":
+            pattern += "[^/]*"
+            rest = rest[1:]
+        elif rest[0] == "?":
+            pattern += "[^/]"
+            rest = rest[1:]
+        else:
+            pattern += re.escape(rest[0])
+            rest = rest[1:]
+    return pattern
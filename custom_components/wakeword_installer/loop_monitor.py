@@ -0,0 +1,63 @@
+"""Measurement of event loop stalls."""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+
+LOOP_LAG_INTERVAL = 0.01  # seconds
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a periodic timer.
+
+    While the monitor is entered, a task sleeps for ``interval`` over and
+    over. Any extra time it takes to wake up is time during which the loop
+    was blocked. The worst stall is always tracked; every sample is only
+    kept with ``keep_samples``, e.g. for percentiles in benchmarks.
+    """
+
+    def __init__(
+        self, interval: float = LOOP_LAG_INTERVAL, keep_samples: bool = False
+    ) -> None:
+        """Initialize the monitor."""
+        self._interval = interval
+        self._keep_samples = keep_samples
+        self._task: asyncio.Task | None = None
+        self.max_lag = 0.0
+        self.samples: list[float] = []
+
+    async def __aenter__(self) -> LoopLagMonitor:
+        """Start sampling."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Record the lag of every timer wake-up."""
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            lag = max(time.perf_counter() - started - self._interval, 0.0)
+            self.max_lag = max(self.max_lag, lag)
+            if self._keep_samples:
+                self.samples.append(lag)
+
+    def summary(self) -> dict[str, float]:
+        """Return the maximum, 99th percentile and mean lag in milliseconds."""
+        samples = sorted(self.samples) or [self.max_lag]
+        p99 = samples[min(len(samples) - 1, math.ceil(len(samples) * 0.99) - 1)]
+        return {
+            "loop_lag_max_ms": self.max_lag * 1000,
+            "loop_lag_p99_ms": p99 * 1000,
+            "loop_lag_mean_ms": sum(samples) / len(samples) * 1000,
+        }
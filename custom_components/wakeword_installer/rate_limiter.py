@@ -0,0 +1,134 @@
+"""Scheduling of GitHub API requests within the rate limit."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+import logging
+import time
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+# Requests kept back from background work so config flows keep working
+INTERACTIVE_RESERVE = 5
+# Background requests are spread over the rest of the rate limit window
+# once less than this fraction of the budget is left.
+SPACING_THRESHOLD = 0.25
+INTERACTIVE_MAX_WAIT = 10  # seconds
+BACKGROUND_MAX_WAIT = 300  # seconds
+
+
+class RateLimitExceeded(HomeAssistantError):
+    """Raised when the GitHub API rate limit does not allow a request."""
+
+    def __init__(self, retry_at: float) -> None:
+        """Initialize the error."""
+        super().__init__(
+            "GitHub API rate limit exceeded, retry after %s"
+            % time.strftime("%H:%M:%S", time.localtime(retry_at))
+        )
+        self.retry_at = retry_at
+
+
+class GitHubRateLimiter:
+    """Fit GitHub API requests into the remaining rate limit budget.
+
+    The budget is taken from the ``X-RateLimit-*`` headers of every
+    response and ``Retry-After`` blocks all requests until it has passed.
+    Interactive requests, e.g. from config flows, may use the whole budget
+    and never wait behind background requests. Background requests leave
+    ``INTERACTIVE_RESERVE`` requests untouched, are spaced out evenly once
+    the budget runs low and are deferred until the window resets when it
+    is used up.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the rate limiter."""
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        self._blocked_until = 0.0
+        self._next_background = 0.0
+        self._background_lock = asyncio.Lock()
+
+    async def async_acquire(self, priority: int = PRIORITY_BACKGROUND) -> None:
+        """Wait until a request of the priority fits the budget."""
+        if priority == PRIORITY_INTERACTIVE:
+            await self._async_wait(priority, INTERACTIVE_MAX_WAIT)
+            return
+
+        # Background requests are admitted one at a time so spacing holds
+        async with self._background_lock:
+            await self._async_wait(priority, BACKGROUND_MAX_WAIT)
+
+    async def _async_wait(self, priority: int, max_wait: float) -> None:
+        """Sleep until the request may be sent and account for it."""
+        now = time.time()
+        delay = self.delay(priority, now)
+        if delay > max_wait:
+            raise RateLimitExceeded(now + delay)
+        if delay > 0:
+            _LOGGER.debug("Deferring GitHub API request by %.1f seconds", delay)
+            await asyncio.sleep(delay)
+            now = time.time()
+
+        if priority != PRIORITY_INTERACTIVE:
+            self._next_background = now + self._spacing(now)
+        if self.remaining is not None and now < self.reset_at:
+            self.remaining -= 1
+
+    def delay(self, priority: int, now: float) -> float:
+        """Return how long a request of the priority has to wait."""
+        delay = max(0.0, self._blocked_until - now)
+        if self.remaining is None or now >= self.reset_at:
+            return delay
+
+        if priority == PRIORITY_INTERACTIVE:
+            if self.remaining <= 0:
+                delay = max(delay, self.reset_at - now)
+            return delay
+
+        if self.remaining <= INTERACTIVE_RESERVE:
+            return max(delay, self.reset_at - now)
+        return max(delay, self._next_background - now)
+
+    def _spacing(self, now: float) -> float:
+        """Return the gap to leave before the next background request."""
+        if self.remaining is None or self.limit is None or now >= self.reset_at:
+            return 0.0
+        budget = self.remaining - INTERACTIVE_RESERVE
+        if budget <= 0 or self.remaining > self.limit * SPACING_THRESHOLD:
+            return 0.0
+        return (self.reset_at - now) / budget
+
+    def update(self, status: int, headers: Mapping[str, str]) -> None:
+        """Update the budget from the headers of a response."""
+        now = time.time()
+        try:
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+            if "Retry-After" in headers:
+                self._blocked_until = now + float(headers["Retry-After"])
+        except ValueError:
+            _LOGGER.debug("Ignoring malformed rate limit headers: %s", headers)
+            return
+
+        if status in (403, 429) and self.remaining == 0:
+            self._blocked_until = max(self._blocked_until, self.reset_at)
+
+    def is_limited(self, status: int) -> bool:
+        """Return True if a response status is a rate limit rejection."""
+        return status in (403, 429) and self._blocked_until > time.time()
+
+    @property
+    def retry_at(self) -> float:
+        """Return when requests are allowed again after a rejection."""
+        return max(self._blocked_until, time.time())
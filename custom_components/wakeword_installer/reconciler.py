@@ -0,0 +1,134 @@
+"""Reconcile installed wakewords with the configured repositories."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, NamedTuple
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import CONF_REF, CONF_REPO_NAME, CONF_REPO_URL, CONF_SELECTED_LANGUAGES
+from .repository_manager import RepositoryManager
+
+_LOGGER = logging.getLogger(__name__)
+
+ACTION_ADD = "add"
+ACTION_UPDATE = "update"
+ACTION_DELETE = "delete"
+
+
+class Operation(NamedTuple):
+    """A change that brings a repository closer to its desired state."""
+
+    action: str
+    repository: str
+    languages: list[str]
+
+
+class Reconciler:
+    """Compute and apply the difference between desired and installed wakewords.
+
+    The desired state is the list of configured repositories with their
+    selected languages, the actual state the install records and the file
+    index. The plan adds languages that are missing, updates repositories
+    whose upstream commit moved and deletes languages that are no longer
+    selected as well as repositories that are no longer configured. Only
+    repositories with an install record are ever deleted, so files placed
+    in the install directory by hand are left alone.
+    """
+
+    def __init__(self, repo_manager: RepositoryManager) -> None:
+        """Initialize the reconciler."""
+        self.repo_manager = repo_manager
+
+    async def async_plan(
+        self, repositories: list[dict[str, Any]], check_updates: bool = True
+    ) -> list[Operation]:
+        """Return the operations needed to reach the desired state.
+
+        With ``check_updates`` the upstream commit of every installed
+        repository is looked up, otherwise only the configuration is
+        compared with the install state and no requests are made.
+        """
+        await self.repo_manager.async_load_state()
+        state = self.repo_manager.install_state
+        desired = {repo[CONF_REPO_NAME]: repo for repo in repositories}
+
+        latest: dict[str, str | None] = {}
+        if check_updates:
+            names = [name for name in desired if state.get_repository(name)]
+            commits = await asyncio.gather(
+                *(
+                    self.repo_manager.async_get_latest_commit(
+                        desired[name][CONF_REPO_URL], desired[name].get(CONF_REF)
+                    )
+                    for name in names
+                )
+            )
+            latest = dict(zip(names, commits))
+
+        plan = []
+        for name, repo in desired.items():
+            selected = set(repo.get(CONF_SELECTED_LANGUAGES, []))
+            record = state.get_repository(name)
+            if record is None:
+                if selected:
+                    plan.append(Operation(ACTION_ADD, name, sorted(selected)))
+            elif latest.get(name) and latest[name] != record.get("commit"):
+                if selected:
+                    plan.append(Operation(ACTION_UPDATE, name, sorted(selected)))
+            elif missing := selected - set(record.get("languages", [])):
+                plan.append(Operation(ACTION_ADD, name, sorted(missing)))
+
+            if deselected := set(state.installed_languages(name)) - selected:
+                plan.append(Operation(ACTION_DELETE, name, sorted(deselected)))
+
+        for name in state.repository_names:
+            if name not in desired:
+                plan.append(
+                    Operation(ACTION_DELETE, name, state.installed_languages(name))
+                )
+        return plan
+
+    async def async_apply(
+        self, repositories: list[dict[str, Any]], plan: list[Operation]
+    ) -> dict[str, str]:
+        """Apply a plan and return the error of every repository that failed.
+
+        Installs run concurrently within the repository manager's limits,
+        deletions run alongside them.
+        """
+        desired = {repo[CONF_REPO_NAME]: repo for repo in repositories}
+        installs = [
+            {**desired[op.repository], CONF_SELECTED_LANGUAGES: op.languages}
+            for op in plan
+            if op.action != ACTION_DELETE
+        ]
+
+        async def _delete(op: Operation) -> tuple[str, str | None]:
+            try:
+                if op.repository in desired:
+                    await self.repo_manager.remove_wakewords(
+                        op.repository, op.languages
+                    )
+                else:
+                    await self.repo_manager.remove_repository_wakewords(
+                        op.repository
+                    )
+            except HomeAssistantError as err:
+                _LOGGER.error(
+                    "Failed to remove wakewords of %s: %s", op.repository, err
+                )
+                return op.repository, str(err)
+            return op.repository, None
+
+        install_results, *delete_results = await asyncio.gather(
+            self.repo_manager.install_repositories(installs),
+            *(_delete(op) for op in plan if op.action == ACTION_DELETE),
+        )
+
+        errors = {}
+        for name, error in [*install_results.items(), *delete_results]:
+            if error:
+                errors[name] = error
+        return errors
@@ -1,20 +1,57 @@
 """Repository manager for handling GitHub repositories and wakeword files."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
-import shutil
-import tempfile
-import zipfile
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from collections.abc import Set as AbstractSet
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import quote, urlparse
 
-import aiofiles
 import aiohttp
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import WAKEWORD_INSTALL_PATH
+from . import sources, tracing
+from .const import (
+    DOMAIN,
+    CACHE_DIR_NAME,
+    CONF_PATH_LAYOUT,
+    CONF_REF,
+    CONF_REPO_NAME,
+    CONF_REPO_URL,
+    CONF_REPOSITORIES,
+    CONF_SELECTED_LANGUAGES,
+    DATA_ENTRIES,
+    DATA_MANAGER,
+    DEFAULT_MAX_CONCURRENT_INSTALLS,
+    DEFAULT_MAX_INSTALLS_PER_HOST,
+    DEFAULT_PATH_LAYOUT,
+    DEFAULT_WORKER_THREADS,
+    WAKEWORD_INSTALL_PATH,
+)
+from .blob_store import BLOB_DIR_NAME, BlobStore
+from .download_writer import BufferedFileWriter, DownloadStats
+from .install_state import InstallState
+from .layout import PathLayout, PlannedFile
+from .loop_monitor import LoopLagMonitor
+from .rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GitHubRateLimiter,
+    RateLimitExceeded,
+)
+from .response_cache import ResponseCache
+from .worker_pool import WorkerPool
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,26 +59,198 @@ _LOGGER = logging.getLogger(__name__)
 HTTP_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=30)
 MAX_DOWNLOAD_SIZE = 500 * 1024 * 1024  # 500 MB
 
+# Downloads are limited by idle time rather than total duration, so large
+# archives on slow links are not cut off while data is still flowing.
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=30, sock_read=60)
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_RETRY_BACKOFF = 2  # seconds, doubled after every attempt
+DOWNLOAD_RETRY_MAX_DELAY = 60  # seconds
+DOWNLOAD_CACHE_MAX_AGE = 7 * 24 * 60 * 60  # seconds a partial archive is kept
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Connection pool tuning for the shared HTTP session
+HTTP_CONNECTION_LIMIT = 20
+HTTP_CONNECTION_LIMIT_PER_HOST = 8
+HTTP_KEEPALIVE_TIMEOUT = 60  # seconds an idle connection is kept open
+HTTP_DNS_CACHE_TTL = 300  # seconds
+
+GITHUB_URL = "https://github.com"
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+# GitHub resolves HEAD to the default branch for commits, trees, archives
+# and raw files, so repositories need no configured branch.
+DEFAULT_REF = "HEAD"
+COMMIT_SHA = re.compile(r"[0-9a-f]{40}")
+
+# Sparse installs download the selected files individually instead of the
+# repository archive. Large selections fall back to the archive, which is
+# a single request.
+SPARSE_MAX_FILES = 100
+SPARSE_MAX_FRACTION = 0.5  # of the repository's total size
+SPARSE_DOWNLOAD_CONCURRENCY = 6
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Concurrent installs are shared per repository URL, ref, name and layout
+InstallKey = tuple[str, str, str, str]
+
+
+@callback
+def async_get_repository_manager(hass: HomeAssistant) -> RepositoryManager:
+    """Return the repository manager shared by services, flows and setup.
+
+    The manager may be created by a config flow before any entry is set up,
+    so it closes itself when Home Assistant stops, unless unloading the last
+    entry closed it before.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_MANAGER not in domain_data:
+        repo_manager = RepositoryManager(hass)
+        domain_data[DATA_MANAGER] = repo_manager
+
+        async def _async_close_manager(event: Event) -> None:
+            """Close the HTTP session and worker threads."""
+            if domain_data.get(DATA_MANAGER) is repo_manager:
+                del domain_data[DATA_MANAGER]
+                await repo_manager.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_manager)
+    return domain_data[DATA_MANAGER]
+
 
 class RepositoryManager:
     """Manage GitHub repositories and wakeword installations."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent_installs: int = DEFAULT_MAX_CONCURRENT_INSTALLS,
+        max_installs_per_host: int = DEFAULT_MAX_INSTALLS_PER_HOST,
+    ) -> None:
         """Initialize the repository manager."""
         self.hass = hass
-        self.session = aiohttp.ClientSession(timeout=HTTP_TIMEOUT)
+        self.session: aiohttp.ClientSession | None = None
+        self._response_cache = ResponseCache(hass)
+        self.install_state = InstallState(hass)
+        self.last_download_stats: DownloadStats | None = None
+        # Worst event loop stall in seconds during the last run of each operation
+        self.loop_lag: dict[str, float] = {}
+        self.traces = tracing.TraceRecorder()
+        # Duration in seconds of the last install of each repository
+        self.install_durations: dict[str, float] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self.rate_limiter = GitHubRateLimiter()
+        # Extraction, hashing and scans run here instead of the shared executor
+        self.worker_pool = WorkerPool(DEFAULT_WORKER_THREADS)
+        self._github_token: str | None = None
+        self._mirror_url: str | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._running_installs: dict[InstallKey, _InstallFlight] = {}
+        self._queued_installs: dict[InstallKey, _InstallFlight] = {}
+        # Installs using the blob store, and blobs waiting for them to finish
+        self._blob_lock = asyncio.Lock()
+        self._blob_users = 0
+        self._pending_releases: set[str] = set()
+        self.set_install_limits(max_concurrent_installs, max_installs_per_host)
+
+    def set_install_limits(
+        self, max_concurrent_installs: int, max_installs_per_host: int
+    ) -> None:
+        """Set how many repositories may be installed concurrently."""
+        self._install_semaphore = asyncio.Semaphore(max_concurrent_installs)
+        self._max_installs_per_host = max_installs_per_host
+        self._host_semaphores = {}
+
+    def set_worker_threads(self, worker_threads: int) -> None:
+        """Set how many threads extract, hash and scan files."""
+        self.worker_pool.set_max_workers(worker_threads)
+
+    def set_github_token(self, token: str | None) -> None:
+        """Set the personal access token used for GitHub API requests."""
+        self._github_token = token or None
+
+    def set_mirror_url(self, mirror_url: str | None) -> None:
+        """Set the base URL of a mirror that GitHub requests are sent to.
+
+        Requests for ``https://<host>/<path>`` go to ``<mirror>/<host>/<path>``
+        instead. The GitHub token is never sent to the mirror.
+        """
+        self._mirror_url = mirror_url or None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            )
+            self.session = aiohttp.ClientSession(
+                timeout=HTTP_TIMEOUT,
+                connector=connector,
+                trace_configs=[tracing.http_trace_config()],
+            )
+        return self.session
 
     async def close(self) -> None:
-        """Close the aiohttp session."""
+        """Close the session, write pending state and stop the worker threads."""
         if self.session and not self.session.closed:
             await self.session.close()
+        await self.install_state.async_flush()
+        await self._response_cache.async_flush()
+        self.worker_pool.shutdown()
+
+    async def get_available_languages(
+        self,
+        repo_url: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        ref: str | None = None,
+        max_age: float | None = None,
+        path_layout: str | None = None,
+    ) -> list[str]:
+        """Get available language folders from a GitHub repository.
+
+        A cached listing younger than ``max_age`` seconds is returned
+        without contacting GitHub. The languages of a local source, or of a
+        GitHub repository with a custom layout, are those of its models that
+        match the path layout.
+        """
+        try:
+            layout = PathLayout(path_layout or DEFAULT_PATH_LAYOUT)
+        except ValueError as err:
+            raise HomeAssistantError("Invalid path layout: %s" % err) from err
+        if (source_path := sources.local_path(repo_url)) is not None:
+            try:
+                return await self.worker_pool.async_run(
+                    sources.list_languages, source_path, layout
+                )
+            except Exception as err:
+                raise HomeAssistantError(
+                    "Cannot read %s: %s" % (source_path, err)
+                ) from err
+
+        if layout.layout != DEFAULT_PATH_LAYOUT:
+            # The language folders need not be at the top of the repository,
+            # so the whole tree is matched against the layout.
+            tree = await self._async_get_tree(repo_url, ref or "HEAD")
+            if tree is None:
+                raise HomeAssistantError("Cannot list the files of %s" % repo_url)
+            return sorted(
+                {
+                    language
+                    for item in tree["files"]
+                    if not item["path"].startswith(".")
+                    and (language := layout.match(item["path"]))
+                }
+            )
 
-    async def get_available_languages(self, repo_url: str) -> list[str]:
-        """Get available language folders from a GitHub repository."""
         try:
             api_url = self._convert_to_api_url(repo_url)
+            if ref:
+                api_url = "%s?ref=%s" % (api_url, quote(ref, safe=""))
 
-            async with self.session.get(api_url) as response:
+            async def _parse(response: aiohttp.ClientResponse) -> list[str]:
                 if response.status != 200:
                     raise HomeAssistantError(
                         "Failed to fetch repository contents: %s" % response.status
@@ -56,6 +265,14 @@ class RepositoryManager:
                 ]
                 return sorted(languages)
 
+            return await self._async_cached_get(
+                api_url,
+                _parse,
+                priority=priority,
+                immutable=_is_commit_sha(ref),
+                max_age=max_age,
+            )
+
         except aiohttp.ClientError as err:
             _LOGGER.error("Network error while fetching repository: %s", err)
             raise HomeAssistantError("Cannot connect to repository: %s" % err)
@@ -65,40 +282,234 @@ class RepositoryManager:
             _LOGGER.error("Error parsing repository contents: %s", err)
             raise HomeAssistantError("Invalid repository structure: %s" % err)
 
+    async def _async_cached_get(
+        self,
+        url: str,
+        parse: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        headers: dict[str, str] | None = None,
+        priority: int = PRIORITY_BACKGROUND,
+        immutable: bool = False,
+        max_age: float | None = None,
+    ) -> Any:
+        """Fetch a GitHub API URL with a conditional request and parse it.
+
+        The parsed result is cached with the response's ETag and Last-Modified
+        validators. When the server answers 304 Not Modified the cached result
+        is returned without downloading or parsing the body again. Requests
+        are scheduled by the rate limiter according to their priority.
+        Immutable responses, i.e. those addressed by a commit SHA, are cached
+        indefinitely and returned without any request, as are responses
+        validated less than ``max_age`` seconds ago.
+        """
+        await self._response_cache.async_load()
+        cached = self._response_cache.get(url)
+        if cached is not None and (
+            immutable
+            or (max_age is not None and time.time() - cached["stored_at"] < max_age)
+        ):
+            _LOGGER.debug("Using cached response for %s without revalidation", url)
+            tracing.count("cache_hits")
+            return cached["data"]
+
+        request_url = sources.mirror_url(url, self._mirror_url)
+        headers = {**(headers or {}), **self._response_cache.conditional_headers(url)}
+        if self._github_token and request_url == url:
+            headers["Authorization"] = "Bearer %s" % self._github_token
+
+        await self.rate_limiter.async_acquire(priority)
+        tracing.count("api_requests")
+        async with self._get_session().get(request_url, headers=headers) as response:
+            self.rate_limiter.update(response.status, response.headers)
+            if self.rate_limiter.is_limited(response.status):
+                raise RateLimitExceeded(self.rate_limiter.retry_at)
+
+            cached = self._response_cache.get(url)
+            if response.status == 304 and cached is not None:
+                _LOGGER.debug("Using cached response for %s", url)
+                tracing.count("cache_hits")
+                self._response_cache.touch(url)
+                return cached["data"]
+
+            data = await parse(response)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if immutable or etag or last_modified:
+                self._response_cache.set(url, data, etag, last_modified, immutable)
+            return data
+
     async def install_wakewords(
         self,
         repo_url: str,
         selected_languages: list[str],
         repo_name: str | None = None,
-    ) -> None:
-        """Install wakeword files from repository for selected languages."""
+        force: bool = False,
+        path_layout: str | None = None,
+        ref: str | None = None,
+    ) -> bool:
+        """Install wakeword files from repository for selected languages.
+
+        The path layout tells where models live in the repository and
+        defaults to ``{language}/**/*.tflite``. The ref is a branch, tag or
+        commit SHA and defaults to the repository's default branch. Returns
+        False if the download was skipped because the selected languages
+        are already installed from the commit the ref points to.
+
+        Concurrent calls for the same repository share one install: a call
+        whose languages are covered by the running install waits for it,
+        other calls are merged into a single follow-up install of all
+        their languages that starts once the running one has finished.
+        """
+        if repo_name is None:
+            repo_name = self._extract_repo_name(repo_url)
+        # Safety: if repo_name looks like a URL, extract just the name
+        if "/" in repo_name:
+            repo_name = self._extract_repo_name(repo_name)
+
+        ref = ref or DEFAULT_REF
+        key = (repo_url, ref, repo_name, path_layout or DEFAULT_PATH_LAYOUT)
+        languages = set(selected_languages)
+
+        running = self._running_installs.get(key)
+        if running is not None and running.covers(languages, force):
+            _LOGGER.debug("Joining the running install of %s", repo_name)
+            return await asyncio.shield(running.task)
+
+        queued = self._queued_installs.get(key)
+        if queued is None:
+            queued = _InstallFlight(languages, force)
+            self._queued_installs[key] = queued
+            queued.task = asyncio.get_running_loop().create_task(
+                self._async_run_flight(key, queued, running, repo_name)
+            )
+        else:
+            _LOGGER.debug("Merging into the queued install of %s", repo_name)
+            queued.languages |= languages
+            queued.force |= force
+        return await asyncio.shield(queued.task)
+
+    async def _async_run_flight(
+        self,
+        key: InstallKey,
+        flight: _InstallFlight,
+        previous: _InstallFlight | None,
+        repo_name: str,
+    ) -> bool:
+        """Run a queued install once the previous one has finished."""
+        if previous is not None:
+            await asyncio.wait([previous.task])
+
+        del self._queued_installs[key]
+        self._running_installs[key] = flight
+        repo_url, ref, _, path_layout = key
+        try:
+            async with self._async_trace("install", repo_name):
+                return await self._install_wakewords(
+                    repo_url,
+                    sorted(flight.languages),
+                    repo_name,
+                    flight.force,
+                    path_layout,
+                    ref,
+                )
+        finally:
+            if self._running_installs.get(key) is flight:
+                del self._running_installs[key]
+
+    async def _install_wakewords(
+        self,
+        repo_url: str,
+        selected_languages: list[str],
+        repo_name: str,
+        force: bool,
+        path_layout: str,
+        ref: str,
+    ) -> bool:
+        """Download and install the selected languages of a repository.
+
+        Archives of a pinned commit are kept in the cache and reused, as
+        they can never change. Local sources are installed straight from
+        their directory or archive, with their fingerprint in place of the
+        commit.
+        """
         try:
+            layout = PathLayout(path_layout)
+
             install_path = Path(WAKEWORD_INSTALL_PATH)
             await self.hass.async_add_executor_job(
                 install_path.mkdir, 0o777, True, True
             )
 
-            if repo_name is None:
-                repo_name = self._extract_repo_name(repo_url)
-            # Safety: if repo_name looks like a URL, extract just the name
-            if "/" in repo_name:
-                repo_name = self._extract_repo_name(repo_name)
-
-            download_url = self._get_download_url(repo_url)
+            await self.async_load_state()
+            with tracing.phase("resolve"):
+                commit = await self._async_resolve_commit(repo_url, ref)
+            if (
+                not force
+                and commit is not None
+                and self.install_state.is_up_to_date(
+                    repo_name, commit, selected_languages
+                )
+            ):
+                _LOGGER.info(
+                    "Wakewords from %s are up to date (commit %s)",
+                    repo_name,
+                    commit[:7],
+                )
+                tracing.count("up_to_date")
+                return False
 
-            with tempfile.TemporaryDirectory() as temp_dir:
-                zip_path = Path(temp_dir) / "repo.zip"
+            source_ref = commit or ref
+            source_path = sources.local_path(repo_url)
+            tree = None
+            if source_path is None:
+                with tracing.phase("tree"):
+                    tree = await self._async_get_tree(repo_url, source_ref)
+            git_shas = {}
+            unchanged: set[str] = set()
+            if tree is not None and not tree["truncated"]:
+                # Without a commit the tree and the download may see
+                # different revisions, so their blob SHAs are not recorded.
+                if commit is not None:
+                    git_shas = {item["path"]: item["sha"] for item in tree["files"]}
+                if not force:
+                    with tracing.phase("compare"):
+                        unchanged = await self._async_find_unchanged(
+                            repo_name, tree, selected_languages, layout, install_path
+                        )
+                    tracing.count("files_unchanged", len(unchanged))
+            files = self._plan_sparse_install(
+                tree, selected_languages, layout, unchanged
+            )
 
-                await self._download_file(download_url, zip_path)
+            async with self._async_use_blobs():
+                if source_path is not None:
+                    await self._local_install(
+                        source_path, selected_languages, install_path, repo_name, layout
+                    )
+                elif files is not None:
+                    await self._sparse_install(
+                        repo_url, source_ref, files, install_path, repo_name, git_shas
+                    )
+                else:
+                    await self._archive_install(
+                        self._get_download_url(repo_url, source_ref),
+                        _is_commit_sha(ref),
+                        selected_languages,
+                        install_path,
+                        repo_name,
+                        layout,
+                        unchanged,
+                        git_shas,
+                    )
 
-                await self._extract_and_install(
-                    zip_path, selected_languages, install_path, repo_name, temp_dir
-                )
+            self.install_state.set_repository(
+                repo_name, repo_url, commit, selected_languages
+            )
 
             _LOGGER.info(
                 "Successfully installed wakewords for languages: %s",
                 selected_languages,
             )
+            return True
 
         except HomeAssistantError:
             raise
@@ -106,8 +517,426 @@ class RepositoryManager:
             _LOGGER.error("Failed to install wakewords: %s", err)
             raise HomeAssistantError("Installation failed: %s" % err)
 
+    async def _archive_install(
+        self,
+        download_url: str,
+        pinned: bool,
+        selected_languages: list[str],
+        install_path: Path,
+        repo_name: str,
+        layout: PathLayout,
+        unchanged: set[str],
+        git_shas: dict[str, str],
+    ) -> None:
+        """Download the repository archive and install the selected models."""
+        zip_path = await self._async_prepare_archive_path(download_url, pinned)
+        if pinned and await self.hass.async_add_executor_job(
+            _is_complete_download, zip_path
+        ):
+            _LOGGER.debug("Using cached archive %s", download_url)
+            tracing.count("cache_hits")
+        else:
+            # A partial archive is kept when the download fails so the next
+            # attempt can resume it.
+            with tracing.phase("download"):
+                await self._download_file(download_url, zip_path)
+
+        keep = pinned
+        try:
+            await self._extract_and_install(
+                zip_path,
+                selected_languages,
+                install_path,
+                repo_name,
+                layout,
+                unchanged,
+                git_shas,
+            )
+        except Exception:
+            keep = False
+            raise
+        finally:
+            if not keep:
+                await self.hass.async_add_executor_job(zip_path.unlink, True)
+
+    async def _local_install(
+        self,
+        source_path: Path,
+        selected_languages: list[str],
+        install_path: Path,
+        repo_name: str,
+        layout: PathLayout,
+    ) -> None:
+        """Install the selected models from a local directory or archive.
+
+        Archives go through the same extraction as downloaded ones. Models
+        of a directory are copied into the blob store, which only reads them
+        once their content is stored already, and linked into place.
+        """
+        if not await self.hass.async_add_executor_job(source_path.is_dir):
+            await self._extract_and_install(
+                source_path,
+                selected_languages,
+                install_path,
+                repo_name,
+                layout,
+                strip_root=None,
+            )
+            return
+
+        blobs = self._blob_store()
+
+        def copy_sync() -> tuple[list[_InstalledFile], list[str]]:
+            installed = []
+            failed = []
+            with tracing.phase("scan"):
+                files = layout.plan(
+                    sources.scan_directory(source_path), selected_languages
+                )
+            for file in files:
+                new_name = _installed_name(repo_name, file.language, file.path)
+                try:
+                    with tracing.phase("store"):
+                        size, sha256 = blobs.add_copy(source_path / file.path)
+                    with tracing.phase("link"):
+                        stat = blobs.link(sha256, install_path / new_name)
+                except OSError as err:
+                    _LOGGER.warning("Failed to install %s: %s", file.path, err)
+                    failed.append(file.path)
+                    continue
+                installed.append(
+                    _InstalledFile(
+                        new_name,
+                        file.language,
+                        file.path,
+                        size,
+                        sha256,
+                        None,
+                        _stat_key(stat),
+                    )
+                )
+                _LOGGER.info("Installed wakeword: %s", new_name)
+            return installed, failed
+
+        installed, failed = await self.worker_pool.async_run(copy_sync)
+        await self._async_record_files(repo_name, installed)
+        _raise_for_failed(failed)
+
+    async def async_get_latest_commit(
+        self, repo_url: str, ref: str | None = None
+    ) -> str | None:
+        """Return the commit a ref, by default the default branch, points to."""
+        return await self._async_resolve_commit(repo_url, ref or DEFAULT_REF)
+
+    async def _async_resolve_commit(
+        self, repo_url: str, ref: str = DEFAULT_REF
+    ) -> str | None:
+        """Return the commit SHA a ref currently points to.
+
+        Uses a conditional request for the bare SHA, so an unchanged ref costs
+        a 304 response, and a full commit SHA needs no request at all. Returns
+        None if the commit cannot be resolved; callers then fall back to a
+        full install. Local sources have no commits; their fingerprint is
+        returned instead.
+        """
+        if (source_path := sources.local_path(repo_url)) is not None:
+            try:
+                return await self.worker_pool.async_run(
+                    sources.fingerprint, source_path
+                )
+            except OSError as err:
+                _LOGGER.debug("Could not read %s: %s", source_path, err)
+                return None
+        if _is_commit_sha(ref):
+            return ref
+
+        url = "%s/repos/%s/commits/%s" % (
+            GITHUB_API_URL,
+            self._get_repo_path(repo_url),
+            quote(ref),
+        )
+
+        async def _parse(response: aiohttp.ClientResponse) -> str:
+            if response.status != 200:
+                raise HomeAssistantError(
+                    "Failed to resolve %s: %s" % (ref, response.status)
+                )
+            return (await response.text()).strip()
+
+        try:
+            return await self._async_cached_get(
+                url, _parse, headers={"Accept": "application/vnd.github.sha"}
+            )
+        except Exception as err:
+            _LOGGER.debug("Could not resolve commit for %s: %s", repo_url, err)
+            return None
+
+    async def _async_get_tree(
+        self, repo_url: str, ref: str
+    ) -> dict[str, Any] | None:
+        """Return the ``.tflite`` blobs of a repository from the git trees API.
+
+        The tree of a commit SHA never changes and is cached indefinitely.
+        Returns None if the tree cannot be fetched; callers then fall back to
+        downloading the repository archive.
+        """
+        url = "%s/repos/%s/git/trees/%s?recursive=1" % (
+            GITHUB_API_URL,
+            self._get_repo_path(repo_url),
+            quote(ref),
+        )
+
+        async def _parse(response: aiohttp.ClientResponse) -> dict[str, Any]:
+            if response.status != 200:
+                raise HomeAssistantError(
+                    "Failed to fetch repository tree: %s" % response.status
+                )
+            tree = await response.json()
+            blobs = [item for item in tree["tree"] if item["type"] == "blob"]
+            return {
+                "truncated": tree.get("truncated", False),
+                "total_size": sum(item.get("size", 0) for item in blobs),
+                "files": [
+                    {"path": item["path"], "sha": item["sha"], "size": item["size"]}
+                    for item in blobs
+                    if item["path"].endswith(".tflite")
+                ],
+            }
+
+        try:
+            return await self._async_cached_get(
+                url, _parse, immutable=_is_commit_sha(ref)
+            )
+        except Exception as err:
+            _LOGGER.debug("Could not fetch tree for %s: %s", repo_url, err)
+            return None
+
+    async def _async_find_unchanged(
+        self,
+        repo_name: str,
+        tree: dict[str, Any],
+        selected_languages: list[str],
+        layout: PathLayout,
+        install_path: Path,
+    ) -> set[str]:
+        """Return the repository paths whose installed copy is up to date.
+
+        The git blob SHA of every installed file is compared with the tree.
+        Hashes are computed in the executor and cached in the file index
+        together with the file's size, modification time and inode, so a
+        file is only hashed again once it changed on disk.
+        """
+        git_shas = {item["path"]: item["sha"] for item in tree["files"]}
+        planned = layout.plan(
+            ((item["path"], item["size"]) for item in tree["files"]),
+            selected_languages,
+        )
+
+        async def _check(file: PlannedFile) -> tuple[PlannedFile, str, Any]:
+            filename = _installed_name(repo_name, file.language, file.path)
+            hashes = await self.worker_pool.async_run(
+                _local_hashes,
+                install_path / filename,
+                self.install_state.get_file(filename),
+            )
+            return file, filename, hashes
+
+        unchanged = set()
+        for file, filename, hashes in await asyncio.gather(
+            *(_check(file) for file in planned)
+        ):
+            if hashes is None or hashes.git_sha != git_shas[file.path]:
+                continue
+            unchanged.add(file.path)
+            entry = self.install_state.get_file(filename)
+            if (
+                entry is None
+                or entry["repo"] != repo_name
+                or entry.get("stat") != hashes.stat
+                or entry.get("git_sha") != hashes.git_sha
+            ):
+                self.install_state.add_file(
+                    filename,
+                    repo_name,
+                    file.language,
+                    file.path,
+                    hashes.stat[0],
+                    hashes.sha256,
+                    hashes.git_sha,
+                    hashes.stat,
+                )
+
+        if unchanged:
+            _LOGGER.debug(
+                "%d of %d files of %s are unchanged",
+                len(unchanged),
+                len(planned),
+                repo_name,
+            )
+        return unchanged
+
+    def _plan_sparse_install(
+        self,
+        tree: dict[str, Any] | None,
+        selected_languages: list[str],
+        layout: PathLayout,
+        unchanged: AbstractSet[str] = frozenset(),
+    ) -> list[PlannedFile] | None:
+        """Select the files to download individually for a sparse install.
+
+        Files whose installed copy is unchanged are left out. Returns None if
+        the archive should be downloaded instead.
+        """
+        if tree is None or tree["truncated"]:
+            return None
+
+        files = [
+            file
+            for file in layout.plan(
+                ((item["path"], item["size"]) for item in tree["files"]),
+                selected_languages,
+            )
+            if file.path not in unchanged
+        ]
+
+        if len(files) > SPARSE_MAX_FILES:
+            return None
+        if sum(file.size for file in files) > tree["total_size"] * SPARSE_MAX_FRACTION:
+            return None
+        return files
+
+    async def _sparse_install(
+        self,
+        repo_url: str,
+        ref: str,
+        files: list[PlannedFile],
+        install_path: Path,
+        repo_name: str,
+        git_shas: dict[str, str],
+    ) -> None:
+        """Download the selected files individually and in parallel."""
+        repo_path = self._get_repo_path(repo_url)
+        semaphore = asyncio.Semaphore(SPARSE_DOWNLOAD_CONCURRENCY)
+        blobs = self._blob_store()
+
+        async def _install_file(path: str, language: str) -> _InstalledFile:
+            url = "%s/%s/%s/%s" % (
+                GITHUB_RAW_URL, repo_path, quote(ref), quote(path)
+            )
+            new_name = _installed_name(repo_name, language, path)
+            destination = install_path / new_name
+            part_path = install_path / (".%s.part" % new_name)
+
+            async with semaphore:
+                try:
+                    with tracing.phase("download"):
+                        await self._download_file(url, part_path, resume=False)
+                    with tracing.phase("store"):
+                        size, sha256 = await self.worker_pool.async_run(
+                            blobs.add_file, part_path
+                        )
+                    with tracing.phase("link"):
+                        stat = await self.worker_pool.async_run(
+                            blobs.link, sha256, destination
+                        )
+                except Exception:
+                    await self.hass.async_add_executor_job(
+                        part_path.unlink, True
+                    )
+                    raise
+
+            _LOGGER.info("Installed wakeword: %s", new_name)
+            return _InstalledFile(
+                new_name,
+                language,
+                path,
+                size,
+                sha256,
+                git_shas.get(path),
+                _stat_key(stat),
+            )
+
+        _LOGGER.debug(
+            "Sparse install of %d files from %s at %s", len(files), repo_name, ref
+        )
+        results = await asyncio.gather(
+            *(_install_file(file.path, file.language) for file in files),
+            return_exceptions=True,
+        )
+        await self._async_record_files(
+            repo_name,
+            [result for result in results if not isinstance(result, BaseException)],
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def install_repositories(
+        self,
+        repositories: list[dict[str, Any]],
+        languages: list[str] | None = None,
+        force: bool = False,
+    ) -> dict[str, str | None]:
+        """Install wakewords from several repositories concurrently.
+
+        Installs are bounded by a global limit and a per-host limit. Each
+        repository is reported separately: the result maps the repository
+        name to ``None`` on success or to the error message on failure.
+        Repositories without any selected languages are skipped.
+        """
+
+        async def _install_one(repo: dict[str, Any]) -> tuple[str, str | None]:
+            repo_url = repo[CONF_REPO_URL]
+            repo_name = repo.get(CONF_REPO_NAME) or self._extract_repo_name(repo_url)
+            selected = languages or repo.get(CONF_SELECTED_LANGUAGES, [])
+
+            async with self._install_semaphore, self._get_host_semaphore(repo_url):
+                _LOGGER.info(
+                    "Installing wakewords from %s for languages: %s",
+                    repo_name,
+                    selected,
+                )
+                try:
+                    await self.install_wakewords(
+                        repo_url,
+                        selected,
+                        repo_name,
+                        force=force,
+                        path_layout=repo.get(CONF_PATH_LAYOUT),
+                        ref=repo.get(CONF_REF),
+                    )
+                except HomeAssistantError as err:
+                    _LOGGER.error(
+                        "Failed to install wakewords from %s: %s", repo_name, err
+                    )
+                    return repo_name, str(err)
+
+            return repo_name, None
+
+        pending = [
+            repo
+            for repo in repositories
+            if languages or repo.get(CONF_SELECTED_LANGUAGES)
+        ]
+        results = await asyncio.gather(*(_install_one(repo) for repo in pending))
+        return dict(results)
+
+    def _get_host_semaphore(self, repo_url: str) -> asyncio.Semaphore:
+        """Return the semaphore limiting concurrent installs for a host."""
+        if "://" not in repo_url:
+            repo_url = "https://%s" % repo_url
+        host = urlparse(repo_url).hostname or ""
+
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self._max_installs_per_host
+            )
+        return self._host_semaphores[host]
+
     def _extract_repo_name(self, repo_url: str) -> str:
         """Extract repository name from URL."""
+        if (source_path := sources.local_path(repo_url)) is not None:
+            return sources.source_name(source_path)
         if repo_url.startswith("https://github.com/"):
             repo_path = repo_url.replace("https://github.com/", "")
         elif repo_url.startswith("github.com/"):
@@ -130,48 +959,52 @@ class RepositoryManager:
             repo_name: Name of the repository.
             languages: Languages to remove. If None, removes all from this repo.
         """
+        async with self._async_trace("remove", repo_name):
+            await self.async_load_state()
+            filenames = self.install_state.get_files(repo_name, languages)
+            hashes = {
+                (self.install_state.get_file(filename) or {}).get("sha256")
+                for filename in filenames
+            }
 
-        def _remove_sync() -> None:
-            install_path = Path(WAKEWORD_INSTALL_PATH)
-            if not install_path.exists():
-                return
-
-            if languages is None:
-                # Format: {repo_name}_{language}_{original_name}.tflite
-                for file_path in install_path.glob("%s_*.tflite" % repo_name):
+            def _remove_sync() -> list[str]:
+                install_path = Path(WAKEWORD_INSTALL_PATH)
+                removed = []
+                for filename in filenames:
+                    file_path = install_path / filename
                     try:
-                        file_path.unlink()
-                        _LOGGER.info("Removed wakeword file: %s", file_path.name)
+                        file_path.unlink(missing_ok=True)
+                        removed.append(filename)
+                        _LOGGER.info("Removed wakeword file: %s", filename)
                     except OSError as err:
-                        _LOGGER.warning(
-                            "Failed to remove file %s: %s", file_path, err
-                        )
+                        _LOGGER.warning("Failed to remove file %s: %s", file_path, err)
+                return removed
+
+            try:
+                removed = await self.worker_pool.async_run(_remove_sync)
+            except Exception as err:
+                _LOGGER.error("Failed to remove wakewords: %s", err)
+                raise HomeAssistantError("Removal failed: %s" % err)
+
+            for filename in removed:
+                self.install_state.remove_file(filename)
+
+            if languages is None:
+                self.install_state.remove_repository(repo_name)
             else:
-                for language in languages:
-                    pattern = "%s_%s_*.tflite" % (repo_name, language)
-                    for file_path in install_path.glob(pattern):
-                        try:
-                            file_path.unlink()
-                            _LOGGER.info(
-                                "Removed wakeword file: %s", file_path.name
-                            )
-                        except OSError as err:
-                            _LOGGER.warning(
-                                "Failed to remove file %s: %s", file_path, err
-                            )
+                self.install_state.remove_languages(repo_name, languages)
 
-        try:
-            await self.hass.async_add_executor_job(_remove_sync)
-        except Exception as err:
-            _LOGGER.error("Failed to remove wakewords: %s", err)
-            raise HomeAssistantError("Removal failed: %s" % err)
+            try:
+                await self._async_release_blobs(hashes)
+            except OSError as err:
+                _LOGGER.warning("Failed to free stored models: %s", err)
 
     async def remove_repository_wakewords(self, repo_name: str) -> None:
         """Remove all wakeword files associated with a repository."""
         await self.remove_wakewords(repo_name, languages=None)
 
-    def _convert_to_api_url(self, repo_url: str) -> str:
-        """Convert GitHub repository URL to API URL."""
+    def _get_repo_path(self, repo_url: str) -> str:
+        """Return the ``owner/repo`` path of a GitHub repository URL."""
         if repo_url.startswith("https://github.com/"):
             repo_path = repo_url.replace("https://github.com/", "")
         elif repo_url.startswith("github.com/"):
@@ -182,54 +1015,192 @@ class RepositoryManager:
         if repo_path.endswith(".git"):
             repo_path = repo_path[:-4]
 
-        repo_path = repo_path.rstrip("/")
-        return "https://api.github.com/repos/%s/contents" % repo_path
+        return repo_path.rstrip("/")
 
-    def _get_download_url(self, repo_url: str) -> str:
-        """Get the download URL for the repository zip."""
-        if repo_url.startswith("https://github.com/"):
-            repo_path = repo_url.replace("https://github.com/", "")
-        elif repo_url.startswith("github.com/"):
-            repo_path = repo_url.replace("github.com/", "")
-        else:
-            raise HomeAssistantError("Invalid GitHub repository URL")
+    def _convert_to_api_url(self, repo_url: str) -> str:
+        """Convert GitHub repository URL to API URL."""
+        return "%s/repos/%s/contents" % (GITHUB_API_URL, self._get_repo_path(repo_url))
 
-        if repo_path.endswith(".git"):
-            repo_path = repo_path[:-4]
+    def _get_download_url(self, repo_url: str, ref: str = DEFAULT_REF) -> str:
+        """Get the download URL for the repository zip of a ref.
 
-        repo_path = repo_path.rstrip("/")
-        return "https://github.com/%s/archive/refs/heads/main.zip" % repo_path
+        Installs pass the resolved commit when it is known, so the recorded
+        commit always matches the installed files.
+        """
+        return "%s/%s/archive/%s.zip" % (
+            GITHUB_URL,
+            self._get_repo_path(repo_url),
+            quote(ref),
+        )
 
-    async def _download_file(self, url: str, file_path: Path) -> None:
-        """Download a file from URL to local path with size limit."""
-        try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
-                    raise HomeAssistantError(
-                        "Failed to download file: %s" % response.status
-                    )
+    async def _async_prepare_archive_path(
+        self, url: str, pinned: bool = False
+    ) -> Path:
+        """Return the cache path an archive is downloaded to.
 
-                # Check content-length if available
-                content_length = response.content_length
-                if content_length and content_length > MAX_DOWNLOAD_SIZE:
-                    raise HomeAssistantError(
-                        "Download too large: %d bytes (max %d)"
-                        % (content_length, MAX_DOWNLOAD_SIZE)
+        Archives of pinned commits are kept in a directory of their own that
+        is never pruned.
+        """
+        cache_dir = Path(WAKEWORD_INSTALL_PATH) / CACHE_DIR_NAME
+        download_dir = cache_dir / ("archives" if pinned else "downloads")
+        await self.hass.async_add_executor_job(
+            _prepare_download_dir, download_dir, not pinned
+        )
+        return download_dir / (
+            "%s.zip" % hashlib.sha256(url.encode()).hexdigest()[:32]
+        )
+
+    async def _download_file(
+        self, url: str, file_path: Path, resume: bool = True
+    ) -> None:
+        """Download a file from URL to local path with size limit.
+
+        Interrupted transfers are retried a bounded number of times. With
+        ``resume`` the partial file is kept together with the response
+        validators in a ``.meta`` file next to it, and retries continue
+        where the transfer stopped using ``Range`` and ``If-Range``.
+        """
+        meta_path = file_path.with_name("%s.meta" % file_path.name)
+        started = time.monotonic()
+        writers: list[BufferedFileWriter] = []
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            try:
+                await self._download_attempt(
+                    url, file_path, meta_path if resume else None, writers
+                )
+            except (
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+                _TransientDownloadError,
+            ) as err:
+                if attempt == DOWNLOAD_RETRIES:
+                    raise HomeAssistantError("Download failed: %s" % err) from err
+                delay = min(
+                    DOWNLOAD_RETRY_BACKOFF * 2**attempt, DOWNLOAD_RETRY_MAX_DELAY
+                )
+                _LOGGER.warning(
+                    "Download of %s interrupted (%s), retrying in %d seconds",
+                    url,
+                    err or type(err).__name__,
+                    delay,
+                )
+                tracing.count("retries")
+                await asyncio.sleep(delay)
+            except HomeAssistantError:
+                await self.hass.async_add_executor_job(
+                    _discard_partial, file_path, meta_path
+                )
+                raise
+            else:
+                if resume:
+                    await self.hass.async_add_executor_job(meta_path.unlink, True)
+                break
+
+        stats = DownloadStats(
+            sum(writer.bytes_written for writer in writers),
+            time.monotonic() - started,
+            sum(writer.cpu_seconds for writer in writers),
+            sum(writer.write_calls for writer in writers),
+        )
+        self.last_download_stats = stats
+        tracing.count("bytes_downloaded", stats.bytes)
+        _LOGGER.debug(
+            "Downloaded %s: %.1f MB in %.1f s (%.1f MB/s, %.1f ms write CPU/MB, "
+            "%d writes)",
+            url,
+            stats.bytes / 1e6,
+            stats.seconds,
+            stats.megabytes_per_second,
+            stats.cpu_ms_per_megabyte,
+            stats.write_calls,
+        )
+
+    async def _download_attempt(
+        self,
+        url: str,
+        file_path: Path,
+        meta_path: Path | None,
+        writers: list[BufferedFileWriter],
+    ) -> None:
+        """Make one download request, resuming a partial file if possible.
+
+        The file writer is appended to ``writers`` for the download statistics.
+        """
+        offset = 0
+        validator = None
+        if meta_path is not None:
+            offset, validator = await self.hass.async_add_executor_job(
+                _read_partial, url, file_path, meta_path
+            )
+
+        headers = {}
+        if offset and validator:
+            headers["Range"] = "bytes=%d-" % offset
+            headers["If-Range"] = validator
+        else:
+            offset = 0
+
+        async with self._get_session().get(
+            sources.mirror_url(url, self._mirror_url),
+            headers=headers,
+            timeout=DOWNLOAD_TIMEOUT,
+        ) as response:
+            if response.status == 206:
+                start = _content_range_start(response.headers.get("Content-Range"))
+                if start != offset:
+                    await self.hass.async_add_executor_job(
+                        _discard_partial, file_path, meta_path
                     )
+                    raise _TransientDownloadError("Unexpected Content-Range")
+                _LOGGER.debug("Resuming download of %s at %d bytes", url, offset)
+            elif response.status == 200:
+                # The server ignored the range or the file changed
+                offset = 0
+            elif response.status == 416:
+                await self.hass.async_add_executor_job(
+                    _discard_partial, file_path, meta_path
+                )
+                raise _TransientDownloadError("Range not satisfiable")
+            elif response.status == 429 or response.status >= 500:
+                raise _TransientDownloadError("HTTP %s" % response.status)
+            else:
+                raise HomeAssistantError(
+                    "Failed to download file: %s" % response.status
+                )
 
-                total_size = 0
-                async with aiofiles.open(file_path, "wb") as file:
-                    async for chunk in response.content.iter_chunked(8192):
-                        total_size += len(chunk)
-                        if total_size > MAX_DOWNLOAD_SIZE:
-                            raise HomeAssistantError(
-                                "Download exceeded size limit of %d bytes"
-                                % MAX_DOWNLOAD_SIZE
-                            )
-                        await file.write(chunk)
+            # Check content-length if available
+            content_length = response.content_length
+            if content_length and offset + content_length > MAX_DOWNLOAD_SIZE:
+                raise HomeAssistantError(
+                    "Download too large: %d bytes (max %d)"
+                    % (offset + content_length, MAX_DOWNLOAD_SIZE)
+                )
 
-        except aiohttp.ClientError as err:
-            raise HomeAssistantError("Download failed: %s" % err)
+            if meta_path is not None and offset == 0:
+                await self.hass.async_add_executor_job(
+                    _write_partial_meta,
+                    meta_path,
+                    {
+                        "url": url,
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    },
+                )
+
+            total_size = offset
+            writer = BufferedFileWriter(self.hass, file_path, append=bool(offset))
+            writers.append(writer)
+            async with writer:
+                async for chunk in response.content.iter_chunked(
+                    DOWNLOAD_CHUNK_SIZE
+                ):
+                    total_size += len(chunk)
+                    if total_size > MAX_DOWNLOAD_SIZE:
+                        raise HomeAssistantError(
+                            "Download exceeded size limit of %d bytes"
+                            % MAX_DOWNLOAD_SIZE
+                        )
+                    await writer.write(chunk)
 
     async def _extract_and_install(
         self,
@@ -237,89 +1208,540 @@ class RepositoryManager:
         selected_languages: list[str],
         install_path: Path,
         repo_name: str,
-        temp_dir: str,
+        layout: PathLayout,
+        unchanged: AbstractSet[str] = frozenset(),
+        git_shas: dict[str, str] | None = None,
+        strip_root: bool | None = True,
     ) -> None:
-        """Extract zip file and install tflite files for selected languages."""
-
-        def extract_sync() -> None:
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                all_files = zip_ref.namelist()
-
-                tflite_files = []
-                for entry in all_files:
-                    if entry.endswith(".tflite"):
-                        path_parts = entry.split("/")
-                        if len(path_parts) >= 2:
-                            for language in selected_languages:
-                                if language in path_parts:
-                                    tflite_files.append(entry)
-                                    break
-
-                for tflite_file in tflite_files:
-                    try:
-                        # Zip-slip protection: extract to temp_dir and validate
-                        member_info = zip_ref.getinfo(tflite_file)
-                        extracted = zip_ref.extract(member_info, path=temp_dir)
-                        real_extracted = os.path.realpath(extracted)
-                        real_temp = os.path.realpath(temp_dir)
-                        if not real_extracted.startswith(real_temp + os.sep):
-                            _LOGGER.warning(
-                                "Skipping suspicious zip entry: %s", tflite_file
-                            )
-                            continue
+        """Extract an archive and install tflite files for selected languages.
+
+        The archive is a zip file or a tarball. Members are selected in a
+        single pass over the archive's directory using the repository's path
+        layout. Each selected member is decompressed straight into the blob
+        store, unless an identical model is stored already, and atomically
+        linked into place, so models are never visible half-written. Members
+        whose installed copy is known to be unchanged are skipped.
 
-                        original_name = Path(tflite_file).name
+        With ``strip_root`` the repository lies below a top-level folder, as
+        in GitHub archives; None strips it if all members share one whose
+        contents match the layout.
+        """
+        blobs = self._blob_store()
+        git_shas = git_shas or {}
 
-                        language = "unknown"
-                        path_parts = tflite_file.split("/")
-                        for part in path_parts:
-                            if part in selected_languages:
-                                language = part
-                                break
+        def extract_sync() -> tuple[list[_InstalledFile], list[str]]:
+            installed = []
+            failed = []
+            with sources.ArchiveReader(zip_path) as archive:
+                with tracing.phase("zip_parse"):
+                    entries = archive.entries()
+                    strip = strip_root
+                    if strip is None:
+                        strip = sources.has_wrapping_root(
+                            (name for name, _ in entries), layout
+                        )
+                    members = layout.plan(
+                        entries, selected_languages, strip_root=strip
+                    )
 
-                        # Format: {repo_name}_{language}_{original_name}
-                        new_name = "%s_%s_%s" % (repo_name, language, original_name)
+                for member in members:
+                    # Zip-slip protection: reject unsafe names before writing
+                    if not _is_safe_member_name(member.path):
+                        _LOGGER.warning(
+                            "Skipping suspicious zip entry: %s", member.path
+                        )
+                        continue
+
+                    path = member.path.partition("/")[2] if strip else member.path
+                    if path in unchanged:
+                        continue
+
+                    try:
+                        new_name = _installed_name(repo_name, member.language, path)
                         destination = install_path / new_name
 
-                        shutil.move(extracted, destination)
+                        with tracing.phase("decompress"):
+                            with archive.open(member.path) as source:
+                                size, sha256 = blobs.add_stream(source)
+                        with tracing.phase("link"):
+                            stat = blobs.link(sha256, destination)
+                        installed.append(
+                            _InstalledFile(
+                                new_name,
+                                member.language,
+                                path,
+                                size,
+                                sha256,
+                                git_shas.get(path),
+                                _stat_key(stat),
+                            )
+                        )
 
                         _LOGGER.info("Installed wakeword: %s", new_name)
 
                     except Exception as err:
                         _LOGGER.warning(
-                            "Failed to install %s: %s", tflite_file, err
+                            "Failed to install %s: %s", member.path, err
                         )
+                        failed.append(path)
 
-        await self.hass.async_add_executor_job(extract_sync)
+                return installed, failed
 
-    async def get_installed_wakewords(self) -> dict[str, list[str]]:
-        """Get list of currently installed wakeword files organized by language."""
+        installed, failed = await self.worker_pool.async_run(extract_sync)
+        await self._async_record_files(repo_name, installed)
+        _raise_for_failed(failed)
 
-        def _list_sync() -> dict[str, list[str]]:
-            install_path = Path(WAKEWORD_INSTALL_PATH)
-            if not install_path.exists():
-                return {}
+    def _blob_store(self) -> BlobStore:
+        """Return the blob store below the install path."""
+        return BlobStore(Path(WAKEWORD_INSTALL_PATH) / CACHE_DIR_NAME / BLOB_DIR_NAME)
 
-            installed: dict[str, list[str]] = {}
-            for tflite_file in install_path.glob("*.tflite"):
-                filename = tflite_file.name
+    async def _async_record_files(
+        self, repo_name: str, installed: list[_InstalledFile]
+    ) -> None:
+        """Index installed files and free the blobs of files they replaced."""
+        tracing.count("files_installed", len(installed))
+        replaced = set()
+        for file in installed:
+            previous = self.install_state.get_file(file.filename)
+            if previous is not None and previous.get("sha256") != file.sha256:
+                replaced.add(previous.get("sha256"))
+            self.install_state.add_file(file.filename, repo_name, *file[1:])
+        await self._async_release_blobs(replaced)
 
-                # Format: {repo_name}_{language}_{original_name}
-                parts = filename.split("_")
-                if len(parts) >= 3:
-                    language = parts[1]
-                else:
-                    language = "unknown"
+    @asynccontextmanager
+    async def _async_use_blobs(self) -> AsyncIterator[None]:
+        """Keep blobs from being released while models are stored and indexed.
+
+        An install links a stored model before the new file is indexed, so a
+        blob that lost its last reference in the meantime may be in use
+        again. Such blobs are released by the last install to finish.
+        """
+        async with self._blob_lock:
+            self._blob_users += 1
+        try:
+            yield
+        finally:
+            self._blob_users -= 1
+            if not self._blob_users and self._pending_releases:
+                try:
+                    await self._async_release_blobs(set())
+                except OSError as err:
+                    _LOGGER.warning("Failed to free stored models: %s", err)
+
+    async def _async_release_blobs(self, hashes: set[str | None]) -> None:
+        """Remove the blobs that no installed file references any more.
+
+        While installs use the blob store the blobs are only marked, and
+        their references are checked again once the installs finished.
+        """
+        self._pending_releases.update(sha256 for sha256 in hashes if sha256)
+        if self._blob_users:
+            return
+
+        async with self._blob_lock:
+            if self._blob_users:
+                return
+            unreferenced = [
+                sha256
+                for sha256 in self._pending_releases
+                if not self.install_state.references(sha256)
+            ]
+            self._pending_releases.clear()
+            if not unreferenced:
+                return
+
+            blobs = self._blob_store()
+
+            def _release_sync() -> None:
+                for sha256 in unreferenced:
+                    blobs.release(sha256)
+
+            await self.worker_pool.async_run(_release_sync)
+
+    @asynccontextmanager
+    async def _async_trace(
+        self, operation: str, repository: str | None = None
+    ) -> AsyncIterator[None]:
+        """Trace an operation and record the worst event loop stall.
+
+        Listeners are notified once the outermost operation has finished,
+        whether it succeeded or not, so steps such as rebuilding the index
+        during an install do not notify them on their own.
+        """
+        outermost = tracing.current() is None
+        try:
+            with self.traces.trace(operation, repository) as trace:
+                async with LoopLagMonitor() as monitor:
+                    try:
+                        yield
+                    finally:
+                        trace.loop_lag_max = monitor.max_lag
+                        self.loop_lag[operation] = monitor.max_lag
+                        _LOGGER.debug(
+                            "Worst event loop stall during %s: %.1f ms",
+                            operation,
+                            monitor.max_lag * 1000,
+                        )
+        finally:
+            if (
+                operation == "install"
+                and repository is not None
+                and trace.error is None
+                and trace.duration is not None
+                and not trace.counters.get("up_to_date")
+            ):
+                self.install_durations[repository] = trace.duration
+            if outermost:
+                for update_callback in list(self._listeners):
+                    update_callback()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call a function after every operation that may change the state.
 
-                if language not in installed:
-                    installed[language] = []
+        Returns a function that removes the listener.
+        """
+        self._listeners.append(update_callback)
 
-                installed[language].append(filename)
+        @callback
+        def _remove_listener() -> None:
+            self._listeners.remove(update_callback)
 
-            return installed
+        return _remove_listener
 
+    async def get_installed_wakewords(self) -> dict[str, list[str]]:
+        """Get list of currently installed wakeword files organized by language."""
         try:
-            return await self.hass.async_add_executor_job(_list_sync)
+            await self.async_load_state()
         except Exception as err:
             _LOGGER.error("Failed to get installed wakewords: %s", err)
             return {}
+        return self.install_state.files_by_language()
+
+    async def async_load_state(self, build_index: bool = True) -> None:
+        """Load the install state, building the file index if missing.
+
+        Building the index hashes every installed model, so callers on the
+        startup path pass ``build_index=False`` and leave it to the first
+        install or reconciliation. The names of the configured repositories
+        are passed on, as after an upgrade none of them has a record yet.
+        """
+        await self.install_state.async_load()
+        if build_index and not self.install_state.index_built:
+            entries = self.hass.data.get(DOMAIN, {}).get(DATA_ENTRIES, {})
+            await self.async_rebuild_index(
+                [
+                    repo[CONF_REPO_NAME]
+                    for entry_data in entries.values()
+                    for repo in entry_data.get(CONF_REPOSITORIES, [])
+                ]
+            )
+
+    async def async_rebuild_index(self, repo_names: list[str] | None = None) -> int:
+        """Rebuild the installed file index from the install directory.
+
+        Filenames are parsed as ``{repo}_{language}_{name}.tflite``, matching
+        the longest known repository name first so that names containing
+        underscores are attributed correctly. Returns the number of indexed
+        files.
+        """
+        async with self._async_trace("rebuild_index"):
+            await self.install_state.async_load()
+            state = self.install_state
+            known_repos = set(repo_names or []) | set(state.repository_names)
+            known_languages = {
+                repo: (state.get_repository(repo) or {}).get("languages", [])
+                for repo in known_repos
+            }
+
+            def _scan_sync() -> dict[str, dict[str, Any]]:
+                install_path = Path(WAKEWORD_INSTALL_PATH)
+                if not install_path.exists():
+                    return {}
+
+                files = {}
+                for file_path in install_path.glob("*.tflite"):
+                    repo, language = _parse_installed_name(
+                        file_path.name, known_repos, known_languages
+                    )
+                    size, sha256 = _file_digest(file_path)
+                    files[file_path.name] = {
+                        "repo": repo,
+                        "language": language,
+                        "source": None,
+                        "size": size,
+                        "sha256": sha256,
+                    }
+                return files
+
+            files = await self.worker_pool.async_run(_scan_sync)
+            self.install_state.replace_files(files)
+            _LOGGER.info("Indexed %d installed wakeword files", len(files))
+            return len(files)
+
+    async def async_verify_installed(self) -> int:
+        """Check the indexed files of all repositories with a stat pass.
+
+        A file that is missing or whose size changed is linked again from
+        the blob store if its model is still stored there. Otherwise its
+        language is dropped from the install record, so the next
+        reconciliation installs it again. Nothing is read or downloaded.
+        Without a file index there is nothing to check; it is built by the
+        next reconciliation. Returns the number of files that were not
+        intact.
+        """
+        async with self._async_trace("verify"):
+            await self.async_load_state(build_index=False)
+            state = self.install_state
+            entries = {
+                filename: state.get_file(filename) or {}
+                for repo_name in state.repository_names
+                for filename in state.get_files(repo_name)
+            }
+            if not entries:
+                return 0
+            blobs = self._blob_store()
+
+            def _verify_sync() -> tuple[dict[str, list[int]], list[str]]:
+                install_path = Path(WAKEWORD_INSTALL_PATH)
+                restored = {}
+                broken = []
+                for filename, entry in entries.items():
+                    file_path = install_path / filename
+                    try:
+                        if file_path.stat().st_size == entry["size"]:
+                            continue
+                    except OSError:
+                        pass
+                    try:
+                        restored[filename] = _stat_key(
+                            blobs.link(entry["sha256"], file_path)
+                        )
+                    except OSError:
+                        broken.append(filename)
+                return restored, broken
+
+            async with self._async_use_blobs():
+                restored, broken = await self.worker_pool.async_run(_verify_sync)
+
+            for filename, stat in restored.items():
+                entry = entries[filename]
+                state.add_file(
+                    filename,
+                    entry["repo"],
+                    entry["language"],
+                    entry["source"],
+                    entry["size"],
+                    entry["sha256"],
+                    entry.get("git_sha"),
+                    stat,
+                )
+            for filename in broken:
+                entry = entries[filename]
+                state.remove_languages(entry["repo"], [entry["language"]])
+
+            if restored or broken:
+                _LOGGER.info(
+                    "Restored %d wakeword files from the blob store, %d need to be "
+                    "installed again",
+                    len(restored),
+                    len(broken),
+                )
+            return len(restored) + len(broken)
+
+
+class _InstalledFile(NamedTuple):
+    """A file installed from a repository, in ``InstallState.add_file`` order."""
+
+    filename: str
+    language: str
+    source: str
+    size: int
+    sha256: str
+    git_sha: str | None
+    stat: list[int]
+
+
+class _LocalHashes(NamedTuple):
+    """The hashes of an installed file and the stat they are valid for."""
+
+    stat: list[int]
+    sha256: str
+    git_sha: str
+
+
+class _InstallFlight:
+    """An install of one repository shared by concurrent callers."""
+
+    def __init__(self, languages: set[str], force: bool) -> None:
+        """Initialize the install."""
+        self.languages = set(languages)
+        self.force = force
+        self.task: asyncio.Task[bool]
+
+    def covers(self, languages: set[str], force: bool) -> bool:
+        """Return True if the install satisfies a request."""
+        return languages <= self.languages and (self.force or not force)
+
+
+class _TransientDownloadError(Exception):
+    """A download failed in a way that is worth retrying."""
+
+
+def _is_commit_sha(ref: str | None) -> bool:
+    """Return True if a ref is a full commit SHA and thus immutable."""
+    return ref is not None and COMMIT_SHA.fullmatch(ref) is not None
+
+
+def _prepare_download_dir(download_dir: Path, prune: bool = True) -> None:
+    """Create the download cache and drop partial downloads that went stale."""
+    download_dir.mkdir(parents=True, exist_ok=True)
+    if not prune:
+        return
+    cutoff = time.time() - DOWNLOAD_CACHE_MAX_AGE
+    for path in download_dir.iterdir():
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            continue
+
+
+def _is_complete_download(file_path: Path) -> bool:
+    """Return True if a file was downloaded completely."""
+    meta_path = file_path.with_name("%s.meta" % file_path.name)
+    return file_path.exists() and not meta_path.exists()
+
+
+def _read_partial(
+    url: str, file_path: Path, meta_path: Path
+) -> tuple[int, str | None]:
+    """Return the size and If-Range validator of a resumable partial file."""
+    try:
+        with open(meta_path, encoding="utf-8") as file:
+            meta = json.load(file)
+        size = file_path.stat().st_size
+    except (OSError, ValueError):
+        return 0, None
+
+    if meta.get("url") != url:
+        return 0, None
+    etag = meta.get("etag")
+    # Weak ETags must not be used for range requests
+    if etag and not etag.startswith("W/"):
+        return size, etag
+    return size, meta.get("last_modified")
+
+
+def _write_partial_meta(meta_path: Path, meta: dict[str, Any]) -> None:
+    """Write the validators of a partial download."""
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+
+
+def _discard_partial(file_path: Path, meta_path: Path | None) -> None:
+    """Remove a partial download and its validators."""
+    file_path.unlink(missing_ok=True)
+    if meta_path is not None:
+        meta_path.unlink(missing_ok=True)
+
+
+def _content_range_start(content_range: str | None) -> int | None:
+    """Return the first byte position of a ``Content-Range`` header."""
+    if not content_range or not content_range.startswith("bytes "):
+        return None
+    start, _, _ = content_range[6:].partition("-")
+    try:
+        return int(start)
+    except ValueError:
+        return None
+
+
+def _parse_installed_name(
+    filename: str,
+    known_repos: set[str],
+    known_languages: dict[str, list[str]],
+) -> tuple[str, str]:
+    """Return the repository and language of an installed file name."""
+    for repo in sorted(known_repos, key=len, reverse=True):
+        if not filename.startswith("%s_" % repo):
+            continue
+        rest = filename[len(repo) + 1 :]
+        for language in sorted(known_languages.get(repo, []), key=len, reverse=True):
+            if rest.startswith("%s_" % language):
+                return repo, language
+        if "_" in rest:
+            return repo, rest.split("_", 1)[0]
+
+    # Format: {repo_name}_{language}_{original_name}
+    parts = filename.split("_")
+    if len(parts) >= 3:
+        return parts[0], parts[1]
+    return "unknown", "unknown"
+
+
+def _raise_for_failed(failed: list[str]) -> None:
+    """Fail an install whose selected models were not all installed.
+
+    The models that were installed stay indexed, but the commit is not
+    recorded, so the next install tries the missing ones again.
+    """
+    if failed:
+        raise HomeAssistantError(
+            "Failed to install %d files: %s" % (len(failed), ", ".join(failed))
+        )
+
+
+def _is_safe_member_name(name: str) -> bool:
+    """Return True if a zip member name cannot escape the extraction root."""
+    if name.startswith("/") or "\\" in name:
+        return False
+    parts = name.split("/")
+    return ".." not in parts and not parts[0].endswith(":")
+
+
+def _installed_name(repo_name: str, language: str, path: str) -> str:
+    """Return the name a repository file is installed as."""
+    # Format: {repo_name}_{language}_{original_name}
+    return "%s_%s_%s" % (repo_name, language, Path(path).name)
+
+
+def _stat_key(stat: os.stat_result) -> list[int]:
+    """Return the size, modification time and inode of a file."""
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _local_hashes(
+    file_path: Path, entry: dict[str, Any] | None
+) -> _LocalHashes | None:
+    """Return the SHA-256 and git blob SHA of an installed file.
+
+    The hashes of the file index entry are reused while the file's size,
+    modification time and inode are unchanged. Returns None if the file
+    does not exist.
+    """
+    try:
+        stat = _stat_key(file_path.stat())
+    except FileNotFoundError:
+        return None
+    if entry is not None and entry.get("stat") == stat and entry.get("git_sha"):
+        return _LocalHashes(stat, entry["sha256"], entry["git_sha"])
+
+    digest = hashlib.sha256()
+    git_digest = hashlib.sha1(b"blob %d\0" % stat[0])  # noqa: S324
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            git_digest.update(chunk)
+    return _LocalHashes(stat, digest.hexdigest(), git_digest.hexdigest())
+
+
+def _file_digest(file_path: Path) -> tuple[int, str]:
+    """Return the size and SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
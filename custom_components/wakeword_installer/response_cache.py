@@ -0,0 +1,154 @@
+"""Persistent cache for conditional HTTP requests."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = "%s.response_cache" % DOMAIN
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds
+SAVE_DELAY = 10  # seconds
+
+
+class ResponseCache:
+    """Cache parsed responses together with their ETag/Last-Modified validators.
+
+    Entries are keyed by URL and kept in least-recently-used order. Entries
+    older than the TTL are dropped, except immutable ones such as responses
+    addressed by a commit SHA, and the oldest entries are evicted once the
+    cache exceeds its maximum size.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL,
+    ) -> None:
+        """Initialize the response cache."""
+        self.hass = hass
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._store: Store | None = None
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the cache from storage once."""
+        if self._loaded:
+            return
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            self._store = Store(self.hass, STORAGE_VERSION, STORAGE_KEY)
+            stored = await self._store.async_load()
+            if stored:
+                for url, entry in stored.get("entries", {}).items():
+                    self._entries[url] = entry
+                self._evict()
+                _LOGGER.debug("Loaded %d cached responses", len(self._entries))
+            self._loaded = True
+
+    def get(self, url: str) -> dict[str, Any] | None:
+        """Return the cached entry for a URL, or None if missing or expired."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        if self._expired(entry, time.time()):
+            del self._entries[url]
+            self._async_schedule_save()
+            return None
+        return entry
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Return the validator headers for a conditional request to a URL."""
+        entry = self.get(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def set(
+        self,
+        url: str,
+        data: Any,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        immutable: bool = False,
+    ) -> None:
+        """Store a parsed response and its validators.
+
+        Immutable responses never expire and need no revalidation.
+        """
+        self._entries[url] = {
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "immutable": immutable,
+        }
+        self._entries.move_to_end(url)
+        self._evict()
+        self._async_schedule_save()
+
+    def touch(self, url: str) -> None:
+        """Mark a cached entry as revalidated."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return
+        entry["stored_at"] = time.time()
+        self._entries.move_to_end(url)
+        self._async_schedule_save()
+
+    def _evict(self) -> None:
+        """Drop expired entries and trim the cache to its maximum size."""
+        now = time.time()
+        for url in [
+            url
+            for url, entry in self._entries.items()
+            if self._expired(entry, now)
+        ]:
+            del self._entries[url]
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _expired(self, entry: dict[str, Any], now: float) -> bool:
+        """Return True if an entry is older than the TTL."""
+        return not entry.get("immutable") and now - entry["stored_at"] > self._ttl
+
+    async def async_flush(self) -> None:
+        """Write the cache to storage now instead of after the save delay."""
+        if self._loaded and self._store is not None:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule writing the cache to storage."""
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"entries": dict(self._entries)}
@@ -0,0 +1,154 @@
+"""Sensors for the Wakeword Installer integration."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, CONF_REPO_NAME, DATA_COORDINATORS
+from .coordinator import WakewordUpdateCoordinator
+from .repository_manager import RepositoryManager
+
+
+@dataclass(frozen=True, kw_only=True)
+class WakewordSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor reading the install state of a repository."""
+
+    value_fn: Callable[[RepositoryManager, str], Any]
+    attributes_fn: Callable[[RepositoryManager, str], dict[str, Any]] | None = None
+
+
+SENSORS: tuple[WakewordSensorEntityDescription, ...] = (
+    WakewordSensorEntityDescription(
+        key="models",
+        name="models",
+        icon="mdi:microphone-message",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda manager, repo: manager.install_state.file_count(repo),
+    ),
+    WakewordSensorEntityDescription(
+        key="languages",
+        name="languages",
+        icon="mdi:translate",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda manager, repo: len(
+            manager.install_state.installed_languages(repo)
+        ),
+        attributes_fn=lambda manager, repo: {
+            "languages": manager.install_state.installed_languages(repo)
+        },
+    ),
+    WakewordSensorEntityDescription(
+        key="size",
+        name="size on disk",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.MEGABYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda manager, repo: manager.install_state.total_size(repo),
+    ),
+    WakewordSensorEntityDescription(
+        key="installed_commit",
+        name="installed commit",
+        icon="mdi:source-commit",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda manager, repo: (
+            commit[:7]
+            if (commit := manager.install_state.installed_commit(repo))
+            else None
+        ),
+        attributes_fn=lambda manager, repo: {
+            "commit": manager.install_state.installed_commit(repo)
+        },
+    ),
+    WakewordSensorEntityDescription(
+        key="last_update_duration",
+        name="last update duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda manager, repo: manager.install_durations.get(repo),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the install state sensors of every configured repository."""
+    coordinator: WakewordUpdateCoordinator = hass.data[DOMAIN][DATA_COORDINATORS][
+        entry.entry_id
+    ]
+    async_add_entities(
+        WakewordInstallSensor(coordinator.repo_manager, entry, repo, description)
+        for repo in coordinator.repositories
+        for description in SENSORS
+    )
+
+
+class WakewordInstallSensor(SensorEntity):
+    """Report part of the install state of a repository.
+
+    Values are read from the in-memory install state, never from disk, and
+    the entity is written again whenever an install or removal finished.
+    """
+
+    entity_description: WakewordSensorEntityDescription
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        repo_manager: RepositoryManager,
+        entry: ConfigEntry,
+        repo: dict[str, Any],
+        description: WakewordSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._repo_manager = repo_manager
+        self._repo_name = repo[CONF_REPO_NAME]
+        self._attr_unique_id = "%s_%s_%s" % (
+            entry.entry_id,
+            self._repo_name,
+            description.key,
+        )
+        self._attr_name = "%s wakeword %s" % (self._repo_name, description.name)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow changes of the install state."""
+        self.async_on_remove(
+            self._repo_manager.async_add_listener(self._handle_state_update)
+        )
+
+    @callback
+    def _handle_state_update(self) -> None:
+        """Write the new state after an operation finished."""
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> Any:
+        """Return the value from the install state."""
+        return self.entity_description.value_fn(self._repo_manager, self._repo_name)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return additional values from the install state."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(
+            self._repo_manager, self._repo_name
+        )
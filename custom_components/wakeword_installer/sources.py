@@ -0,0 +1,209 @@
+"""Local and mirrored sources of wakeword repositories."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import hashlib
+import os
+from pathlib import Path
+import tarfile
+from types import TracebackType
+from typing import IO
+from urllib.parse import unquote, urlparse
+import zipfile
+
+from .layout import PathLayout
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+# Hosts whose URLs are redirected to a configured mirror
+MIRRORED_HOSTS = ("github.com", "api.github.com", "raw.githubusercontent.com")
+MODEL_SUFFIX = ".tflite"
+
+
+def local_path(repo_url: str) -> Path | None:
+    """Return the path of a local source, or None for a remote repository.
+
+    Local sources are given as absolute paths or ``file://`` URLs and are
+    either a directory or an archive.
+    """
+    if repo_url.startswith("file://"):
+        return Path(unquote(urlparse(repo_url).path))
+    if repo_url.startswith("/"):
+        return Path(repo_url)
+    return None
+
+
+def source_name(path: Path) -> str:
+    """Return the repository name of a local source."""
+    name = path.name
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def mirror_url(url: str, mirror: str | None) -> str:
+    """Redirect a GitHub URL to ``<mirror>/<host>/<path>``.
+
+    URLs of other hosts, and all URLs when no mirror is configured, are
+    returned unchanged.
+    """
+    if not mirror:
+        return url
+    parsed = urlparse(url)
+    if parsed.hostname not in MIRRORED_HOSTS:
+        return url
+    _, _, rest = url.partition(parsed.netloc)
+    return "%s/%s%s" % (mirror.rstrip("/"), parsed.hostname, rest)
+
+
+class ArchiveReader:
+    """Read the regular files of a zip archive or a tarball.
+
+    Tarballs are read with random access, so a compressed tarball is
+    decompressed once to list its members and once more while its selected
+    members are read in order. Links and special files are ignored.
+
+    Use as a context manager. All methods block and must be run in the
+    executor.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the reader."""
+        self.path = path
+        self._zip: zipfile.ZipFile | None = None
+        self._tar: tarfile.TarFile | None = None
+        self._tar_members: dict[str, tarfile.TarInfo] = {}
+
+    def __enter__(self) -> ArchiveReader:
+        """Open the archive."""
+        if zipfile.is_zipfile(self.path):
+            self._zip = zipfile.ZipFile(self.path)
+        else:
+            self._tar = tarfile.open(self.path, "r:*")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the archive."""
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+
+    def entries(self) -> list[tuple[str, int]]:
+        """Return the path and size of every regular file."""
+        if self._zip is not None:
+            return [
+                (info.filename, info.file_size)
+                for info in self._zip.infolist()
+                if not info.is_dir()
+            ]
+
+        self._tar_members = {
+            _strip_dot(member.name): member
+            for member in self._tarball().getmembers()
+            if member.isfile()
+        }
+        return [(name, member.size) for name, member in self._tar_members.items()]
+
+    def open(self, name: str) -> IO[bytes]:
+        """Open a file of the archive for reading."""
+        if self._zip is not None:
+            return self._zip.open(name)
+
+        source = self._tarball().extractfile(self._tar_members[name])
+        if source is None:
+            raise KeyError(name)
+        return source
+
+    def _tarball(self) -> tarfile.TarFile:
+        """Return the open tarball."""
+        if self._tar is None:
+            raise ValueError("Archive %s is not open" % self.path)
+        return self._tar
+
+
+def has_wrapping_root(paths: Iterable[str], layout: PathLayout) -> bool:
+    """Return True if the repository lies below one top-level directory.
+
+    Archives such as GitHub's wrap the repository in a folder like
+    ``<repo>-<ref>/``, which is then not part of the repository paths. A
+    single top-level directory is only taken for such a folder if paths
+    below it match the layout, so an archive of one language directory
+    keeps its language.
+    """
+    paths = list(paths)
+    roots = {path.partition("/")[0] if "/" in path else None for path in paths}
+    if len(roots) != 1 or None in roots:
+        return False
+    return any(layout.match(path.partition("/")[2]) for path in paths)
+
+
+def scan_directory(root: Path) -> list[tuple[str, int]]:
+    """Return the relative path and size of the files below a directory.
+
+    Hidden files and directories, such as ``.git``, are skipped.
+    """
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+        directory = Path(dirpath)
+        for filename in filenames:
+            if filename.startswith("."):
+                continue
+            file_path = directory / filename
+            if not file_path.is_file():
+                continue
+            entries.append(
+                (file_path.relative_to(root).as_posix(), file_path.stat().st_size)
+            )
+    return entries
+
+
+def list_languages(path: Path, layout: PathLayout) -> list[str]:
+    """Return the languages of the models in a local source."""
+    if path.is_dir():
+        paths = [name for name, _ in scan_directory(path)]
+    else:
+        with ArchiveReader(path) as archive:
+            paths = [name for name, _ in archive.entries()]
+        if has_wrapping_root(paths, layout):
+            paths = [name.partition("/")[2] for name in paths]
+    return sorted(
+        {
+            language
+            for name in paths
+            if not name.startswith(".") and (language := layout.match(name))
+        }
+    )
+
+
+def fingerprint(path: Path) -> str:
+    """Return a SHA-1 that changes whenever a local source changes.
+
+    Directories are identified by the path, size and modification time of
+    their models, archives by their own size and modification time. The
+    fingerprint is recorded in place of a commit, so a changed source is
+    installed again.
+    """
+    digest = hashlib.sha1()  # noqa: S324
+    if path.is_dir():
+        for name, size in sorted(scan_directory(path)):
+            if name.endswith(MODEL_SUFFIX):
+                mtime = (path / name).stat().st_mtime_ns
+                digest.update(b"%s\0%d\0%d\n" % (name.encode(), size, mtime))
+    else:
+        stat = path.stat()
+        digest.update(b"%d\0%d" % (stat.st_size, stat.st_mtime_ns))
+    return digest.hexdigest()
+
+
+def _strip_dot(name: str) -> str:
+    """Return a tarball member name without a leading ``./``."""
+    while name.startswith("./"):
+        name = name[2:]
+    return name
@@ -0,0 +1,156 @@
+"""Per-operation timing and throughput traces."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+TRACE_HISTORY = 50
+
+_current_trace: ContextVar[Trace | None] = ContextVar(
+    "wakeword_installer_trace", default=None
+)
+
+
+class Trace:
+    """Phase durations and counters of one operation.
+
+    Phases are summed over all work of the operation, so for concurrent
+    downloads a phase may add up to more than the operation's duration.
+    Traces may be updated from worker threads.
+    """
+
+    def __init__(self, operation: str, repository: str | None = None) -> None:
+        """Initialize the trace."""
+        self.operation = operation
+        self.repository = repository
+        self.started_at = datetime.now(timezone.utc)
+        self.duration: float | None = None
+        self.loop_lag_max: float | None = None
+        self.error: str | None = None
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        """Add time spent in a phase."""
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increase a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self) -> None:
+        """Record the duration of the operation."""
+        self.duration = time.perf_counter() - self._started
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace as JSON serializable data."""
+        with self._lock:
+            return {
+                "operation": self.operation,
+                "repository": self.repository,
+                "started_at": self.started_at.isoformat(),
+                "duration": self.duration,
+                "loop_lag_max": self.loop_lag_max,
+                "error": self.error,
+                "phases": dict(self.phases),
+                "counters": dict(self.counters),
+            }
+
+
+class TraceRecorder:
+    """Keep the traces of the most recent operations in a ring buffer."""
+
+    def __init__(self, history: int = TRACE_HISTORY) -> None:
+        """Initialize the recorder."""
+        self._traces: deque[Trace] = deque(maxlen=history)
+
+    @contextmanager
+    def trace(self, operation: str, repository: str | None = None) -> Iterator[Trace]:
+        """Trace an operation, making it the current trace while it runs."""
+        trace = Trace(operation, repository)
+        token = _current_trace.set(trace)
+        try:
+            yield trace
+        except BaseException as err:
+            trace.error = str(err) or type(err).__name__
+            raise
+        finally:
+            _current_trace.reset(token)
+            trace.finish()
+            self._traces.append(trace)
+
+    def as_list(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return the recorded traces, newest first."""
+        traces = list(reversed(self._traces))
+        return [trace.as_dict() for trace in traces[:limit]]
+
+
+def current() -> Trace | None:
+    """Return the trace of the running operation, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_phase(name, time.perf_counter() - started)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Increase a counter of the current trace."""
+    if (trace := _current_trace.get()) is not None:
+        trace.count(name, amount)
+
+
+def http_trace_config() -> aiohttp.TraceConfig:
+    """Return an aiohttp trace config adding DNS and connect phases."""
+
+    async def _on_dns_start(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.dns_started = time.perf_counter()
+
+    async def _on_dns_end(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        if (trace := _current_trace.get()) is not None:
+            trace.add_phase("dns", time.perf_counter() - context.dns_started)
+
+    async def _on_connect_start(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        context.connect_started = time.perf_counter()
+
+    async def _on_connect_end(
+        session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+    ) -> None:
+        if (trace := _current_trace.get()) is not None:
+            trace.add_phase("connect", time.perf_counter() - context.connect_started)
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(_on_dns_start)
+    config.on_dns_resolvehost_end.append(_on_dns_end)
+    config.on_connection_create_start.append(_on_connect_start)
+    config.on_connection_create_end.append(_on_connect_end)
+    return config
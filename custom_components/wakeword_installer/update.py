@@ -0,0 +1,82 @@
+"""Update entities for the Wakeword Installer integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.update import UpdateEntity, UpdateEntityFeature
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, CONF_REPO_NAME, CONF_REPO_URL, DATA_COORDINATORS
+from .coordinator import WakewordUpdateCoordinator
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up an update entity for every configured repository."""
+    coordinator: WakewordUpdateCoordinator = hass.data[DOMAIN][DATA_COORDINATORS][
+        entry.entry_id
+    ]
+    async_add_entities(
+        WakewordRepositoryUpdate(coordinator, entry, repo)
+        for repo in coordinator.repositories
+    )
+
+
+class WakewordRepositoryUpdate(
+    CoordinatorEntity[WakewordUpdateCoordinator], UpdateEntity
+):
+    """Show whether the wakewords of a repository are up to date."""
+
+    _attr_supported_features = UpdateEntityFeature.INSTALL
+
+    def __init__(
+        self,
+        coordinator: WakewordUpdateCoordinator,
+        entry: ConfigEntry,
+        repo: dict[str, Any],
+    ) -> None:
+        """Initialize the update entity."""
+        super().__init__(coordinator)
+        self._repo_name = repo[CONF_REPO_NAME]
+        self._attr_unique_id = "%s_%s" % (entry.entry_id, self._repo_name)
+        self._attr_name = "%s wakewords" % self._repo_name
+        self._attr_title = self._repo_name
+        self._attr_release_url = repo[CONF_REPO_URL]
+
+    @property
+    def _status(self) -> dict[str, Any]:
+        """Return the coordinator's status of the repository."""
+        return (self.coordinator.data or {}).get(self._repo_name, {})
+
+    @property
+    def installed_version(self) -> str | None:
+        """Return the short commit the wakewords were installed from."""
+        commit = self._status.get("installed_commit")
+        return commit[:7] if commit else None
+
+    @property
+    def latest_version(self) -> str | None:
+        """Return the short commit of the repository's head."""
+        commit = self._status.get("latest_commit")
+        return commit[:7] if commit else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the full commits and when the repository was last checked."""
+        return {
+            "installed_commit": self._status.get("installed_commit"),
+            "latest_commit": self._status.get("latest_commit"),
+            "last_checked": self._status.get("last_checked"),
+        }
+
+    async def async_install(
+        self, version: str | None, backup: bool, **kwargs: Any
+    ) -> None:
+        """Check the repository and install its latest wakewords."""
+        await self.coordinator.async_check_repository(self._repo_name)
@@ -0,0 +1,121 @@
+"""Thread pool for the integration's heavy filesystem work."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import threading
+import time
+from typing import Any, NamedTuple, TypeVar
+
+_T = TypeVar("_T")
+
+THREAD_NAME_PREFIX = "wakeword_installer"
+
+
+class WorkerPoolStats(NamedTuple):
+    """Load of the worker pool."""
+
+    workers: int
+    queued: int
+    running: int
+    completed: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+    @property
+    def wait_seconds_mean(self) -> float:
+        """Return how long a job waited for a worker on average."""
+        started = self.running + self.completed
+        if not started:
+            return 0.0
+        return self.wait_seconds_total / started
+
+
+class WorkerPool:
+    """Run blocking jobs on a small thread pool owned by the integration.
+
+    Extracting archives, hashing models and scanning the install directory
+    can keep a thread busy for a long time. Running these jobs here rather
+    than in Home Assistant's shared executor means a large install queues
+    behind its own jobs instead of taking the threads other integrations
+    need. The pool counts the jobs waiting for a worker and how long they
+    waited. Threads are started on demand.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        """Initialize the pool."""
+        self._max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def max_workers(self) -> int:
+        """Return the number of worker threads."""
+        return self._max_workers
+
+    def set_max_workers(self, max_workers: int) -> None:
+        """Change the number of worker threads.
+
+        Jobs that were already submitted finish on the previous threads.
+        """
+        if max_workers != self._max_workers:
+            self._max_workers = max_workers
+            self.shutdown()
+
+    async def async_run(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run a function on a worker thread and return its result.
+
+        The function runs in a copy of the caller's context, so context
+        variables such as the current trace are available to it.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self._max_workers, thread_name_prefix=THREAD_NAME_PREFIX
+            )
+        submitted = time.monotonic()
+        with self._lock:
+            self._queued += 1
+
+        def _job() -> _T:
+            wait = time.monotonic() - submitted
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                return target(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, context.run, _job
+        )
+
+    def stats(self) -> WorkerPoolStats:
+        """Return the current load of the pool."""
+        with self._lock:
+            return WorkerPoolStats(
+                self._max_workers,
+                self._queued,
+                self._running,
+                self._completed,
+                self._wait_total,
+                self._wait_max,
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once their queued jobs are done."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
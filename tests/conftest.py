@@ -6,7 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant
 
 from custom_components.wakeword_installer.const import DOMAIN, CONF_REPOSITORIES
 
@@ -16,6 +16,8 @@ def mock_hass() -> MagicMock:
     """Create a mock HomeAssistant instance."""
     hass = MagicMock(spec=HomeAssistant)
     hass.data = {}
+    hass.state = CoreState.not_running
+    hass.bus = MagicMock()
     hass.config_entries = MagicMock()
     hass.config_entries.async_forward_entry_setups = AsyncMock(return_value=True)
     hass.config_entries.async_unload_platforms = AsyncMock(return_value=True)
@@ -26,9 +28,26 @@ def mock_hass() -> MagicMock:
     hass.services.has_service = MagicMock(return_value=False)
     hass.async_add_executor_job = AsyncMock(side_effect=lambda fn, *a: fn(*a))
     hass.async_create_task = MagicMock(side_effect=lambda coro: coro.close())
+    hass.async_create_background_task = MagicMock(
+        side_effect=lambda coro, name: coro.close()
+    )
     return hass
 
 
+@pytest.fixture
+def mock_store() -> MagicMock:
+    """Patch the storage helper used by the integration's persistent state."""
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value=None)
+    store.async_delay_save = MagicMock()
+    store.async_save = AsyncMock()
+    with (
+        patch("custom_components.wakeword_installer.response_cache.Store", return_value=store),
+        patch("custom_components.wakeword_installer.install_state.Store", return_value=store),
+    ):
+        yield store
+
+
 @pytest.fixture
 def mock_config_entry() -> MagicMock:
     """Create a mock config entry."""
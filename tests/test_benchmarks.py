@@ -0,0 +1,114 @@
+"""Tests for the benchmark tooling."""
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.run import async_run
+from benchmarks.synthetic import (
+    generate_repository,
+    git_blob_sha,
+    parse_size_distribution,
+)
+
+
+class TestSizeDistribution:
+    """Test parsing model size distributions."""
+
+    def test_fixed(self) -> None:
+        assert parse_size_distribution("fixed:1000")(random.Random(0)) == 1000
+
+    def test_uniform_within_bounds(self) -> None:
+        sizes = parse_size_distribution("uniform:10:20")
+        rng = random.Random(0)
+        assert all(10 <= sizes(rng) <= 20 for _ in range(100))
+
+    def test_lognormal_is_positive(self) -> None:
+        sizes = parse_size_distribution("lognormal:1000:2")
+        rng = random.Random(0)
+        assert all(sizes(rng) >= 1 for _ in range(100))
+
+    @pytest.mark.parametrize("spec", ["fixed", "uniform:10", "pareto:1:2", "fixed:x"])
+    def test_invalid(self, spec: str) -> None:
+        with pytest.raises(ValueError):
+            parse_size_distribution(spec)
+
+
+class TestGenerateRepository:
+    """Test generating synthetic repositories."""
+
+    def test_archive_matches_tree(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo = generate_repository(
+                Path(tmpdir), "bench", "models", 2, 3, parse_size_distribution("fixed:64")
+            )
+
+            assert repo.languages == ["lang00", "lang01"]
+            assert len(repo.blobs) == 6
+            assert repo.total_size == 6 * 64
+
+            with zipfile.ZipFile(repo.archive) as archive:
+                names = archive.namelist()
+                path = "lang01/model_0002.tflite"
+                data = archive.read("models-%s/%s" % (repo.commit, path))
+
+            assert all(name.startswith("models-%s/" % repo.commit) for name in names)
+            assert data == (repo.root / path).read_bytes()
+            assert repo.blobs[path] == (git_blob_sha(data), 64)
+
+    def test_git_blob_sha(self) -> None:
+        # git hash-object of an empty file
+        assert git_blob_sha(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+
+
+class TestCompare:
+    """Test comparing benchmark results."""
+
+    @staticmethod
+    def _report(seconds: float, lag: float = 1.0) -> dict:
+        return {"results": {"install_all": {"seconds": seconds, "loop_lag_max_ms": lag}}}
+
+    def test_detects_regression(self) -> None:
+        rows = compare(self._report(1.0), self._report(1.5), threshold=0.2)
+
+        assert ("install_all", "seconds", 1.0, 1.5, True) in rows
+
+    def test_ignores_small_changes(self) -> None:
+        rows = compare(self._report(1.0), self._report(1.1), threshold=0.2)
+
+        assert not any(row[4] for row in rows)
+
+    def test_ignores_noise_on_fast_scenarios(self) -> None:
+        rows = compare(self._report(0.001), self._report(0.003), threshold=0.2)
+
+        assert not any(row[4] for row in rows)
+
+
+@pytest.mark.asyncio
+class TestRun:
+    """Test running the benchmark suite."""
+
+    async def test_runs_all_scenarios(self) -> None:
+        args = argparse.Namespace(
+            languages=2,
+            models=2,
+            sizes="fixed:256",
+            index_languages=2,
+            index_models=3,
+            index_model_size=64,
+            seed=0,
+        )
+
+        report = await async_run(args)
+
+        results = report["results"]
+        assert results["install_all"]["files"] == 4
+        assert results["install_one"]["files"] == 2
+        assert results["install_many"]["files"] == 6
+        assert results["remove_repository"]["files"] == 3
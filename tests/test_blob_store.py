@@ -0,0 +1,129 @@
+"""Tests for the content-addressed blob store."""
+from __future__ import annotations
+
+import io
+import os
+import stat
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.wakeword_installer.blob_store import BlobStore
+
+
+class TestBlobStore:
+    """Test storing and linking blobs."""
+
+    def test_identical_content_is_stored_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+
+            first = store.add_stream(io.BytesIO(b"model-data"))
+            second = store.add_stream(io.BytesIO(b"model-data"))
+
+            assert first == second
+            assert first[0] == len(b"model-data")
+            assert store.path(first[1]).read_bytes() == b"model-data"
+            files = [path for path in store.root.rglob("*") if path.is_file()]
+            assert files == [store.path(first[1])]
+
+    def test_link_shares_the_blob(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            _, sha256 = store.add_stream(io.BytesIO(b"model-data"))
+            destination = Path(tmpdir) / "model.tflite"
+
+            store.link(sha256, destination)
+
+            assert destination.read_bytes() == b"model-data"
+            assert destination.stat().st_ino == store.path(sha256).stat().st_ino
+            assert sorted(path.name for path in Path(tmpdir).iterdir()) == [
+                "blobs",
+                "model.tflite",
+            ]
+
+    def test_linked_file_mode_follows_umask(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            destination = Path(tmpdir) / "model.tflite"
+            old_umask = os.umask(0o022)
+            try:
+                _, sha256 = store.add_stream(io.BytesIO(b"model-data"))
+            finally:
+                os.umask(old_umask)
+
+            store.link(sha256, destination)
+
+            assert stat.S_IMODE(destination.stat().st_mode) == 0o644
+
+    def test_link_falls_back_to_copy(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            _, sha256 = store.add_stream(io.BytesIO(b"model-data"))
+            destination = Path(tmpdir) / "model.tflite"
+
+            with patch(
+                "custom_components.wakeword_installer.blob_store.os.link",
+                side_effect=OSError("not supported"),
+            ):
+                store.link(sha256, destination)
+
+            assert destination.read_bytes() == b"model-data"
+            assert destination.stat().st_ino != store.path(sha256).stat().st_ino
+
+    def test_add_file_moves_file_into_store(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            part_path = Path(tmpdir) / "model.part"
+            part_path.write_bytes(b"model-data")
+
+            size, sha256 = store.add_file(part_path)
+
+            assert size == len(b"model-data")
+            assert not part_path.exists()
+            assert store.path(sha256).read_bytes() == b"model-data"
+
+    def test_add_copy_keeps_source(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            source = Path(tmpdir) / "model.tflite"
+            source.write_bytes(b"model-data")
+
+            first = store.add_copy(source)
+            second = store.add_copy(source)
+
+            assert first == second
+            assert source.read_bytes() == b"model-data"
+            assert store.path(first[1]).read_bytes() == b"model-data"
+            assert store.path(first[1]).stat().st_ino != source.stat().st_ino
+
+    def test_failed_stream_leaves_no_partial_file(self) -> None:
+        class FailingStream:
+            def __init__(self) -> None:
+                self.calls = 0
+
+            def read(self, size: int) -> bytes:
+                self.calls += 1
+                if self.calls > 1:
+                    raise OSError("truncated")
+                return b"partial"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+
+            with pytest.raises(OSError):
+                store.add_stream(FailingStream())
+
+            assert list(store.root.iterdir()) == []
+
+    def test_release_removes_blob(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = BlobStore(Path(tmpdir) / "blobs")
+            _, sha256 = store.add_stream(io.BytesIO(b"model-data"))
+
+            store.release(sha256)
+            store.release(sha256)
+
+            assert list(store.root.iterdir()) == []
@@ -12,12 +12,27 @@ from custom_components.wakeword_installer.config_flow import (
     WakewordInstallerOptionsFlow,
 )
 from custom_components.wakeword_installer.const import (
+    CONF_MAX_CONCURRENT_INSTALLS,
+    CONF_MAX_INSTALLS_PER_HOST,
+    CONF_MIRROR_URL,
+    CONF_PATH_LAYOUT,
+    CONF_REF,
     CONF_REPO_NAME,
     CONF_REPO_URL,
     CONF_REPOSITORIES,
     CONF_SELECTED_LANGUAGES,
+    DEFAULT_PATH_LAYOUT,
     DOMAIN,
 )
+from custom_components.wakeword_installer.rate_limiter import RateLimitExceeded
+from custom_components.wakeword_installer.repository_manager import RepositoryManager
+
+
+def _mock_hass() -> MagicMock:
+    """Create a mock Home Assistant that runs executor jobs inline."""
+    hass = MagicMock()
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda fn, *a: fn(*a))
+    return hass
 
 
 # --- ConfigFlow tests ---
@@ -29,7 +44,7 @@ class TestConfigFlowUser:
 
     async def test_show_form_on_none_input(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
 
         result = await flow.async_step_user(user_input=None)
 
@@ -38,16 +53,15 @@ class TestConfigFlowUser:
 
     async def test_valid_repo_proceeds_to_language_selection(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
             mock_rm.get_available_languages = AsyncMock(return_value=["en", "de", "fr"])
             mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_user(
                 user_input={
@@ -55,25 +69,139 @@ class TestConfigFlowUser:
                 }
             )
 
-            mock_rm.close.assert_called_once()
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["step_id"] == "select_languages"
         # Verify repo name was auto-extracted, not user-provided
         assert flow.current_repo[CONF_REPO_NAME] == "wakewords"
+        assert CONF_REF not in flow.current_repo
+
+    async def test_local_path_must_be_allowed(self) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = _mock_hass()
+        flow.hass.config.is_allowed_path = MagicMock(return_value=False)
+
+        with patch(
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
+            result = await flow.async_step_user(
+                user_input={CONF_REPO_URL: "/media/wakewords.zip"}
+            )
+
+        assert result["type"] == "form"
+        assert result["errors"] == {"base": "path_not_allowed"}
+        flow.hass.config.is_allowed_path.assert_called_once_with("/media/wakewords.zip")
+        # The check touches the filesystem, so it runs in the executor
+        flow.hass.async_add_executor_job.assert_awaited_once()
+        mock_get.return_value.get_available_languages.assert_not_called()
+
+    async def test_allowed_local_path_proceeds(self) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = _mock_hass()
+        flow.hass.config.is_allowed_path = MagicMock(return_value=True)
+
+        with patch(
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
+            mock_rm = MagicMock()
+            mock_rm.get_available_languages = AsyncMock(return_value=["en"])
+            mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
+            mock_get.return_value = mock_rm
+
+            result = await flow.async_step_user(
+                user_input={CONF_REPO_URL: "file:///media/wakewords"}
+            )
+
+        assert result["step_id"] == "select_languages"
+        assert flow.current_repo[CONF_REPO_URL] == "file:///media/wakewords"
+
+    async def test_ref_is_validated_and_stored(self) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = _mock_hass()
+
+        with patch(
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
+            mock_rm = MagicMock()
+            mock_rm.get_available_languages = AsyncMock(return_value=["en"])
+            mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
+            mock_get.return_value = mock_rm
+
+            await flow.async_step_user(
+                user_input={
+                    CONF_REPO_URL: "https://github.com/test/wakewords",
+                    CONF_REF: " v1.0 ",
+                }
+            )
+
+        mock_rm.get_available_languages.assert_awaited_once_with(
+            "https://github.com/test/wakewords",
+            ref="v1.0",
+            path_layout=DEFAULT_PATH_LAYOUT,
+        )
+        assert flow.current_repo[CONF_REF] == "v1.0"
+
+    async def test_invalid_layout_shows_error(self) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = _mock_hass()
+
+        result = await flow.async_step_user(
+            user_input={
+                CONF_REPO_URL: "https://github.com/test/wakewords",
+                CONF_PATH_LAYOUT: "models/*.tflite",
+            }
+        )
+
+        assert result["type"] == "form"
+        assert result["errors"] == {"base": "invalid_layout"}
+
+    async def test_nested_layout_offers_languages_from_tree(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = mock_hass
+        manager = RepositoryManager(mock_hass)
+        manager._async_get_tree = AsyncMock(
+            return_value={
+                "truncated": False,
+                "total_size": 0,
+                "files": [
+                    {"path": "models/en/hey.tflite", "sha": "a", "size": 1},
+                    {"path": "models/de/hallo.tflite", "sha": "b", "size": 1},
+                    {"path": "tools/test.tflite", "sha": "c", "size": 1},
+                ],
+            }
+        )
+
+        with patch(
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager",
+            return_value=manager,
+        ):
+            result = await flow.async_step_user(
+                user_input={
+                    CONF_REPO_URL: "https://github.com/test/wakewords",
+                    CONF_PATH_LAYOUT: "models/{language}/*.tflite",
+                }
+            )
+
+        assert result["step_id"] == "select_languages"
+        assert flow.available_languages == ["de", "en"]
+        manager._async_get_tree.assert_awaited_once_with(
+            "https://github.com/test/wakewords", "HEAD"
+        )
 
     async def test_empty_languages_shows_error(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
             mock_rm.get_available_languages = AsyncMock(return_value=[])
             mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_user(
                 user_input={
@@ -81,23 +209,22 @@ class TestConfigFlowUser:
                 }
             )
 
-            mock_rm.close.assert_called_once()
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["errors"]["base"] == "no_languages_found"
 
     async def test_exception_shows_unknown_error(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
             mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
             mock_rm.get_available_languages = AsyncMock(side_effect=Exception("boom"))
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_user(
                 user_input={
@@ -105,11 +232,34 @@ class TestConfigFlowUser:
                 }
             )
 
-            mock_rm.close.assert_called_once()
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["errors"]["base"] == "unknown"
 
+    async def test_rate_limit_shows_rate_limited_error(self) -> None:
+        flow = WakewordInstallerConfigFlow()
+        flow.hass = _mock_hass()
+
+        with patch(
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
+            mock_rm = MagicMock()
+            mock_rm._extract_repo_name = MagicMock(return_value="wakewords")
+            mock_rm.get_available_languages = AsyncMock(
+                side_effect=RateLimitExceeded(0)
+            )
+            mock_get.return_value = mock_rm
+
+            result = await flow.async_step_user(
+                user_input={
+                    CONF_REPO_URL: "https://github.com/test/wakewords",
+                }
+            )
+
+        assert result["type"] == "form"
+        assert result["errors"]["base"] == "rate_limited"
+
 
 @pytest.mark.asyncio
 class TestConfigFlowSelectLanguages:
@@ -117,7 +267,7 @@ class TestConfigFlowSelectLanguages:
 
     async def test_show_form_on_none_input(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.current_repo = {CONF_REPO_NAME: "test", CONF_REPO_URL: "https://github.com/t/r"}
         flow.available_languages = ["en", "de"]
 
@@ -128,7 +278,7 @@ class TestConfigFlowSelectLanguages:
 
     async def test_selected_languages_stored(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.current_repo = {CONF_REPO_NAME: "test", CONF_REPO_URL: "https://github.com/t/r"}
         flow.available_languages = ["en", "de", "fr"]
 
@@ -149,7 +299,7 @@ class TestConfigFlowAddMore:
 
     async def test_show_form_on_none_input(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.repositories = [{CONF_REPO_NAME: "test"}]
 
         result = await flow.async_step_add_more(user_input=None)
@@ -159,7 +309,7 @@ class TestConfigFlowAddMore:
 
     async def test_done_creates_entry(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.context = {}
         flow.repositories = [
             {
@@ -183,7 +333,7 @@ class TestConfigFlowAddMore:
 
     async def test_add_another_returns_to_user_step(self) -> None:
         flow = WakewordInstallerConfigFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.repositories = [{CONF_REPO_NAME: "test"}]
 
         result = await flow.async_step_add_more(user_input={"add_another": True})
@@ -261,6 +411,42 @@ class TestOptionsFlowManageRepos:
 
         assert result["type"] == "create_entry"
 
+    async def test_settings_action_shows_form(self) -> None:
+        flow = WakewordInstallerOptionsFlow()
+        flow.repositories = []
+
+        result = await flow.async_step_manage_repos(user_input={"action": "settings"})
+
+        assert result["type"] == "form"
+        assert result["step_id"] == "settings"
+
+    async def test_settings_are_saved_as_options(self) -> None:
+        flow = WakewordInstallerOptionsFlow()
+        flow.repositories = []
+
+        await flow.async_step_settings(
+            user_input={
+                CONF_MAX_CONCURRENT_INSTALLS: 8,
+                CONF_MAX_INSTALLS_PER_HOST: 3,
+            }
+        )
+        result = await flow.async_step_manage_repos(user_input={"action": "done"})
+
+        assert result["type"] == "create_entry"
+        assert result["data"] == {
+            CONF_MAX_CONCURRENT_INSTALLS: 8,
+            CONF_MAX_INSTALLS_PER_HOST: 3,
+        }
+
+    async def test_empty_mirror_url_is_removed(self) -> None:
+        flow = WakewordInstallerOptionsFlow()
+        flow.repositories = []
+        flow.options = {CONF_MIRROR_URL: "http://cache.local"}
+
+        await flow.async_step_settings(user_input={CONF_MIRROR_URL: ""})
+
+        assert CONF_MIRROR_URL not in flow.options
+
 
 @pytest.mark.asyncio
 class TestOptionsFlowAddRepo:
@@ -276,19 +462,18 @@ class TestOptionsFlowAddRepo:
 
     async def test_successful_add(self) -> None:
         flow = WakewordInstallerOptionsFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.repositories = []
         flow._config_entry = MagicMock()
         type(flow).config_entry = property(lambda self: self._config_entry)
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
             mock_rm.get_available_languages = AsyncMock(return_value=["en", "de"])
             mock_rm._extract_repo_name = MagicMock(return_value="new-repo")
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_add_repo(
                 user_input={
@@ -296,7 +481,7 @@ class TestOptionsFlowAddRepo:
                 }
             )
 
-            mock_rm.close.assert_called_once()
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["step_id"] == "manage_repos"
@@ -310,7 +495,7 @@ class TestOptionsFlowRemoveRepo:
 
     async def test_remove_existing_repo(self) -> None:
         flow = WakewordInstallerOptionsFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.repositories = [
             {CONF_REPO_NAME: "repo1", CONF_REPO_URL: "https://github.com/t/r1"},
             {CONF_REPO_NAME: "repo2", CONF_REPO_URL: "https://github.com/t/r2"},
@@ -319,18 +504,17 @@ class TestOptionsFlowRemoveRepo:
         type(flow).config_entry = property(lambda self: self._config_entry)
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
             mock_rm.remove_repository_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_remove_repo(
                 user_input={"repo_to_remove": "repo1 (https://github.com/t/r1)"}
             )
 
-            mock_rm.close.assert_called_once()
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["step_id"] == "manage_repos"
@@ -342,9 +526,9 @@ class TestOptionsFlowRemoveRepo:
 class TestOptionsFlowInstallWakewords:
     """Test install_wakewords step."""
 
-    async def test_install_closes_session(self) -> None:
+    async def test_install_keeps_shared_session_open(self) -> None:
         flow = WakewordInstallerOptionsFlow()
-        flow.hass = MagicMock()
+        flow.hass = _mock_hass()
         flow.repositories = [
             {
                 CONF_REPO_NAME: "test-repo",
@@ -354,17 +538,16 @@ class TestOptionsFlowInstallWakewords:
         ]
 
         with patch(
-            "custom_components.wakeword_installer.config_flow.RepositoryManager"
-        ) as mock_rm_cls:
+            "custom_components.wakeword_installer.config_flow.async_get_repository_manager"
+        ) as mock_get:
             mock_rm = MagicMock()
-            mock_rm.install_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_rm.install_repositories = AsyncMock(return_value={"test-repo": None})
+            mock_get.return_value = mock_rm
 
             result = await flow.async_step_install_wakewords()
 
-            mock_rm.install_wakewords.assert_called_once()
-            mock_rm.close.assert_called_once()
+            mock_rm.install_repositories.assert_called_once_with(flow.repositories)
+            mock_rm.close.assert_not_called()
 
         assert result["type"] == "form"
         assert result["step_id"] == "install_complete"
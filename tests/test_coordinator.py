@@ -0,0 +1,139 @@
+"""Tests for the repository update coordinator."""
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.wakeword_installer.const import (
+    CONF_REPOSITORIES,
+    CONF_UPDATE_INTERVAL,
+)
+from custom_components.wakeword_installer.coordinator import (
+    UPDATE_JITTER,
+    WakewordUpdateCoordinator,
+)
+
+REPOSITORIES = [
+    {
+        "repo_name": "one",
+        "repo_url": "https://github.com/test/one",
+        "selected_languages": ["en"],
+    },
+    {
+        "repo_name": "two",
+        "repo_url": "https://github.com/test/two",
+        "selected_languages": ["de"],
+    },
+]
+
+
+@pytest.fixture
+def repo_manager() -> MagicMock:
+    """Create a repository manager with an install record per repository."""
+    records = {"one": {"commit": "a" * 40}, "two": {"commit": "b" * 40}}
+    manager = MagicMock()
+    manager.async_load_state = AsyncMock()
+    manager.install_state.installed_commit = MagicMock(
+        side_effect=lambda name: records[name]["commit"] if name in records else None
+    )
+    manager.async_get_latest_commit = AsyncMock()
+
+    async def install(repositories):
+        for repo in repositories:
+            records[repo["repo_name"]] = {"commit": "c" * 40}
+        return {repo["repo_name"]: None for repo in repositories}
+
+    manager.install_repositories = AsyncMock(side_effect=install)
+    return manager
+
+
+@pytest.fixture
+def coordinator(
+    mock_hass: MagicMock, mock_config_entry: MagicMock, repo_manager: MagicMock
+) -> WakewordUpdateCoordinator:
+    """Create a coordinator for two repositories checked every two hours."""
+    mock_config_entry.data = {CONF_REPOSITORIES: REPOSITORIES}
+    mock_config_entry.options = {CONF_UPDATE_INTERVAL: 120}
+    return WakewordUpdateCoordinator(mock_hass, mock_config_entry, repo_manager)
+
+
+class TestInterval:
+    """Test spreading the checks over the update interval."""
+
+    def test_repositories_share_the_interval(
+        self, coordinator: WakewordUpdateCoordinator
+    ) -> None:
+        for _ in range(20):
+            interval = coordinator._next_interval()
+            assert timedelta(minutes=60 * (1 - UPDATE_JITTER)) <= interval
+            assert interval <= timedelta(minutes=60 * (1 + UPDATE_JITTER))
+
+
+@pytest.mark.asyncio
+class TestUpdate:
+    """Test checking repositories for new commits."""
+
+    async def test_initial_data_needs_no_requests(
+        self, coordinator: WakewordUpdateCoordinator, repo_manager: MagicMock
+    ) -> None:
+        await coordinator.async_load_initial_data()
+
+        assert coordinator.data["one"] == {
+            "installed_commit": "a" * 40,
+            "latest_commit": "a" * 40,
+            "last_checked": None,
+        }
+        repo_manager.async_get_latest_commit.assert_not_called()
+        # Building a missing file index is left to the first reconciliation
+        repo_manager.async_load_state.assert_awaited_once_with(build_index=False)
+
+    async def test_checks_one_repository_per_update(
+        self, coordinator: WakewordUpdateCoordinator, repo_manager: MagicMock
+    ) -> None:
+        repo_manager.async_get_latest_commit.side_effect = ["a" * 40, "b" * 40]
+        await coordinator.async_load_initial_data()
+
+        coordinator.data = await coordinator._async_update_data()
+        coordinator.data = await coordinator._async_update_data()
+
+        calls = repo_manager.async_get_latest_commit.call_args_list
+        assert [call.args[0] for call in calls] == [
+            "https://github.com/test/one",
+            "https://github.com/test/two",
+        ]
+        assert coordinator.data["one"]["last_checked"] is not None
+        assert coordinator.data["two"]["last_checked"] is not None
+
+    async def test_unchanged_head_does_not_install(
+        self, coordinator: WakewordUpdateCoordinator, repo_manager: MagicMock
+    ) -> None:
+        repo_manager.async_get_latest_commit.return_value = "a" * 40
+
+        data = await coordinator._async_update_data()
+
+        repo_manager.install_repositories.assert_not_called()
+        assert data["one"]["installed_commit"] == data["one"]["latest_commit"]
+
+    async def test_moved_head_installs_repository(
+        self, coordinator: WakewordUpdateCoordinator, repo_manager: MagicMock
+    ) -> None:
+        repo_manager.async_get_latest_commit.return_value = "c" * 40
+
+        data = await coordinator._async_update_data()
+
+        repo_manager.install_repositories.assert_awaited_once_with([REPOSITORIES[0]])
+        assert data["one"]["installed_commit"] == "c" * 40
+
+    async def test_failed_check_keeps_previous_status(
+        self, coordinator: WakewordUpdateCoordinator, repo_manager: MagicMock
+    ) -> None:
+        repo_manager.async_get_latest_commit.return_value = None
+        await coordinator.async_load_initial_data()
+        previous = coordinator.data["one"]
+
+        data = await coordinator._async_update_data()
+
+        assert data["one"] == previous
+        repo_manager.install_repositories.assert_not_called()
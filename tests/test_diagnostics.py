@@ -0,0 +1,46 @@
+"""Tests for the Wakeword Installer diagnostics."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.wakeword_installer.const import (
+    DATA_SETUP_DURATIONS,
+    DOMAIN,
+)
+from custom_components.wakeword_installer.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.wakeword_installer.repository_manager import (
+    async_get_repository_manager,
+)
+
+
+@pytest.mark.asyncio
+class TestDiagnostics:
+    """Test the config entry diagnostics."""
+
+    async def test_reports_traces_and_redacts_token(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock, mock_store: MagicMock
+    ) -> None:
+        mock_config_entry.options = {"github_token": "secret", "worker_threads": 2}
+        with patch(
+            "custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession"
+        ):
+            repo_manager = async_get_repository_manager(mock_hass)
+        mock_hass.data[DOMAIN][DATA_SETUP_DURATIONS] = {
+            mock_config_entry.entry_id: 0.002
+        }
+        with repo_manager.traces.trace("install", "test-repo"):
+            pass
+
+        diagnostics = await async_get_config_entry_diagnostics(
+            mock_hass, mock_config_entry
+        )
+
+        assert diagnostics["entry"]["options"]["github_token"] == "**REDACTED**"
+        assert diagnostics["setup_seconds"] == 0.002
+        assert diagnostics["worker_pool"]["workers"] == 2
+        assert diagnostics["last_download"] is None
+        assert diagnostics["traces"][0]["repository"] == "test-repo"
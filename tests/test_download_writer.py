@@ -0,0 +1,103 @@
+"""Tests for the buffered download writer."""
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.wakeword_installer.download_writer import (
+    BufferedFileWriter,
+    DownloadStats,
+)
+
+
+@pytest.mark.asyncio
+class TestBufferedFileWriter:
+    """Test coalescing of download chunks into large writes."""
+
+    async def test_coalesces_small_chunks(self, mock_hass: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "download.bin"
+            writer = BufferedFileWriter(
+                mock_hass, file_path, min_buffer_size=1024, max_buffer_size=1024
+            )
+
+            async with writer:
+                for _ in range(64):
+                    await writer.write(b"x" * 64)
+
+            assert file_path.read_bytes() == b"x" * 4096
+            assert writer.bytes_written == 4096
+            assert writer.write_calls == 4
+
+        # open + 4 writes + close instead of one job per chunk
+        assert mock_hass.async_add_executor_job.call_count == 6
+
+    async def test_counts_cpu_time_of_writes(self, mock_hass: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "download.bin"
+            with patch(
+                "custom_components.wakeword_installer.download_writer.time.thread_time",
+                side_effect=[1.0, 1.25, 2.0, 2.5],
+            ):
+                async with BufferedFileWriter(
+                    mock_hass, file_path, min_buffer_size=4, max_buffer_size=4
+                ) as writer:
+                    await writer.write(b"data")
+                    await writer.write(b"more")
+
+        assert writer.cpu_seconds == pytest.approx(0.75)
+
+    async def test_append_keeps_existing_data(self, mock_hass: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "download.bin"
+            file_path.write_bytes(b"head-")
+
+            async with BufferedFileWriter(mock_hass, file_path, append=True) as writer:
+                await writer.write(b"tail")
+
+            assert file_path.read_bytes() == b"head-tail"
+
+    async def test_flushes_buffer_on_error(self, mock_hass: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "download.bin"
+
+            with pytest.raises(RuntimeError):
+                async with BufferedFileWriter(mock_hass, file_path) as writer:
+                    await writer.write(b"partial")
+                    raise RuntimeError("connection lost")
+
+            # Data received before the failure is kept for resuming
+            assert file_path.read_bytes() == b"partial"
+
+    async def test_buffer_stays_within_bounds(self, mock_hass: MagicMock) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            writer = BufferedFileWriter(
+                mock_hass,
+                Path(tmpdir) / "download.bin",
+                min_buffer_size=16,
+                max_buffer_size=256,
+            )
+
+            async with writer:
+                for _ in range(100):
+                    await writer.write(b"y" * 16)
+                    assert 16 <= writer._buffer_size <= 256
+
+
+class TestDownloadStats:
+    """Test derived download statistics."""
+
+    def test_rates(self) -> None:
+        stats = DownloadStats(bytes=10_000_000, seconds=2.0, cpu_seconds=0.05, write_calls=5)
+
+        assert stats.megabytes_per_second == pytest.approx(5.0)
+        assert stats.cpu_ms_per_megabyte == pytest.approx(5.0)
+
+    def test_empty_download(self) -> None:
+        stats = DownloadStats(bytes=0, seconds=0.0, cpu_seconds=0.0, write_calls=0)
+
+        assert stats.megabytes_per_second == 0.0
+        assert stats.cpu_ms_per_megabyte == 0.0
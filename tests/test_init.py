@@ -1,13 +1,24 @@
 """Tests for the Wakeword Installer __init__ module."""
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from homeassistant.const import Platform
+from homeassistant.exceptions import HomeAssistantError
+
 from custom_components.wakeword_installer import (
+    DATA_COORDINATORS,
+    DATA_ENTRIES,
+    DATA_MANAGER,
+    DATA_SETUP_DURATIONS,
     DOMAIN,
+    SERVICE_GET_TRACES,
     SERVICE_INSTALL_WAKEWORDS,
+    SERVICE_REBUILD_INDEX,
+    SERVICE_RECONCILE,
     SERVICE_LIST_INSTALLED,
     SERVICE_REFRESH_REPOSITORIES,
     SERVICE_REMOVE_REPOSITORY_WAKEWORDS,
@@ -16,6 +27,18 @@ from custom_components.wakeword_installer import (
     async_setup_entry,
     async_unload_entry,
 )
+from custom_components.wakeword_installer.install_state import InstallState
+from custom_components.wakeword_installer.reconciler import Operation
+
+
+@pytest.fixture(autouse=True)
+def mock_coordinator() -> MagicMock:
+    """Patch the update coordinator created for every entry."""
+    with patch(
+        "custom_components.wakeword_installer.WakewordUpdateCoordinator"
+    ) as mock_cls:
+        mock_cls.return_value.async_load_initial_data = AsyncMock()
+        yield mock_cls.return_value
 
 
 @pytest.mark.asyncio
@@ -32,15 +55,15 @@ class TestAsyncSetupEntry:
 
     async def test_registers_services(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
         mock_hass.services.has_service = MagicMock(return_value=False)
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
             result = await async_setup_entry(mock_hass, mock_config_entry)
 
         assert result is True
         assert DOMAIN in mock_hass.data
-        assert mock_config_entry.entry_id in mock_hass.data[DOMAIN]
+        assert mock_config_entry.entry_id in mock_hass.data[DOMAIN][DATA_ENTRIES]
 
-        # 5 services should be registered
-        assert mock_hass.services.async_register.call_count == 5
+        # 8 services should be registered
+        assert mock_hass.services.async_register.call_count == 8
 
         registered = [call.args[1] for call in mock_hass.services.async_register.call_args_list]
         assert SERVICE_INSTALL_WAKEWORDS in registered
@@ -48,50 +71,135 @@ class TestAsyncSetupEntry:
         assert SERVICE_REMOVE_REPOSITORY_WAKEWORDS in registered
         assert SERVICE_LIST_INSTALLED in registered
         assert SERVICE_REFRESH_REPOSITORIES in registered
+        assert SERVICE_REBUILD_INDEX in registered
+        assert SERVICE_RECONCILE in registered
+        assert SERVICE_GET_TRACES in registered
 
     async def test_skips_service_registration_when_already_registered(
         self, mock_hass: MagicMock, mock_config_entry: MagicMock
     ) -> None:
         """Second entry should not re-register services."""
         mock_hass.services.has_service = MagicMock(return_value=True)
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
             result = await async_setup_entry(mock_hass, mock_config_entry)
 
         assert result is True
         mock_hass.services.async_register.assert_not_called()
 
     async def test_stores_entry_data(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
+            await async_setup_entry(mock_hass, mock_config_entry)
+
+        assert (
+            mock_hass.data[DOMAIN][DATA_ENTRIES][mock_config_entry.entry_id]
+            == mock_config_entry.data
+        )
+
+    async def test_configures_shared_manager(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        mock_config_entry.options = {
+            "max_concurrent_installs": 6,
+            "mirror_url": "http://cache.local",
+        }
+        with patch(
+            "custom_components.wakeword_installer.async_get_repository_manager"
+        ) as mock_get:
             await async_setup_entry(mock_hass, mock_config_entry)
 
-        assert mock_hass.data[DOMAIN][mock_config_entry.entry_id] == mock_config_entry.data
+        mock_get.return_value.set_install_limits.assert_called_once_with(
+            max_concurrent_installs=6, max_installs_per_host=2
+        )
+        mock_get.return_value.set_worker_threads.assert_called_once_with(2)
+        mock_get.return_value.set_mirror_url.assert_called_once_with(
+            "http://cache.local"
+        )
 
     async def test_forwards_platforms(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
             await async_setup_entry(mock_hass, mock_config_entry)
 
         mock_hass.config_entries.async_forward_entry_setups.assert_called_once_with(
-            mock_config_entry, []
+            mock_config_entry,
+            [Platform.BINARY_SENSOR, Platform.SENSOR, Platform.UPDATE],
+        )
+
+    async def test_creates_update_coordinator(
+        self,
+        mock_hass: MagicMock,
+        mock_config_entry: MagicMock,
+        mock_coordinator: MagicMock,
+    ) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
+            await async_setup_entry(mock_hass, mock_config_entry)
+
+        mock_coordinator.async_load_initial_data.assert_awaited_once()
+        assert (
+            mock_hass.data[DOMAIN][DATA_COORDINATORS][mock_config_entry.entry_id]
+            is mock_coordinator
         )
 
     async def test_auto_installs_wakewords_on_setup(
         self, mock_hass: MagicMock, mock_config_entry: MagicMock
     ) -> None:
-        """Wakewords should be automatically installed when entry is set up."""
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        """Installed files are checked at setup, GitHub only once started."""
+        with (
+            patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get,
+            patch("custom_components.wakeword_installer.async_at_started") as mock_at_started,
+            patch("custom_components.wakeword_installer.async_call_later") as mock_call_later,
+            patch("custom_components.wakeword_installer._async_reconcile", new_callable=AsyncMock) as mock_reconcile,
+        ):
+            mock_rm = mock_get.return_value
+            mock_rm.async_verify_installed = AsyncMock(return_value=0)
+            mock_hass.async_create_background_task = MagicMock(
+                side_effect=lambda coro, name: asyncio.ensure_future(coro)
+            )
+            mock_config_entry.options = {"startup_delay": 30}
             await async_setup_entry(mock_hass, mock_config_entry)
 
-        # async_create_task should have been called with the install coroutine
-        mock_hass.async_create_task.assert_called_once()
+            # The stat pass is the only task started during setup
+            mock_hass.async_create_task.assert_not_called()
+            mock_hass.async_create_background_task.assert_called_once()
+            mock_rm.async_verify_installed.assert_called_once()
+            mock_call_later.assert_not_called()
+
+            started_cb = mock_at_started.call_args.args[1]
+            started_cb(mock_hass)
+            assert mock_call_later.call_args.args[1] == 30
+            mock_reconcile.assert_not_called()
+
+            await mock_call_later.call_args.args[2](None)
+            mock_reconcile.assert_awaited_once_with(mock_hass)
+
+    async def test_setup_time_does_not_depend_on_repositories(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        mock_config_entry.data = {
+            "repositories": [
+                {
+                    "repo_name": "repo%d" % i,
+                    "repo_url": "https://github.com/test/repo%d" % i,
+                    "selected_languages": ["en"],
+                }
+                for i in range(1000)
+            ]
+        }
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
+            await async_setup_entry(mock_hass, mock_config_entry)
+
+        mock_get.return_value.install_repositories.assert_not_called()
+        mock_get.return_value.async_get_latest_commit.assert_not_called()
+        assert mock_hass.data[DOMAIN][DATA_SETUP_DURATIONS][mock_config_entry.entry_id] < 0.05
 
     async def test_no_auto_install_with_empty_repos(
         self, mock_hass: MagicMock, mock_empty_config_entry: MagicMock
     ) -> None:
         """No auto-install when there are no repositories configured."""
-        with patch("custom_components.wakeword_installer.RepositoryManager"):
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
             await async_setup_entry(mock_hass, mock_empty_config_entry)
 
         mock_hass.async_create_task.assert_not_called()
+        mock_hass.async_create_background_task.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -99,36 +207,53 @@ class TestAsyncUnloadEntry:
     """Test async_unload_entry."""
 
     async def test_successful_unload_last_entry(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        """When last entry is unloaded, services should be removed."""
-        mock_hass.data[DOMAIN] = {mock_config_entry.entry_id: mock_config_entry.data}
+        """When last entry is unloaded, services and the shared manager should be removed."""
+        repo_manager = MagicMock()
+        repo_manager.close = AsyncMock()
+        mock_hass.data[DOMAIN] = {
+            DATA_MANAGER: repo_manager,
+            DATA_ENTRIES: {mock_config_entry.entry_id: mock_config_entry.data},
+            DATA_COORDINATORS: {mock_config_entry.entry_id: MagicMock()},
+        }
 
         result = await async_unload_entry(mock_hass, mock_config_entry)
 
         assert result is True
-        assert mock_config_entry.entry_id not in mock_hass.data[DOMAIN]
-        assert mock_hass.services.async_remove.call_count == 5
+        assert mock_config_entry.entry_id not in mock_hass.data[DOMAIN][DATA_ENTRIES]
+        assert mock_config_entry.entry_id not in mock_hass.data[DOMAIN][DATA_COORDINATORS]
+        assert mock_hass.services.async_remove.call_count == 8
+        assert DATA_MANAGER not in mock_hass.data[DOMAIN]
+        repo_manager.close.assert_called_once()
 
     async def test_successful_unload_not_last_entry(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
         """When other entries remain, services should NOT be removed."""
+        repo_manager = MagicMock()
+        repo_manager.close = AsyncMock()
         mock_hass.data[DOMAIN] = {
-            mock_config_entry.entry_id: mock_config_entry.data,
-            "other_entry": {"some": "data"},
+            DATA_MANAGER: repo_manager,
+            DATA_ENTRIES: {
+                mock_config_entry.entry_id: mock_config_entry.data,
+                "other_entry": {"some": "data"},
+            },
         }
 
         result = await async_unload_entry(mock_hass, mock_config_entry)
 
         assert result is True
-        assert mock_config_entry.entry_id not in mock_hass.data[DOMAIN]
+        assert mock_config_entry.entry_id not in mock_hass.data[DOMAIN][DATA_ENTRIES]
         mock_hass.services.async_remove.assert_not_called()
+        repo_manager.close.assert_not_called()
 
     async def test_failed_unload_keeps_data(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        mock_hass.data[DOMAIN] = {mock_config_entry.entry_id: mock_config_entry.data}
+        mock_hass.data[DOMAIN] = {
+            DATA_ENTRIES: {mock_config_entry.entry_id: mock_config_entry.data}
+        }
         mock_hass.config_entries.async_unload_platforms = AsyncMock(return_value=False)
 
         result = await async_unload_entry(mock_hass, mock_config_entry)
 
         assert result is False
-        assert mock_config_entry.entry_id in mock_hass.data[DOMAIN]
+        assert mock_config_entry.entry_id in mock_hass.data[DOMAIN][DATA_ENTRIES]
         mock_hass.services.async_remove.assert_not_called()
 
 
@@ -144,11 +269,10 @@ class TestServiceCalls:
         raise ValueError("Service %s not registered" % service_name)
 
     async def test_install_wakewords_all_repos(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
-            mock_rm.install_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_rm.install_repositories = AsyncMock(return_value={"test-repo": None})
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_INSTALL_WAKEWORDS)
@@ -157,31 +281,33 @@ class TestServiceCalls:
             call.data = {}
             await handler(call)
 
-            mock_rm.install_wakewords.assert_called_once()
-            mock_rm.close.assert_called()
+            mock_rm.install_repositories.assert_called_once_with(
+                mock_config_entry.data["repositories"], None, force=False
+            )
+            mock_rm.close.assert_not_called()
 
     async def test_install_wakewords_specific_repo(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
-            mock_rm.install_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_rm.install_repositories = AsyncMock(return_value={"test-repo": None})
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_INSTALL_WAKEWORDS)
 
             call = MagicMock()
-            call.data = {"repository": "test-repo"}
+            call.data = {"repository": "test-repo", "languages": ["en"], "force": True}
             await handler(call)
 
-            mock_rm.install_wakewords.assert_called_once()
+            mock_rm.install_repositories.assert_called_once_with(
+                mock_config_entry.data["repositories"], ["en"], force=True
+            )
 
     async def test_install_wakewords_wrong_repo_skips(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
-            mock_rm.install_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_rm.install_repositories = AsyncMock(return_value={})
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_INSTALL_WAKEWORDS)
@@ -190,15 +316,14 @@ class TestServiceCalls:
             call.data = {"repository": "nonexistent-repo"}
             await handler(call)
 
-            mock_rm.install_wakewords.assert_not_called()
-            mock_rm.close.assert_called()
+            mock_rm.install_repositories.assert_not_called()
+            mock_rm.close.assert_not_called()
 
     async def test_remove_wakewords(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
             mock_rm.remove_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_REMOVE_WAKEWORDS)
@@ -208,14 +333,13 @@ class TestServiceCalls:
             await handler(call)
 
             mock_rm.remove_wakewords.assert_called_once_with("test-repo", ["en"])
-            mock_rm.close.assert_called()
+            mock_rm.close.assert_not_called()
 
     async def test_remove_repository_wakewords(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
             mock_rm.remove_repository_wakewords = AsyncMock()
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_REMOVE_REPOSITORY_WAKEWORDS)
@@ -227,11 +351,10 @@ class TestServiceCalls:
             mock_rm.remove_repository_wakewords.assert_called_once_with("test-repo")
 
     async def test_list_installed(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
             mock_rm.get_installed_wakewords = AsyncMock(return_value={})
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_LIST_INSTALLED)
@@ -243,11 +366,10 @@ class TestServiceCalls:
             mock_rm.get_installed_wakewords.assert_called_once()
 
     async def test_refresh_repositories(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
-        with patch("custom_components.wakeword_installer.RepositoryManager") as mock_rm_cls:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
             mock_rm = MagicMock()
             mock_rm.get_available_languages = AsyncMock(return_value=["en", "de"])
-            mock_rm.close = AsyncMock()
-            mock_rm_cls.return_value = mock_rm
+            mock_get.return_value = mock_rm
 
             await async_setup_entry(mock_hass, mock_config_entry)
             handler = self._get_service_handler(mock_hass, SERVICE_REFRESH_REPOSITORIES)
@@ -257,3 +379,233 @@ class TestServiceCalls:
             await handler(call)
 
             mock_rm.get_available_languages.assert_called_once()
+
+    async def test_list_installed_returns_install_state(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.set_repository("test-repo", "https://github.com/test/wakewords", "a" * 40, ["en"])
+        state.add_file("test-repo_en_hey.tflite", "test-repo", "en", "en/hey.tflite", 10, "0" * 64)
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
+            mock_rm = mock_get.return_value
+            mock_rm.install_state = state
+            mock_rm.get_installed_wakewords = AsyncMock(
+                side_effect=lambda: state.files_by_language()
+            )
+
+            await async_setup_entry(mock_hass, mock_config_entry)
+            handler = self._get_service_handler(mock_hass, SERVICE_LIST_INSTALLED)
+
+            call = MagicMock()
+            call.data = {}
+            call.return_response = True
+            response = await handler(call)
+
+        assert response == {
+            "repositories": {
+                "test-repo": {
+                    "commit": "a" * 40,
+                    "languages": ["en"],
+                    "models": 1,
+                    "size": 10,
+                }
+            },
+            "wakewords": {"en": ["test-repo_en_hey.tflite"]},
+        }
+
+    async def test_refresh_repositories_runs_concurrently(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        mock_config_entry.data = {
+            "repositories": [
+                {"repo_name": "slow", "repo_url": "https://github.com/test/slow"},
+                {"repo_name": "broken", "repo_url": "https://github.com/test/broken"},
+            ]
+        }
+        started = []
+        all_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fake_languages(repo_url, priority, ref, max_age, path_layout):
+            started.append(repo_url)
+            if len(started) == 2:
+                all_started.set()
+            if repo_url.endswith("broken"):
+                raise HomeAssistantError("Cannot connect")
+            await release.wait()
+            return ["en"]
+
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
+            mock_get.return_value.get_available_languages = AsyncMock(
+                side_effect=fake_languages
+            )
+
+            await async_setup_entry(mock_hass, mock_config_entry)
+            handler = self._get_service_handler(mock_hass, SERVICE_REFRESH_REPOSITORIES)
+
+            call = MagicMock()
+            call.data = {"max_age": 300}
+            call.return_response = True
+            task = asyncio.ensure_future(handler(call))
+            # Both repositories are queried before the first one answered
+            await asyncio.wait_for(all_started.wait(), 1)
+            release.set()
+            response = await task
+
+        assert response == {
+            "languages": {"slow": ["en"]},
+            "errors": {"broken": "Cannot connect"},
+        }
+        assert all(
+            c.kwargs["max_age"] == 300
+            for c in mock_get.return_value.get_available_languages.call_args_list
+        )
+
+    async def test_rebuild_index(self, mock_hass: MagicMock, mock_config_entry: MagicMock) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
+            mock_rm = MagicMock()
+            mock_rm.async_rebuild_index = AsyncMock(return_value=0)
+            mock_get.return_value = mock_rm
+
+            await async_setup_entry(mock_hass, mock_config_entry)
+            handler = self._get_service_handler(mock_hass, SERVICE_REBUILD_INDEX)
+
+            call = MagicMock()
+            call.data = {}
+            await handler(call)
+
+            mock_rm.async_rebuild_index.assert_called_once_with(["test-repo"])
+
+    async def test_reconcile_dry_run_returns_plan(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
+            await async_setup_entry(mock_hass, mock_config_entry)
+        handler = self._get_service_handler(mock_hass, SERVICE_RECONCILE)
+
+        with patch(
+            "custom_components.wakeword_installer.Reconciler"
+        ) as mock_reconciler_cls:
+            reconciler = mock_reconciler_cls.return_value
+            reconciler.async_plan = AsyncMock(
+                return_value=[Operation("add", "test-repo", ["de", "en"])]
+            )
+            reconciler.async_apply = AsyncMock()
+            call = MagicMock()
+            call.data = {"dry_run": True}
+            call.return_response = True
+            response = await handler(call)
+
+        reconciler.async_apply.assert_not_called()
+        assert response == {
+            "dry_run": True,
+            "operations": [
+                {"action": "add", "repository": "test-repo", "languages": ["de", "en"]}
+            ],
+            "errors": {},
+        }
+
+    async def test_reconcile_applies_plan(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
+            await async_setup_entry(mock_hass, mock_config_entry)
+        handler = self._get_service_handler(mock_hass, SERVICE_RECONCILE)
+
+        plan = [Operation("delete", "test-repo", ["fr"])]
+        with patch(
+            "custom_components.wakeword_installer.Reconciler"
+        ) as mock_reconciler_cls:
+            reconciler = mock_reconciler_cls.return_value
+            reconciler.async_plan = AsyncMock(return_value=plan)
+            reconciler.async_apply = AsyncMock(return_value={})
+            call = MagicMock()
+            call.data = {"dry_run": False}
+            call.return_response = False
+            response = await handler(call)
+
+        reconciler.async_apply.assert_awaited_once_with(
+            mock_config_entry.data["repositories"], plan
+        )
+        assert response is None
+
+    async def test_reconcile_failure_raises(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager"):
+            await async_setup_entry(mock_hass, mock_config_entry)
+        handler = self._get_service_handler(mock_hass, SERVICE_RECONCILE)
+
+        with patch(
+            "custom_components.wakeword_installer.Reconciler"
+        ) as mock_reconciler_cls:
+            reconciler = mock_reconciler_cls.return_value
+            reconciler.async_plan = AsyncMock(side_effect=OSError("boom"))
+            call = MagicMock()
+            call.data = {"dry_run": True}
+            with pytest.raises(HomeAssistantError):
+                await handler(call)
+
+    async def test_get_traces(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        with patch("custom_components.wakeword_installer.async_get_repository_manager") as mock_get:
+            mock_get.return_value.traces.as_list.return_value = [{"operation": "install"}]
+            await async_setup_entry(mock_hass, mock_config_entry)
+            handler = self._get_service_handler(mock_hass, SERVICE_GET_TRACES)
+
+            call = MagicMock()
+            call.data = {"limit": 5}
+            response = await handler(call)
+
+        mock_get.return_value.traces.as_list.assert_called_once_with(5)
+        assert response == {"traces": [{"operation": "install"}]}
+
+
+@pytest.mark.asyncio
+class TestUpdateListener:
+    """Test applying changes of a config entry."""
+
+    async def test_reloads_when_repositories_change(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        from custom_components.wakeword_installer import _async_update_listener
+
+        coordinator = MagicMock()
+        coordinator.repositories = []
+        coordinator.interval_minutes = 360
+        mock_hass.data[DOMAIN] = {
+            DATA_COORDINATORS: {mock_config_entry.entry_id: coordinator}
+        }
+        mock_hass.config_entries.async_reload = AsyncMock()
+
+        await _async_update_listener(mock_hass, mock_config_entry)
+
+        mock_hass.config_entries.async_reload.assert_awaited_once_with(
+            mock_config_entry.entry_id
+        )
+
+    async def test_applies_options_without_reload(
+        self, mock_hass: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        from custom_components.wakeword_installer import _async_update_listener
+
+        coordinator = MagicMock()
+        coordinator.repositories = mock_config_entry.data["repositories"]
+        coordinator.interval_minutes = 360
+        mock_hass.data[DOMAIN] = {
+            DATA_COORDINATORS: {mock_config_entry.entry_id: coordinator}
+        }
+        mock_hass.config_entries.async_reload = AsyncMock()
+        mock_config_entry.options = {"max_installs_per_host": 3}
+
+        with patch(
+            "custom_components.wakeword_installer.async_get_repository_manager"
+        ) as mock_get:
+            await _async_update_listener(mock_hass, mock_config_entry)
+
+        mock_hass.config_entries.async_reload.assert_not_called()
+        mock_get.return_value.set_install_limits.assert_called_once_with(
+            max_concurrent_installs=4, max_installs_per_host=3
+        )
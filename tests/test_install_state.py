@@ -0,0 +1,143 @@
+"""Tests for the persistent install state."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.wakeword_installer.install_state import InstallState
+
+
+@pytest.mark.asyncio
+class TestRepositoryRecords:
+    """Test the per-repository install records."""
+
+    async def test_up_to_date_requires_same_commit_and_languages(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.set_repository("repo", "https://github.com/t/repo", "a" * 40, ["en", "de"])
+
+        assert state.is_up_to_date("repo", "a" * 40, ["en"])
+        assert not state.is_up_to_date("repo", "a" * 40, ["fr"])
+        assert not state.is_up_to_date("repo", "b" * 40, ["en"])
+        assert not state.is_up_to_date("repo", None, ["en"])
+        assert not state.is_up_to_date("other", "a" * 40, ["en"])
+        assert state.installed_commit("repo") == "a" * 40
+        assert state.installed_commit("other") is None
+
+    async def test_same_commit_merges_languages(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.set_repository("repo", "https://github.com/t/repo", "a" * 40, ["en"])
+        state.set_repository("repo", "https://github.com/t/repo", "a" * 40, ["de"])
+
+        assert state.get_repository("repo")["languages"] == ["de", "en"]
+
+    async def test_loads_persisted_state(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        mock_store.async_load = AsyncMock(
+            return_value={
+                "repositories": {"repo": {"commit": "a" * 40, "languages": ["en"]}},
+                "files": {
+                    "repo_en_hey.tflite": {
+                        "repo": "repo",
+                        "language": "en",
+                        "source": "en/hey.tflite",
+                        "size": 1,
+                        "sha256": "0" * 64,
+                    }
+                },
+            }
+        )
+        state = InstallState(mock_hass)
+        await state.async_load()
+
+        assert state.index_built
+        assert state.get_files("repo") == ["repo_en_hey.tflite"]
+        assert state.is_up_to_date("repo", "a" * 40, ["en"])
+
+
+@pytest.mark.asyncio
+class TestFileIndex:
+    """Test the installed file index."""
+
+    async def test_index_not_built_without_stored_files(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+
+        assert not state.index_built
+
+    async def test_lookup_by_repository_and_language(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.add_file("foo_en_a.tflite", "foo", "en", "en/a.tflite", 1, "0" * 64)
+        state.add_file("foo_de_b.tflite", "foo", "de", "de/b.tflite", 1, "1" * 64)
+        state.add_file("foo_bar_en_c.tflite", "foo_bar", "en", "en/c.tflite", 1, "2" * 64)
+
+        assert state.get_files("foo") == ["foo_de_b.tflite", "foo_en_a.tflite"]
+        assert state.get_files("foo", ["en"]) == ["foo_en_a.tflite"]
+        assert state.files_by_language() == {
+            "en": ["foo_en_a.tflite", "foo_bar_en_c.tflite"],
+            "de": ["foo_de_b.tflite"],
+        }
+
+        state.remove_file("foo_en_a.tflite")
+
+        assert state.get_files("foo") == ["foo_de_b.tflite"]
+        assert state.get_file("foo_en_a.tflite") is None
+        mock_store.async_delay_save.assert_called()
+
+    async def test_counts_references_to_content(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.add_file("foo_en_a.tflite", "foo", "en", "en/a.tflite", 1, "0" * 64)
+        state.add_file("foo_de_a.tflite", "foo", "de", "de/a.tflite", 1, "0" * 64)
+
+        assert state.references("0" * 64) == 2
+
+        state.add_file("foo_de_a.tflite", "foo", "de", "de/a.tflite", 1, "1" * 64)
+        state.remove_file("foo_en_a.tflite")
+
+        assert state.references("0" * 64) == 0
+        assert state.references("1" * 64) == 1
+
+    async def test_installed_languages_include_indexed_files(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.set_repository("foo", "https://github.com/t/foo", "a" * 40, ["en"])
+        state.add_file("foo_fr_a.tflite", "foo", "fr", "fr/a.tflite", 1, "0" * 64)
+
+        assert state.installed_languages("foo") == ["en", "fr"]
+        assert state.installed_languages("bar") == []
+
+    async def test_tracks_file_count_and_size(
+        self, mock_hass: MagicMock, mock_store: MagicMock
+    ) -> None:
+        state = InstallState(mock_hass)
+        await state.async_load()
+        state.add_file("foo_en_a.tflite", "foo", "en", "en/a.tflite", 100, "0" * 64)
+        state.add_file("foo_de_a.tflite", "foo", "de", "de/a.tflite", 100, "0" * 64)
+        state.add_file("foo_de_a.tflite", "foo", "de", "de/a.tflite", 250, "1" * 64)
+
+        assert state.file_count("foo") == 2
+        assert state.total_size("foo") == 350
+
+        state.remove_file("foo_en_a.tflite")
+        state.remove_file("foo_de_a.tflite")
+
+        assert state.file_count("foo") == 0
+        assert state.total_size("foo") == 0
+        assert state.total_size("bar") == 0
@@ -0,0 +1,65 @@
+"""Tests for repository path layouts."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.wakeword_installer.const import DEFAULT_PATH_LAYOUT
+from custom_components.wakeword_installer.layout import PathLayout, PlannedFile
+
+
+class TestPathLayout:
+    """Test PathLayout."""
+
+    @pytest.mark.parametrize(
+        ("path", "language"),
+        [
+            ("en/hey.tflite", "en"),
+            ("en/sub/dir/hey.tflite", "en"),
+            ("hey.tflite", None),
+            ("en/hey.tflite.bak", None),
+            ("en/README.md", None),
+        ],
+    )
+    def test_default_layout(self, path: str, language: str | None) -> None:
+        assert PathLayout(DEFAULT_PATH_LAYOUT).match(path) == language
+
+    def test_custom_layout(self) -> None:
+        layout = PathLayout("models/{language}_v?/*.tflite")
+
+        assert layout.match("models/de_v2/hallo.tflite") == "de"
+        assert layout.match("models/de/hallo.tflite") is None
+        assert layout.match("other/de_v2/hallo.tflite") is None
+
+    @pytest.mark.parametrize(
+        "layout",
+        ["*.tflite", "{language}/{language}/*.tflite", "{language}/**", "a//{language}/*.tflite"],
+    )
+    def test_invalid_layouts(self, layout: str) -> None:
+        with pytest.raises(ValueError):
+            PathLayout(layout)
+
+    def test_plan_strips_archive_root(self) -> None:
+        layout = PathLayout(DEFAULT_PATH_LAYOUT)
+
+        planned = layout.plan(
+            [
+                ("repo-main/en/hey.tflite", 10),
+                ("repo-main/de/hallo.tflite", 20),
+                ("repo-main/fr/salut.tflite", 30),
+                ("repo-main/README.md", 1),
+            ],
+            ["en", "de"],
+            strip_root=True,
+        )
+
+        assert planned == [
+            PlannedFile("repo-main/en/hey.tflite", "en", 10),
+            PlannedFile("repo-main/de/hallo.tflite", "de", 20),
+        ]
+
+    def test_plan_does_not_match_language_in_nested_segment(self) -> None:
+        layout = PathLayout(DEFAULT_PATH_LAYOUT)
+
+        planned = layout.plan([("models/en/hey.tflite", 10)], ["en"])
+
+        assert planned == []
@@ -0,0 +1,118 @@
+"""Tests for measuring event loop stalls."""
+from __future__ import annotations
+
+import asyncio
+import gc
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.wakeword_installer.loop_monitor import LoopLagMonitor
+from custom_components.wakeword_installer.repository_manager import RepositoryManager
+
+# Longest the event loop may be blocked during any phase of the install
+# lifecycle. Every filesystem operation runs in the executor, so the loop
+# only ever runs short bookkeeping between awaits.
+LOOP_LAG_BUDGET = 0.05  # seconds
+MODELS = 200
+MODEL_SIZE = 64 * 1024
+
+
+@pytest.mark.asyncio
+class TestLoopLagMonitor:
+    """Test the monitor itself."""
+
+    async def test_records_worst_stall(self) -> None:
+        async with LoopLagMonitor(interval=0.005) as monitor:
+            await asyncio.sleep(0.02)
+            # Busy wait, Home Assistant rejects time.sleep inside the loop
+            blocked_until = time.perf_counter() + 0.1
+            while time.perf_counter() < blocked_until:
+                pass
+            await asyncio.sleep(0.02)
+
+        assert 0.08 < monitor.max_lag < 1
+        assert monitor.samples == []
+
+    async def test_keeps_samples_on_request(self) -> None:
+        async with LoopLagMonitor(interval=0.005, keep_samples=True) as monitor:
+            await asyncio.sleep(0.05)
+
+        assert monitor.samples
+        assert monitor.summary()["loop_lag_max_ms"] == monitor.max_lag * 1000
+
+
+@pytest.fixture
+def frozen_gc() -> None:
+    """Keep full collections of the test process heap out of the measurement.
+
+    A collection of the objects left behind by earlier tests can pause the
+    loop for longer than the budget, although no integration code blocks.
+    """
+    gc.collect()
+    gc.freeze()
+    yield
+    gc.unfreeze()
+
+
+@pytest.fixture
+def executor_hass(mock_hass: MagicMock) -> MagicMock:
+    """Return a mock hass that runs executor jobs in real worker threads."""
+
+    async def _run_in_executor(target, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, target, *args)
+
+    mock_hass.async_add_executor_job = _run_in_executor
+    return mock_hass
+
+
+def _write_archive(path: Path) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        for index in range(MODELS):
+            archive.writestr(
+                "wakewords-main/en/model_%03d.tflite" % index,
+                index.to_bytes(4, "big") * (MODEL_SIZE // 4),
+            )
+
+
+@pytest.mark.asyncio
+class TestLoopLagBudget:
+    """Fail if any phase of the install lifecycle blocks the event loop."""
+
+    async def test_install_lifecycle_stays_within_budget(
+        self, executor_hass: MagicMock, mock_store: MagicMock, frozen_gc: None
+    ) -> None:
+        with patch(
+            "custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession"
+        ):
+            manager = RepositoryManager(executor_hass)
+        manager._async_resolve_commit = AsyncMock(return_value="a" * 40)
+        # Without a tree the whole archive is downloaded and extracted
+        manager._async_get_tree = AsyncMock(return_value=None)
+
+        async def fake_download(url, dest, resume=True):
+            await executor_hass.async_add_executor_job(_write_archive, dest)
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH",
+            tmpdir,
+        ), patch.object(manager, "_download_file", side_effect=fake_download):
+            url = "https://github.com/test/wakewords"
+            await manager.install_wakewords(url, ["en"], "test-repo")
+            installed = len(manager.install_state.get_files("test-repo"))
+            await manager.install_wakewords(url, ["en"], "test-repo", force=True)
+            await manager.async_verify_installed()
+            await manager.async_rebuild_index(["test-repo"])
+            await manager.remove_repository_wakewords("test-repo")
+
+        assert installed == MODELS
+        assert set(manager.loop_lag) == {"install", "verify", "rebuild_index", "remove"}
+        for phase, lag in manager.loop_lag.items():
+            assert lag < LOOP_LAG_BUDGET, "%s blocked the event loop for %.0f ms" % (
+                phase,
+                lag * 1000,
+            )
@@ -0,0 +1,120 @@
+"""Tests for the GitHub API rate limiter."""
+from __future__ import annotations
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.wakeword_installer.rate_limiter import (
+    INTERACTIVE_RESERVE,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    GitHubRateLimiter,
+    RateLimitExceeded,
+)
+
+
+def _headers(remaining: int, limit: int = 60, reset_in: float = 600) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_in)),
+    }
+
+
+class TestDelay:
+    """Test how long requests are deferred."""
+
+    def test_unknown_budget_does_not_wait(self) -> None:
+        limiter = GitHubRateLimiter()
+
+        assert limiter.delay(PRIORITY_BACKGROUND, time.time()) == 0
+
+    def test_healthy_budget_does_not_wait(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=50))
+
+        assert limiter.delay(PRIORITY_BACKGROUND, time.time()) == 0
+
+    def test_reserve_is_kept_for_interactive_requests(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=INTERACTIVE_RESERVE, reset_in=600))
+        now = time.time()
+
+        assert limiter.delay(PRIORITY_BACKGROUND, now) > 500
+        assert limiter.delay(PRIORITY_INTERACTIVE, now) == 0
+
+    def test_exhausted_budget_defers_interactive_until_reset(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=0, reset_in=30))
+
+        assert 25 < limiter.delay(PRIORITY_INTERACTIVE, time.time()) <= 30
+
+    def test_budget_resets_after_window(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=0, reset_in=-1))
+
+        assert limiter.delay(PRIORITY_BACKGROUND, time.time()) == 0
+
+    def test_retry_after_blocks_all_requests(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(429, {"Retry-After": "20"})
+
+        assert limiter.is_limited(429)
+        assert limiter.delay(PRIORITY_INTERACTIVE, time.time()) > 15
+
+    def test_forbidden_without_exhausted_budget_is_not_rate_limit(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(403, _headers(remaining=10))
+
+        assert not limiter.is_limited(403)
+
+    def test_malformed_headers_are_ignored(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, {"X-RateLimit-Remaining": "lots"})
+
+        assert limiter.delay(PRIORITY_BACKGROUND, time.time()) == 0
+
+
+@pytest.mark.asyncio
+class TestAcquire:
+    """Test admitting requests."""
+
+    async def test_low_budget_spaces_background_requests(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=INTERACTIVE_RESERVE + 10, reset_in=100))
+
+        with patch(
+            "custom_components.wakeword_installer.rate_limiter.asyncio.sleep",
+            new_callable=AsyncMock,
+        ) as mock_sleep:
+            await limiter.async_acquire(PRIORITY_BACKGROUND)
+            await limiter.async_acquire(PRIORITY_BACKGROUND)
+
+        # About 100 s spread over the 10 spare requests
+        assert mock_sleep.await_count == 1
+        assert 8 < mock_sleep.await_args.args[0] <= 10
+        assert limiter.remaining == INTERACTIVE_RESERVE + 8
+
+    async def test_interactive_request_skips_background_spacing(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(200, _headers(remaining=INTERACTIVE_RESERVE + 10, reset_in=100))
+
+        with patch(
+            "custom_components.wakeword_installer.rate_limiter.asyncio.sleep",
+            new_callable=AsyncMock,
+        ) as mock_sleep:
+            await limiter.async_acquire(PRIORITY_BACKGROUND)
+            await limiter.async_acquire(PRIORITY_INTERACTIVE)
+
+        mock_sleep.assert_not_awaited()
+
+    async def test_long_wait_raises(self) -> None:
+        limiter = GitHubRateLimiter()
+        limiter.update(403, _headers(remaining=0, reset_in=3600))
+
+        with pytest.raises(RateLimitExceeded):
+            await limiter.async_acquire(PRIORITY_INTERACTIVE)
+        with pytest.raises(RateLimitExceeded):
+            await limiter.async_acquire(PRIORITY_BACKGROUND)
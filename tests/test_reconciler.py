@@ -0,0 +1,163 @@
+"""Tests for reconciling installed wakewords with the configuration."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.wakeword_installer.install_state import InstallState
+from custom_components.wakeword_installer.reconciler import (
+    ACTION_ADD,
+    ACTION_DELETE,
+    ACTION_UPDATE,
+    Operation,
+    Reconciler,
+)
+
+URL = "https://github.com/test/%s"
+
+
+def _repo(name: str, languages: list[str]) -> dict:
+    return {
+        "repo_name": name,
+        "repo_url": URL % name,
+        "selected_languages": languages,
+    }
+
+
+@pytest.fixture
+async def install_state(mock_hass: MagicMock, mock_store: MagicMock) -> InstallState:
+    """Return a loaded install state."""
+    state = InstallState(mock_hass)
+    await state.async_load()
+    return state
+
+
+@pytest.fixture
+def repo_manager(install_state: InstallState) -> MagicMock:
+    """Return a repository manager backed by a real install state."""
+    manager = MagicMock()
+    manager.install_state = install_state
+    manager.async_load_state = AsyncMock()
+    manager.async_get_latest_commit = AsyncMock(return_value="a" * 40)
+    manager.install_repositories = AsyncMock(return_value={})
+    manager.remove_wakewords = AsyncMock()
+    manager.remove_repository_wakewords = AsyncMock()
+    return manager
+
+
+@pytest.mark.asyncio
+class TestPlan:
+    """Test computing the operations."""
+
+    async def test_new_repository_is_added(self, repo_manager: MagicMock) -> None:
+        plan = await Reconciler(repo_manager).async_plan([_repo("foo", ["en", "de"])])
+
+        assert plan == [Operation(ACTION_ADD, "foo", ["de", "en"])]
+        # Nothing is installed, so there is nothing to check for updates
+        repo_manager.async_get_latest_commit.assert_not_called()
+
+    async def test_up_to_date_repository_needs_nothing(
+        self, repo_manager: MagicMock, install_state: InstallState
+    ) -> None:
+        install_state.set_repository("foo", URL % "foo", "a" * 40, ["en"])
+
+        plan = await Reconciler(repo_manager).async_plan([_repo("foo", ["en"])])
+
+        assert plan == []
+
+    async def test_moved_commit_updates_selected_languages(
+        self, repo_manager: MagicMock, install_state: InstallState
+    ) -> None:
+        install_state.set_repository("foo", URL % "foo", "b" * 40, ["en"])
+
+        plan = await Reconciler(repo_manager).async_plan([_repo("foo", ["en", "de"])])
+
+        assert plan == [Operation(ACTION_UPDATE, "foo", ["de", "en"])]
+
+    async def test_missing_languages_are_added_without_checking_updates(
+        self, repo_manager: MagicMock, install_state: InstallState
+    ) -> None:
+        install_state.set_repository("foo", URL % "foo", "b" * 40, ["en"])
+
+        plan = await Reconciler(repo_manager).async_plan(
+            [_repo("foo", ["en", "de"])], check_updates=False
+        )
+
+        assert plan == [Operation(ACTION_ADD, "foo", ["de"])]
+        repo_manager.async_get_latest_commit.assert_not_called()
+
+    async def test_deselected_languages_are_deleted(
+        self, repo_manager: MagicMock, install_state: InstallState
+    ) -> None:
+        install_state.set_repository("foo", URL % "foo", "a" * 40, ["en", "de"])
+        install_state.add_file("foo_fr_a.tflite", "foo", "fr", "fr/a.tflite", 1, "0" * 64)
+
+        plan = await Reconciler(repo_manager).async_plan([_repo("foo", ["en"])])
+
+        assert plan == [Operation(ACTION_DELETE, "foo", ["de", "fr"])]
+
+    async def test_unconfigured_repository_is_deleted(
+        self, repo_manager: MagicMock, install_state: InstallState
+    ) -> None:
+        install_state.set_repository("old", URL % "old", "a" * 40, ["en"])
+        # Files without an install record were not installed by a repository
+        install_state.add_file("manual_en_a.tflite", "manual", "en", "a", 1, "0" * 64)
+
+        plan = await Reconciler(repo_manager).async_plan([])
+
+        assert plan == [Operation(ACTION_DELETE, "old", ["en"])]
+
+
+@pytest.mark.asyncio
+class TestApply:
+    """Test applying a plan."""
+
+    async def test_installs_and_deletes_concurrently(
+        self, repo_manager: MagicMock
+    ) -> None:
+        repositories = [_repo("foo", ["en"]), _repo("bar", ["de"])]
+        plan = [
+            Operation(ACTION_ADD, "foo", ["en"]),
+            Operation(ACTION_UPDATE, "bar", ["de"]),
+            Operation(ACTION_DELETE, "foo", ["fr"]),
+            Operation(ACTION_DELETE, "old", ["en"]),
+        ]
+
+        errors = await Reconciler(repo_manager).async_apply(repositories, plan)
+
+        assert errors == {}
+        repo_manager.install_repositories.assert_awaited_once_with(repositories)
+        repo_manager.remove_wakewords.assert_awaited_once_with("foo", ["fr"])
+        repo_manager.remove_repository_wakewords.assert_awaited_once_with("old")
+
+    async def test_installs_only_planned_languages(
+        self, repo_manager: MagicMock
+    ) -> None:
+        plan = [Operation(ACTION_ADD, "foo", ["de"])]
+
+        await Reconciler(repo_manager).async_apply([_repo("foo", ["en", "de"])], plan)
+
+        repo_manager.install_repositories.assert_awaited_once_with(
+            [_repo("foo", ["de"])]
+        )
+
+    async def test_collects_errors(self, repo_manager: MagicMock) -> None:
+        repo_manager.install_repositories = AsyncMock(
+            return_value={"foo": "download failed"}
+        )
+        repo_manager.remove_repository_wakewords = AsyncMock(
+            side_effect=HomeAssistantError("permission denied")
+        )
+        plan = [
+            Operation(ACTION_ADD, "foo", ["en"]),
+            Operation(ACTION_DELETE, "old", ["en"]),
+        ]
+
+        errors = await Reconciler(repo_manager).async_apply(
+            [_repo("foo", ["en"])], plan
+        )
+
+        assert errors == {"foo": "download failed", "old": "permission denied"}
@@ -1,26 +1,51 @@
 """Tests for the RepositoryManager."""
 from __future__ import annotations
 
+import asyncio
+import errno
+import hashlib
+import io
+import tarfile
 import tempfile
+import time
 import zipfile
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.exceptions import HomeAssistantError
 
-from custom_components.wakeword_installer.repository_manager import RepositoryManager
+from custom_components.wakeword_installer.const import (
+    CONF_REPO_NAME,
+    CONF_REPOSITORIES,
+    DATA_ENTRIES,
+    DATA_MANAGER,
+    DEFAULT_PATH_LAYOUT,
+    DOMAIN,
+)
+from custom_components.wakeword_installer.blob_store import BlobStore
+from custom_components.wakeword_installer.layout import PathLayout
+from custom_components.wakeword_installer.rate_limiter import RateLimitExceeded
+from custom_components.wakeword_installer.repository_manager import (
+    RepositoryManager,
+    _is_safe_member_name,
+    _local_hashes,
+    async_get_repository_manager,
+)
 
 
 @pytest.fixture
-def repo_manager(mock_hass: MagicMock) -> RepositoryManager:
+def repo_manager(mock_hass: MagicMock, mock_store: MagicMock) -> RepositoryManager:
     """Create a RepositoryManager with mocked session."""
     with patch("custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession") as mock_cs:
         manager = RepositoryManager(mock_hass)
         # Replace with a controllable mock
         manager.session = AsyncMock()
         manager.session.closed = False
+        manager._async_resolve_commit = AsyncMock(return_value=None)
+        manager._async_get_tree = AsyncMock(return_value=None)
         return manager
 
 
@@ -56,11 +81,15 @@ class TestGetDownloadUrl:
 
     def test_standard_url(self, repo_manager: RepositoryManager) -> None:
         result = repo_manager._get_download_url("https://github.com/user/repo")
-        assert result == "https://github.com/user/repo/archive/refs/heads/main.zip"
+        assert result == "https://github.com/user/repo/archive/HEAD.zip"
 
     def test_url_with_git_suffix(self, repo_manager: RepositoryManager) -> None:
         result = repo_manager._get_download_url("https://github.com/user/repo.git")
-        assert result == "https://github.com/user/repo/archive/refs/heads/main.zip"
+        assert result == "https://github.com/user/repo/archive/HEAD.zip"
+
+    def test_tag(self, repo_manager: RepositoryManager) -> None:
+        result = repo_manager._get_download_url("https://github.com/user/repo", "v1.0")
+        assert result == "https://github.com/user/repo/archive/v1.0.zip"
 
     def test_invalid_url_raises(self, repo_manager: RepositoryManager) -> None:
         with pytest.raises(HomeAssistantError):
@@ -103,6 +132,7 @@ class TestGetAvailableLanguages:
     ) -> None:
         mock_response = AsyncMock()
         mock_response.status = 200
+        mock_response.headers = {}
         mock_response.json = AsyncMock(return_value=github_api_response)
         repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
 
@@ -112,20 +142,118 @@ class TestGetAvailableLanguages:
     async def test_non_200_raises(self, repo_manager: RepositoryManager) -> None:
         mock_response = AsyncMock()
         mock_response.status = 404
+        mock_response.headers = {}
         repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
 
         with pytest.raises(HomeAssistantError, match="Failed to fetch repository contents"):
             await repo_manager.get_available_languages("https://github.com/test/wakewords")
 
+    async def test_not_modified_returns_cached_languages(
+        self, repo_manager: RepositoryManager, github_api_response: list[dict]
+    ) -> None:
+        first = AsyncMock()
+        first.status = 200
+        first.headers = {"ETag": '"abc"'}
+        first.json = AsyncMock(return_value=github_api_response)
+        not_modified = AsyncMock()
+        not_modified.status = 304
+        not_modified.headers = {"ETag": '"abc"'}
+        repo_manager.session.get = MagicMock(
+            side_effect=[
+                self._mock_context_manager(first),
+                self._mock_context_manager(not_modified),
+            ]
+        )
+
+        await repo_manager.get_available_languages("https://github.com/test/wakewords")
+        result = await repo_manager.get_available_languages("https://github.com/test/wakewords")
+
+        assert result == ["de", "en", "fr"]
+        second_call = repo_manager.session.get.call_args_list[1]
+        assert second_call.kwargs["headers"] == {"If-None-Match": '"abc"'}
+        not_modified.json.assert_not_called()
+
+    async def test_max_age_skips_revalidation(
+        self, repo_manager: RepositoryManager, github_api_response: list[dict]
+    ) -> None:
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {"ETag": '"abc"'}
+        mock_response.json = AsyncMock(return_value=github_api_response)
+        repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
+
+        await repo_manager.get_available_languages("https://github.com/test/wakewords")
+        result = await repo_manager.get_available_languages(
+            "https://github.com/test/wakewords", max_age=60
+        )
+
+        assert result == ["de", "en", "fr"]
+        assert repo_manager.session.get.call_count == 1
+
+        await repo_manager.get_available_languages(
+            "https://github.com/test/wakewords", max_age=0
+        )
+
+        assert repo_manager.session.get.call_count == 2
+
+    async def test_mirror_receives_requests_without_token(
+        self, repo_manager: RepositoryManager
+    ) -> None:
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {}
+        mock_response.json = AsyncMock(return_value=[])
+        repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
+        repo_manager.set_github_token("ghp_secret")
+        repo_manager.set_mirror_url("http://cache.local/")
+
+        await repo_manager.get_available_languages("https://github.com/test/wakewords")
+
+        call = repo_manager.session.get.call_args
+        assert call.args[0] == "http://cache.local/api.github.com/repos/test/wakewords/contents"
+        assert "Authorization" not in call.kwargs["headers"]
+
     async def test_empty_repo_returns_empty(self, repo_manager: RepositoryManager) -> None:
         mock_response = AsyncMock()
         mock_response.status = 200
+        mock_response.headers = {}
         mock_response.json = AsyncMock(return_value=[{"name": "README.md", "type": "file"}])
         repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
 
         result = await repo_manager.get_available_languages("https://github.com/test/wakewords")
         assert result == []
 
+    async def test_token_is_sent_to_api(self, repo_manager: RepositoryManager) -> None:
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.headers = {}
+        mock_response.json = AsyncMock(return_value=[])
+        repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
+        repo_manager.set_github_token("ghp_secret")
+
+        await repo_manager.get_available_languages("https://github.com/test/wakewords")
+
+        headers = repo_manager.session.get.call_args.kwargs["headers"]
+        assert headers["Authorization"] == "Bearer ghp_secret"
+
+    async def test_rate_limit_rejection_raises(self, repo_manager: RepositoryManager) -> None:
+        mock_response = AsyncMock()
+        mock_response.status = 403
+        mock_response.headers = {
+            "X-RateLimit-Limit": "60",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(time.time()) + 1800),
+        }
+        repo_manager.session.get = MagicMock(return_value=self._mock_context_manager(mock_response))
+
+        with pytest.raises(RateLimitExceeded):
+            await repo_manager.get_available_languages("https://github.com/test/wakewords")
+
+        # Further requests are rejected without contacting GitHub
+        with pytest.raises(RateLimitExceeded):
+            await repo_manager.get_available_languages("https://github.com/test/other")
+        assert repo_manager.session.get.call_count == 1
+
 
 @pytest.mark.asyncio
 class TestClose:
@@ -141,6 +269,78 @@ class TestClose:
         await repo_manager.close()
         repo_manager.session.close.assert_not_called()
 
+    async def test_close_writes_pending_state(
+        self, repo_manager: RepositoryManager, mock_store: MagicMock
+    ) -> None:
+        await repo_manager.async_load_state(build_index=False)
+        await repo_manager._response_cache.async_load()
+        repo_manager.install_state.set_repository(
+            "r", "https://github.com/t/r", "abc", ["en"]
+        )
+
+        await repo_manager.close()
+
+        saved = [call.args[0] for call in mock_store.async_save.await_args_list]
+        assert {"entries": {}} in saved
+        assert any(data.get("repositories", {}).get("r") for data in saved)
+
+    async def test_close_without_loading_writes_nothing(
+        self, repo_manager: RepositoryManager, mock_store: MagicMock
+    ) -> None:
+        await repo_manager.close()
+
+        mock_store.async_save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestSharedSession:
+    """Test the pooled session and the shared manager."""
+
+    async def test_session_created_lazily_and_reused(self, mock_hass: MagicMock) -> None:
+        with (
+            patch("custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession") as mock_cs,
+            patch("custom_components.wakeword_installer.repository_manager.aiohttp.TCPConnector") as mock_conn,
+        ):
+            mock_cs.return_value.closed = False
+            manager = RepositoryManager(mock_hass)
+            mock_cs.assert_not_called()
+
+            first = manager._get_session()
+            second = manager._get_session()
+
+        assert first is second
+        mock_cs.assert_called_once()
+        mock_conn.assert_called_once()
+        assert mock_conn.call_args.kwargs["keepalive_timeout"] > 0
+
+    async def test_closed_session_is_recreated(self, repo_manager: RepositoryManager) -> None:
+        repo_manager.session.closed = True
+        with (
+            patch("custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession") as mock_cs,
+            patch("custom_components.wakeword_installer.repository_manager.aiohttp.TCPConnector"),
+        ):
+            session = repo_manager._get_session()
+
+        assert session is mock_cs.return_value
+
+    async def test_manager_is_shared(self, mock_hass: MagicMock) -> None:
+        first = async_get_repository_manager(mock_hass)
+        second = async_get_repository_manager(mock_hass)
+
+        assert first is second
+        assert mock_hass.data[DOMAIN][DATA_MANAGER] is first
+
+    async def test_manager_closes_when_home_assistant_stops(self, mock_hass: MagicMock) -> None:
+        repo_manager = async_get_repository_manager(mock_hass)
+        repo_manager.close = AsyncMock()
+
+        event_type, close_listener = mock_hass.bus.async_listen_once.call_args.args
+        assert event_type == EVENT_HOMEASSISTANT_STOP
+        await close_listener(None)
+
+        repo_manager.close.assert_awaited_once()
+        assert DATA_MANAGER not in mock_hass.data[DOMAIN]
+
 
 @pytest.mark.asyncio
 class TestInstallWakewords:
@@ -164,7 +364,7 @@ class TestInstallWakewords:
                 patch.object(repo_manager, "_download_file", new_callable=AsyncMock) as mock_dl,
             ):
                 # Make _download_file copy our pre-built zip to the expected path
-                async def fake_download(url, dest):
+                async def fake_download(url, dest, resume=True):
                     import shutil
                     shutil.copy2(zip_path, dest)
 
@@ -184,6 +384,690 @@ class TestInstallWakewords:
             assert "test-repo_en_hey_jarvis.tflite" in names
             assert "test-repo_de_hallo_jarvis.tflite" in names
 
+    async def test_install_is_traced(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/en/hey.tflite", b"model-en")
+                zf.writestr("repo-main/de/hallo.tflite", b"model-de")
+            repo_manager._async_resolve_commit = AsyncMock(return_value="a" * 40)
+            repo_manager._async_get_tree = AsyncMock(return_value=None)
+            listener = MagicMock()
+            repo_manager.async_add_listener(listener)
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(zip_path.read_bytes())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en", "de"], "test-repo"
+                )
+
+        trace = repo_manager.traces.as_list()[0]
+        listener.assert_called_once_with()
+        assert repo_manager.install_durations["test-repo"] == trace["duration"]
+        assert repo_manager.install_state.file_count("test-repo") == 2
+        assert repo_manager.install_state.total_size("test-repo") == 16
+        assert trace["operation"] == "install"
+        assert trace["repository"] == "test-repo"
+        assert trace["error"] is None
+        assert trace["duration"] > 0
+        assert {"resolve", "tree", "download", "zip_parse", "decompress", "link"} <= set(
+            trace["phases"]
+        )
+        assert trace["counters"]["files_installed"] == 2
+
+    async def test_identical_models_share_one_blob(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/en/hey.tflite", b"shared-model")
+                zf.writestr("repo-main/de/hey.tflite", b"shared-model")
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(zip_path.read_bytes())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en", "de"], "test-repo"
+                )
+                en = install_path / "test-repo_en_hey.tflite"
+                de = install_path / "test-repo_de_hey.tflite"
+                assert en.stat().st_ino == de.stat().st_ino
+                blobs = [p for p in (install_path / ".wakeword_installer" / "blobs").rglob("*") if p.is_file()]
+                assert len(blobs) == 1
+
+                await repo_manager.remove_wakewords("test-repo", ["en"])
+                assert blobs[0].exists()
+                assert de.read_bytes() == b"shared-model"
+
+                await repo_manager.remove_wakewords("test-repo", ["de"])
+                assert not blobs[0].exists()
+
+    async def test_blobs_are_kept_while_an_install_uses_them(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/en/hey.tflite", b"model")
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(zip_path.read_bytes())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+                blobs = [p for p in (install_path / ".wakeword_installer" / "blobs").rglob("*") if p.is_file()]
+
+                async with repo_manager._async_use_blobs():
+                    await repo_manager.remove_repository_wakewords("test-repo")
+                    assert blobs[0].exists()
+
+                assert not blobs[0].exists()
+
+
+@pytest.mark.asyncio
+class TestInstallUpToDate:
+    """Test skipping installs when the upstream commit has not changed."""
+
+    async def test_skips_download_when_commit_unchanged(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo_manager._async_resolve_commit = AsyncMock(return_value="a" * 40)
+            repo_manager.install_state.set_repository(
+                "test-repo", "https://github.com/test/wakewords", "a" * 40, ["en", "de"]
+            )
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", new_callable=AsyncMock) as mock_dl,
+            ):
+                installed = await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+
+        assert installed is False
+        mock_dl.assert_not_called()
+        assert "test-repo" not in repo_manager.install_durations
+
+    async def test_failed_member_is_retried(self, repo_manager: RepositoryManager) -> None:
+        repo_manager._async_resolve_commit = AsyncMock(return_value="a" * 40)
+        add_stream = BlobStore.add_stream
+        calls = 0
+
+        def failing_add_stream(store, source):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            return add_stream(store, source)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/en/a.tflite", b"model-a")
+                zf.writestr("repo-main/en/b.tflite", b"model-b")
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(zip_path.read_bytes())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+                patch.object(BlobStore, "add_stream", failing_add_stream),
+            ):
+                with pytest.raises(HomeAssistantError):
+                    await repo_manager.install_wakewords(
+                        "https://github.com/test/wakewords", ["en"], "r"
+                    )
+                assert repo_manager.install_state.get_repository("r") is None
+                assert repo_manager.install_state.get_files("r") == ["r_en_a.tflite"]
+
+                installed = await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "r"
+                )
+
+            assert installed is True
+            assert (install_path / "r_en_b.tflite").read_bytes() == b"model-b"
+
+    async def test_downloads_commit_archive_when_commit_changed(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo_manager._async_resolve_commit = AsyncMock(return_value="b" * 40)
+            repo_manager.install_state.set_repository(
+                "test-repo", "https://github.com/test/wakewords", "a" * 40, ["en"]
+            )
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", new_callable=AsyncMock) as mock_dl,
+                patch.object(repo_manager, "_extract_and_install", new_callable=AsyncMock),
+            ):
+                installed = await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+
+        assert installed is True
+        assert mock_dl.call_args.args[0] == (
+            "https://github.com/test/wakewords/archive/%s.zip" % ("b" * 40)
+        )
+        assert repo_manager.install_state.get_repository("test-repo")["commit"] == "b" * 40
+
+    async def test_resolve_commit_requests_bare_sha(self, repo_manager: RepositoryManager) -> None:
+        response = AsyncMock()
+        response.status = 200
+        response.headers = {}
+        response.text = AsyncMock(return_value="c" * 40 + "\n")
+        repo_manager.session.get = MagicMock(
+            return_value=TestGetAvailableLanguages._mock_context_manager(response)
+        )
+
+        commit = await RepositoryManager._async_resolve_commit(
+            repo_manager, "https://github.com/test/wakewords"
+        )
+
+        assert commit == "c" * 40
+        call = repo_manager.session.get.call_args
+        assert call.args[0] == "https://api.github.com/repos/test/wakewords/commits/HEAD"
+        assert call.kwargs["headers"]["Accept"] == "application/vnd.github.sha"
+
+    async def test_force_reinstalls_unchanged_commit(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo_manager._async_resolve_commit = AsyncMock(return_value="a" * 40)
+            repo_manager.install_state.set_repository(
+                "test-repo", "https://github.com/test/wakewords", "a" * 40, ["en"]
+            )
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", new_callable=AsyncMock) as mock_dl,
+                patch.object(repo_manager, "_extract_and_install", new_callable=AsyncMock),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo", force=True
+                )
+
+        mock_dl.assert_called_once()
+
+    async def test_pinned_commit_needs_no_request(self, repo_manager: RepositoryManager) -> None:
+        repo_manager.session.get = MagicMock()
+
+        commit = await RepositoryManager._async_resolve_commit(
+            repo_manager, "https://github.com/test/wakewords", "d" * 40
+        )
+
+        assert commit == "d" * 40
+        repo_manager.session.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestPinnedInstall:
+    """Test installing repositories pinned to a commit."""
+
+    async def test_tree_of_commit_is_cached_without_revalidation(
+        self, repo_manager: RepositoryManager
+    ) -> None:
+        response = AsyncMock()
+        response.status = 200
+        response.headers = {}
+        response.json = AsyncMock(
+            return_value={
+                "tree": [{"path": "en/hey.tflite", "type": "blob", "sha": "x", "size": 1}]
+            }
+        )
+        repo_manager.session.get = MagicMock(
+            return_value=TestGetAvailableLanguages._mock_context_manager(response)
+        )
+
+        for _ in range(2):
+            tree = await RepositoryManager._async_get_tree(
+                repo_manager, "https://github.com/test/wakewords", "d" * 40
+            )
+
+        assert tree["files"][0]["path"] == "en/hey.tflite"
+        assert repo_manager.session.get.call_count == 1
+
+    async def test_archive_of_pinned_commit_is_reused(self, repo_manager: RepositoryManager) -> None:
+        repo_manager._async_resolve_commit = AsyncMock(return_value="d" * 40)
+
+        async def fake_download(url, dest, resume=True):
+            dest.write_bytes(b"archive")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download) as mock_dl,
+                patch.object(repo_manager, "_extract_and_install", new_callable=AsyncMock),
+            ):
+                for _ in range(2):
+                    await repo_manager.install_wakewords(
+                        "https://github.com/test/wakewords",
+                        ["en"],
+                        "test-repo",
+                        force=True,
+                        ref="d" * 40,
+                    )
+
+            archives = list((Path(tmpdir) / ".wakeword_installer" / "archives").iterdir())
+
+        mock_dl.assert_called_once()
+        assert mock_dl.call_args.args[0] == (
+            "https://github.com/test/wakewords/archive/%s.zip" % ("d" * 40)
+        )
+        assert len(archives) == 1
+        assert repo_manager.install_state.get_repository("test-repo")["commit"] == "d" * 40
+
+    async def test_branch_archive_is_removed_after_install(self, repo_manager: RepositoryManager) -> None:
+        repo_manager._async_resolve_commit = AsyncMock(return_value="b" * 40)
+
+        async def fake_download(url, dest, resume=True):
+            dest.write_bytes(b"archive")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+                patch.object(repo_manager, "_extract_and_install", new_callable=AsyncMock),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo", ref="develop"
+                )
+
+            downloads = list((Path(tmpdir) / ".wakeword_installer" / "downloads").iterdir())
+
+        repo_manager._async_resolve_commit.assert_awaited_once_with(
+            "https://github.com/test/wakewords", "develop"
+        )
+        assert downloads == []
+
+
+def _tree(paths: list[str], size: int = 10, total_size: int = 10000) -> dict:
+    """Build a parsed tree as returned by _async_get_tree."""
+    return {
+        "truncated": False,
+        "total_size": total_size,
+        "files": [{"path": p, "sha": "0" * 40, "size": size} for p in paths],
+    }
+
+
+class TestPlanSparseInstall:
+    """Test selecting files for a sparse install."""
+
+    layout = PathLayout(DEFAULT_PATH_LAYOUT)
+
+    def test_selects_files_of_selected_languages(self, repo_manager: RepositoryManager) -> None:
+        tree = _tree(["en/hey.tflite", "de/hallo.tflite", "fr/salut.tflite", "en/sub/hi.tflite"])
+
+        files = repo_manager._plan_sparse_install(tree, ["en", "de"], self.layout)
+
+        assert [(f.path, f.language) for f in files] == [
+            ("en/hey.tflite", "en"),
+            ("de/hallo.tflite", "de"),
+            ("en/sub/hi.tflite", "en"),
+        ]
+
+    def test_missing_or_truncated_tree_falls_back(self, repo_manager: RepositoryManager) -> None:
+        tree = _tree(["en/hey.tflite"])
+        tree["truncated"] = True
+
+        assert repo_manager._plan_sparse_install(None, ["en"], self.layout) is None
+        assert repo_manager._plan_sparse_install(tree, ["en"], self.layout) is None
+
+    def test_large_selection_falls_back(self, repo_manager: RepositoryManager) -> None:
+        tree = _tree(["en/hey.tflite", "de/hallo.tflite"], size=10, total_size=30)
+
+        assert repo_manager._plan_sparse_install(tree, ["en", "de"], self.layout) is None
+
+
+@pytest.mark.asyncio
+class TestSparseInstall:
+    """Test installing individual files."""
+
+    async def test_downloads_selected_files(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            repo_manager._async_get_tree = AsyncMock(
+                return_value=_tree(["en/hey.tflite", "fr/salut.tflite"])
+            )
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(url.encode())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+
+            names = sorted(
+                f.name for f in install_path.iterdir() if f.name != ".wakeword_installer"
+            )
+            assert names == ["test-repo_en_hey.tflite"]
+            assert (install_path / "test-repo_en_hey.tflite").read_bytes() == (
+                b"https://raw.githubusercontent.com/test/wakewords/HEAD/en/hey.tflite"
+            )
+
+
+def _git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+@pytest.mark.asyncio
+class TestReconcile:
+    """Test skipping models whose installed copy matches upstream."""
+
+    async def test_only_changed_files_are_downloaded(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            (install_path / "test-repo_en_same.tflite").write_bytes(b"same")
+            (install_path / "test-repo_en_old.tflite").write_bytes(b"old")
+            tree = _tree(["en/same.tflite", "en/old.tflite", "en/new.tflite"])
+            tree["files"][0]["sha"] = _git_blob_sha(b"same")
+            repo_manager._async_get_tree = AsyncMock(return_value=tree)
+            repo_manager._async_resolve_commit = AsyncMock(return_value="b" * 40)
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(url.encode())
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download) as mock_dl,
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+
+        downloaded = sorted(call.args[0].rsplit("/", 1)[1] for call in mock_dl.call_args_list)
+        assert downloaded == ["new.tflite", "old.tflite"]
+        entry = repo_manager.install_state.get_file("test-repo_en_same.tflite")
+        assert entry["git_sha"] == _git_blob_sha(b"same")
+        assert entry["sha256"] == hashlib.sha256(b"same").hexdigest()
+        assert repo_manager.install_state.get_file("test-repo_en_new.tflite")["git_sha"] == "0" * 40
+
+    async def test_force_downloads_unchanged_files(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "test-repo_en_same.tflite").write_bytes(b"same")
+            tree = _tree(["en/same.tflite"])
+            tree["files"][0]["sha"] = _git_blob_sha(b"same")
+            repo_manager._async_get_tree = AsyncMock(return_value=tree)
+
+            async def fake_download(url, dest, resume=True):
+                dest.write_bytes(b"same")
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", tmpdir),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download) as mock_dl,
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo", force=True
+                )
+
+        mock_dl.assert_called_once()
+
+
+class TestLocalHashes:
+    """Test hashing installed files."""
+
+    def test_hashes_are_cached_by_stat(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = Path(tmpdir) / "model.tflite"
+            file_path.write_bytes(b"model")
+
+            hashes = _local_hashes(file_path, None)
+            assert hashes.git_sha == _git_blob_sha(b"model")
+
+            cached = {"stat": hashes.stat, "sha256": "s", "git_sha": "g"}
+            assert _local_hashes(file_path, cached).git_sha == "g"
+
+            file_path.write_bytes(b"changed")
+            assert _local_hashes(file_path, cached).git_sha == _git_blob_sha(b"changed")
+            assert _local_hashes(Path(tmpdir) / "missing.tflite", None) is None
+
+
+@pytest.mark.asyncio
+class TestVerifyInstalled:
+    """Test the startup check of installed files."""
+
+    async def test_restores_from_blobs_and_drops_lost_languages(
+        self, repo_manager: RepositoryManager
+    ) -> None:
+        state = repo_manager.install_state
+        await state.async_load()
+        state.set_repository("repo", "https://github.com/t/repo", "a" * 40, ["en", "de"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            with patch(
+                "custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH",
+                tmpdir,
+            ):
+                blobs = repo_manager._blob_store()
+                blobs.root.mkdir(parents=True)
+                stored = blobs.root / "stored.part"
+                stored.write_bytes(b"stored")
+                _, stored_sha = blobs.add_file(stored)
+
+                (install_path / "repo_en_ok.tflite").write_bytes(b"ok")
+                state.add_file("repo_en_ok.tflite", "repo", "en", "en/ok.tflite", 2, "0" * 64)
+                state.add_file("repo_en_gone.tflite", "repo", "en", "en/gone.tflite", 6, stored_sha)
+                state.add_file("repo_de_lost.tflite", "repo", "de", "de/lost.tflite", 4, "1" * 64)
+
+                damaged = await repo_manager.async_verify_installed()
+
+                assert (install_path / "repo_en_gone.tflite").read_bytes() == b"stored"
+
+        assert damaged == 2
+        assert state.get_repository("repo")["languages"] == ["en"]
+        assert state.get_file("repo_en_gone.tflite")["stat"][0] == 6
+
+    async def test_missing_index_is_not_built(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            (Path(tmpdir) / "repo_en_hey.tflite").write_bytes(b"model")
+            with patch(
+                "custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH",
+                tmpdir,
+            ):
+                damaged = await repo_manager.async_verify_installed()
+
+        assert damaged == 0
+        assert not repo_manager.install_state.index_built
+
+
+@pytest.mark.asyncio
+class TestInstallRepositories:
+    """Test concurrent installation from several repositories."""
+
+    @staticmethod
+    def _repos(count: int) -> list[dict]:
+        return [
+            {
+                "repo_name": "repo%d" % i,
+                "repo_url": "https://github.com/test/repo%d" % i,
+                "selected_languages": ["en"],
+            }
+            for i in range(count)
+        ]
+
+    async def test_reports_each_repository(self, repo_manager: RepositoryManager) -> None:
+        async def fake_install(repo_url, languages, repo_name, force=False, **kwargs):
+            if repo_name == "repo1":
+                raise HomeAssistantError("boom")
+
+        with patch.object(repo_manager, "install_wakewords", side_effect=fake_install):
+            results = await repo_manager.install_repositories(self._repos(3))
+
+        assert results == {"repo0": None, "repo1": "boom", "repo2": None}
+
+    async def test_skips_repos_without_languages(self, repo_manager: RepositoryManager) -> None:
+        repos = self._repos(2)
+        repos[1]["selected_languages"] = []
+
+        with patch.object(repo_manager, "install_wakewords", new_callable=AsyncMock) as mock_install:
+            results = await repo_manager.install_repositories(repos)
+
+        assert list(results) == ["repo0"]
+        mock_install.assert_called_once()
+
+    async def test_respects_concurrency_limits(self, mock_hass: MagicMock) -> None:
+        with patch("custom_components.wakeword_installer.repository_manager.aiohttp.ClientSession"):
+            manager = RepositoryManager(
+                mock_hass, max_concurrent_installs=3, max_installs_per_host=2
+            )
+
+        running = 0
+        peak = 0
+
+        async def fake_install(repo_url, languages, repo_name, force=False, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        with patch.object(manager, "install_wakewords", side_effect=fake_install):
+            results = await manager.install_repositories(self._repos(6))
+
+        assert len(results) == 6
+        # All repositories live on github.com, so the per-host limit applies
+        assert peak == 2
+
+
+@pytest.mark.asyncio
+class TestCustomPathLayout:
+    """Test installing from repositories with a custom layout."""
+
+    async def test_install_with_custom_layout(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/models/en/hey.tflite", b"en")
+                zf.writestr("repo-main/en/unrelated.tflite", b"other")
+
+            async def fake_download(url, dest, resume=True):
+                import shutil
+                shutil.copy2(zip_path, dest)
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords",
+                    ["en"],
+                    "test-repo",
+                    path_layout="models/{language}/*.tflite",
+                )
+
+            names = sorted(f.name for f in install_path.glob("*.tflite"))
+            assert names == ["test-repo_en_hey.tflite"]
+
+    async def test_invalid_layout_raises(self, repo_manager: RepositoryManager) -> None:
+        with pytest.raises(HomeAssistantError):
+            await repo_manager.install_wakewords(
+                "https://github.com/test/wakewords", ["en"], "test-repo", path_layout="*.tflite"
+            )
+
+
+@pytest.mark.asyncio
+class TestLocalSources:
+    """Test installing from local directories and archives."""
+
+    async def test_install_from_directory(self, repo_manager: RepositoryManager) -> None:
+        del repo_manager._async_resolve_commit
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            source = Path(tmpdir) / "mirror" / "wakewords"
+            (source / "en").mkdir(parents=True)
+            (source / "de").mkdir()
+            (source / ".git").mkdir()
+            (source / "en" / "hey.tflite").write_bytes(b"model-en")
+            (source / "de" / "hallo.tflite").write_bytes(b"model-de")
+            (source / ".git" / "en.tflite").write_bytes(b"ignored")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                assert await repo_manager.get_available_languages(str(source)) == ["de", "en"]
+                installed = await repo_manager.install_wakewords(str(source), ["en"])
+                again = await repo_manager.install_wakewords(str(source), ["en"])
+
+            assert installed is True
+            # The fingerprint of the unchanged directory is already installed
+            assert again is False
+            assert (install_path / "wakewords_en_hey.tflite").read_bytes() == b"model-en"
+            assert not (install_path / "wakewords_de_hallo.tflite").exists()
+            record = repo_manager.install_state.get_repository("wakewords")
+            assert len(record["commit"]) == 40
+
+    async def test_install_from_tarball(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            archive = Path(tmpdir) / "wakewords.tar.gz"
+            with tarfile.open(archive, "w:gz") as tar:
+                for name, data in (
+                    ("wakewords-main/en/hey.tflite", b"model-en"),
+                    ("wakewords-main/de/hallo.tflite", b"model-de"),
+                ):
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                await repo_manager.install_wakewords("file://%s" % archive, ["en", "de"])
+
+            names = sorted(f.name for f in install_path.glob("*.tflite"))
+            assert names == ["wakewords_de_hallo.tflite", "wakewords_en_hey.tflite"]
+            # The archive is the user's and is never deleted
+            assert archive.exists()
+
+    async def test_install_from_zip_without_root(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            archive = Path(tmpdir) / "models.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("en/hey.tflite", b"model-en")
+                zf.writestr("de/hallo.tflite", b"model-de")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                await repo_manager.install_wakewords(str(archive), ["de"], "local")
+
+            names = sorted(f.name for f in install_path.glob("*.tflite"))
+            assert names == ["local_de_hallo.tflite"]
+
+    async def test_install_from_single_language_zip(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            archive = Path(tmpdir) / "models.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("en/a.tflite", b"model-a")
+                zf.writestr("en/b.tflite", b"model-b")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                assert await repo_manager.get_available_languages(str(archive)) == ["en"]
+                await repo_manager.install_wakewords(str(archive), ["en"], "local")
+
+            names = sorted(f.name for f in install_path.glob("*.tflite"))
+            assert names == ["local_en_a.tflite", "local_en_b.tflite"]
+
+    async def test_local_source_does_not_use_github(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(HomeAssistantError):
+                await repo_manager.get_available_languages(str(Path(tmpdir) / "missing.zip"))
+
+        repo_manager.session.get.assert_not_called()
+
 
 @pytest.mark.asyncio
 class TestRemoveWakewords:
@@ -219,6 +1103,90 @@ class TestRemoveWakewords:
             assert "other-repo" in remaining[0].name
 
 
+@pytest.mark.asyncio
+class TestInstalledIndex:
+    """Test the persistent index of installed files."""
+
+    async def test_remove_uses_index_for_underscored_repo_names(
+        self, repo_manager: RepositoryManager
+    ) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            (install_path / "foo_en_hey.tflite").write_bytes(b"x")
+            (install_path / "foo_bar_en_hey.tflite").write_bytes(b"x")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                await repo_manager.async_rebuild_index(["foo", "foo_bar"])
+                await repo_manager.remove_repository_wakewords("foo")
+
+            remaining = sorted(f.name for f in install_path.glob("*.tflite"))
+            assert remaining == ["foo_bar_en_hey.tflite"]
+            entry = repo_manager.install_state.get_file("foo_bar_en_hey.tflite")
+            assert entry["repo"] == "foo_bar"
+            assert entry["language"] == "en"
+
+    async def test_first_build_knows_configured_repo_names(
+        self, repo_manager: RepositoryManager, mock_hass: MagicMock
+    ) -> None:
+        mock_hass.data[DOMAIN] = {
+            DATA_ENTRIES: {
+                "entry": {CONF_REPOSITORIES: [{CONF_REPO_NAME: "foo_bar"}]}
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            (install_path / "foo_bar_en_hey.tflite").write_bytes(b"x")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                await repo_manager.async_load_state()
+
+            entry = repo_manager.install_state.get_file("foo_bar_en_hey.tflite")
+            assert entry["repo"] == "foo_bar"
+            assert entry["language"] == "en"
+
+    async def test_listing_does_not_scan_directory_once_indexed(
+        self, repo_manager: RepositoryManager
+    ) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir)
+            (install_path / "repo_en_hey.tflite").write_bytes(b"x")
+
+            with patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)):
+                await repo_manager.get_installed_wakewords()
+                # Files added behind the integration's back are not picked up
+                (install_path / "repo_de_hallo.tflite").write_bytes(b"x")
+                result = await repo_manager.get_installed_wakewords()
+
+            assert result == {"en": ["repo_en_hey.tflite"]}
+
+    async def test_install_records_files(self, repo_manager: RepositoryManager) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            install_path = Path(tmpdir) / "openwakeword"
+            zip_path = Path(tmpdir) / "repo.zip"
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("repo-main/en/hey_jarvis.tflite", b"fake-model-en")
+
+            async def fake_download(url, dest, resume=True):
+                import shutil
+                shutil.copy2(zip_path, dest)
+
+            with (
+                patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
+                patch.object(repo_manager, "_download_file", side_effect=fake_download),
+            ):
+                await repo_manager.install_wakewords(
+                    "https://github.com/test/wakewords", ["en"], "test-repo"
+                )
+
+        entry = repo_manager.install_state.get_file("test-repo_en_hey_jarvis.tflite")
+        assert entry["repo"] == "test-repo"
+        assert entry["language"] == "en"
+        # Recorded relative to the repository, as by sparse installs
+        assert entry["source"] == "en/hey_jarvis.tflite"
+        assert entry["size"] == len(b"fake-model-en")
+        assert len(entry["sha256"]) == 64
+
+
 @pytest.mark.asyncio
 class TestGetInstalledWakewords:
     """Test listing installed wakewords."""
@@ -271,7 +1239,7 @@ class TestZipSlipProtection:
                 patch("custom_components.wakeword_installer.repository_manager.WAKEWORD_INSTALL_PATH", str(install_path)),
                 patch.object(repo_manager, "_download_file", new_callable=AsyncMock) as mock_dl,
             ):
-                async def fake_download(url, dest):
+                async def fake_download(url, dest, resume=True):
                     import shutil
                     shutil.copy2(zip_path, dest)
 
@@ -289,3 +1257,255 @@ class TestZipSlipProtection:
             assert "test-repo_en_good.tflite" in names
             # The evil file should NOT exist outside the install path
             assert not Path(tmpdir).joinpath("etc/evil.tflite").exists()
+
+
+class TestStreamingExtraction:
+    """Test writing zip members straight to their destination."""
+
+    @pytest.mark.parametrize(
+        ("name", "safe"),
+        [
+            ("repo-main/en/good.tflite", True),
+            ("repo-main/en/../../etc/evil.tflite", False),
+            ("/etc/evil.tflite", False),
+            ("repo-main\\..\\evil.tflite", False),
+            ("C:/evil.tflite", False),
+        ],
+    )
+    def test_member_name_validation(self, name: str, safe: bool) -> None:
+        assert _is_safe_member_name(name) is safe
+
+
+class _FakeContent:
+    """Response body that can fail after a number of bytes."""
+
+    def __init__(self, body: bytes, fail_after: int | None = None) -> None:
+        self._body = body
+        self._fail_after = fail_after
+
+    async def iter_chunked(self, size: int):
+        import aiohttp
+
+        end = len(self._body) if self._fail_after is None else self._fail_after
+        for start in range(0, end, 4):
+            yield self._body[start : min(start + 4, end)]
+        if self._fail_after is not None:
+            raise aiohttp.ClientPayloadError("connection reset")
+
+
+def _download_response(
+    status: int,
+    body: bytes,
+    headers: dict | None = None,
+    fail_after: int | None = None,
+) -> AsyncMock:
+    """Create a mock async context manager yielding a download response."""
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {}
+    response.content_length = len(body)
+    response.content = _FakeContent(body, fail_after)
+    ctx = AsyncMock()
+    ctx.__aenter__ = AsyncMock(return_value=response)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    return ctx
+
+
+@pytest.mark.asyncio
+class TestResumableDownload:
+    """Test resuming interrupted downloads with range requests."""
+
+    async def test_resumes_after_interruption(self, repo_manager: RepositoryManager) -> None:
+        body = b"0123456789abcdef"
+        repo_manager.session.get = MagicMock(
+            side_effect=[
+                _download_response(200, body, {"ETag": '"v1"'}, fail_after=8),
+                _download_response(
+                    206, body[8:], {"Content-Range": "bytes 8-15/16"}
+                ),
+            ]
+        )
+
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            patch("custom_components.wakeword_installer.repository_manager.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            file_path = Path(tmpdir) / "repo.zip"
+            await repo_manager._download_file("https://example.com/repo.zip", file_path)
+
+            assert file_path.read_bytes() == body
+            assert [f.name for f in Path(tmpdir).iterdir()] == ["repo.zip"]
+
+        resume_headers = repo_manager.session.get.call_args_list[1].kwargs["headers"]
+        assert resume_headers == {"Range": "bytes=8-", "If-Range": '"v1"'}
+
+    async def test_restarts_when_server_ignores_range(self, repo_manager: RepositoryManager) -> None:
+        body = b"0123456789abcdef"
+        repo_manager.session.get = MagicMock(
+            side_effect=[
+                _download_response(200, b"stale-partial", {"ETag": '"v1"'}, fail_after=8),
+                _download_response(200, body, {"ETag": '"v2"'}),
+            ]
+        )
+
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            patch("custom_components.wakeword_installer.repository_manager.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            file_path = Path(tmpdir) / "repo.zip"
+            await repo_manager._download_file("https://example.com/repo.zip", file_path)
+
+            assert file_path.read_bytes() == body
+
+    async def test_no_resume_without_validator(self, repo_manager: RepositoryManager) -> None:
+        body = b"0123456789abcdef"
+        repo_manager.session.get = MagicMock(
+            side_effect=[
+                _download_response(200, body, {"ETag": 'W/"weak"'}, fail_after=8),
+                _download_response(200, body),
+            ]
+        )
+
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            patch("custom_components.wakeword_installer.repository_manager.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            await repo_manager._download_file(
+                "https://example.com/repo.zip", Path(tmpdir) / "repo.zip"
+            )
+
+        assert repo_manager.session.get.call_args_list[1].kwargs["headers"] == {}
+
+    async def test_retries_are_bounded(self, repo_manager: RepositoryManager) -> None:
+        from custom_components.wakeword_installer.repository_manager import (
+            DOWNLOAD_RETRIES,
+        )
+
+        repo_manager.session.get = MagicMock(
+            side_effect=lambda *args, **kwargs: _download_response(503, b"")
+        )
+
+        with (
+            tempfile.TemporaryDirectory() as tmpdir,
+            patch("custom_components.wakeword_installer.repository_manager.asyncio.sleep", new_callable=AsyncMock),
+        ):
+            with pytest.raises(HomeAssistantError):
+                await repo_manager._download_file(
+                    "https://example.com/repo.zip", Path(tmpdir) / "repo.zip"
+                )
+
+        assert repo_manager.session.get.call_count == DOWNLOAD_RETRIES + 1
+
+    async def test_client_error_is_not_retried(self, repo_manager: RepositoryManager) -> None:
+        repo_manager.session.get = MagicMock(return_value=_download_response(404, b""))
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with pytest.raises(HomeAssistantError):
+                await repo_manager._download_file(
+                    "https://example.com/repo.zip", Path(tmpdir) / "repo.zip"
+                )
+            assert list(Path(tmpdir).iterdir()) == []
+
+        assert repo_manager.session.get.call_count == 1
+
+
+@pytest.mark.asyncio
+class TestSingleFlightInstall:
+    """Test coalescing of concurrent installs of the same repository."""
+
+    @staticmethod
+    def _blocking_install(repo_manager: RepositoryManager) -> tuple[list, asyncio.Event]:
+        """Replace the install with one that blocks until released."""
+        calls: list[list[str]] = []
+        release = asyncio.Event()
+
+        async def fake_install(repo_url, languages, repo_name, force, path_layout, ref):
+            calls.append(languages)
+            await release.wait()
+            return True
+
+        repo_manager._install_wakewords = fake_install
+        return calls, release
+
+    async def test_identical_requests_share_one_install(self, repo_manager: RepositoryManager) -> None:
+        calls, release = self._blocking_install(repo_manager)
+
+        tasks = [
+            asyncio.create_task(
+                repo_manager.install_wakewords("https://github.com/test/wakewords", ["en"], "test-repo")
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [True, True, True]
+        assert calls == [["en"]]
+
+    async def test_covered_request_joins_running_install(self, repo_manager: RepositoryManager) -> None:
+        calls, release = self._blocking_install(repo_manager)
+
+        first = asyncio.create_task(
+            repo_manager.install_wakewords("https://github.com/test/wakewords", ["en", "de"], "test-repo")
+        )
+        await asyncio.sleep(0)
+        second = asyncio.create_task(
+            repo_manager.install_wakewords("https://github.com/test/wakewords", ["de"], "test-repo")
+        )
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second)
+
+        assert calls == [["de", "en"]]
+
+    async def test_new_languages_are_merged_into_one_follow_up(self, repo_manager: RepositoryManager) -> None:
+        calls, release = self._blocking_install(repo_manager)
+
+        first = asyncio.create_task(
+            repo_manager.install_wakewords("https://github.com/test/wakewords", ["en"], "test-repo")
+        )
+        await asyncio.sleep(0)
+        others = [
+            asyncio.create_task(
+                repo_manager.install_wakewords("https://github.com/test/wakewords", languages, "test-repo")
+            )
+            for languages in (["de"], ["fr", "en"])
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *others)
+
+        assert calls == [["en"], ["de", "en", "fr"]]
+        assert not repo_manager._running_installs
+        assert not repo_manager._queued_installs
+
+    async def test_different_repositories_run_independently(self, repo_manager: RepositoryManager) -> None:
+        calls, release = self._blocking_install(repo_manager)
+
+        tasks = [
+            asyncio.create_task(repo_manager.install_wakewords(url, ["en"], name))
+            for url, name in (
+                ("https://github.com/test/one", "one"),
+                ("https://github.com/test/two", "two"),
+            )
+        ]
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert len(calls) == 2
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_errors_reach_every_caller(self, repo_manager: RepositoryManager) -> None:
+        async def failing_install(*args):
+            await asyncio.sleep(0)
+            raise HomeAssistantError("boom")
+
+        repo_manager._install_wakewords = failing_install
+
+        results = await asyncio.gather(
+            repo_manager.install_wakewords("https://github.com/test/wakewords", ["en"], "test-repo"),
+            repo_manager.install_wakewords("https://github.com/test/wakewords", ["en"], "test-repo"),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, HomeAssistantError) for result in results)
@@ -0,0 +1,76 @@
+"""Tests for the persistent response cache."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.wakeword_installer.response_cache import ResponseCache
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+    """Test ResponseCache."""
+
+    async def test_conditional_headers(self, mock_hass: MagicMock, mock_store: MagicMock) -> None:
+        cache = ResponseCache(mock_hass)
+        await cache.async_load()
+        cache.set("https://api/x", ["en"], etag='"v1"', last_modified="Mon, 01 Jan 2024")
+
+        assert cache.conditional_headers("https://api/x") == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024",
+        }
+        assert cache.conditional_headers("https://api/y") == {}
+        mock_store.async_delay_save.assert_called()
+
+    async def test_loads_persisted_entries(self, mock_hass: MagicMock, mock_store: MagicMock) -> None:
+        mock_store.async_load = AsyncMock(
+            return_value={
+                "entries": {
+                    "https://api/x": {
+                        "data": ["de"],
+                        "etag": '"v1"',
+                        "last_modified": None,
+                        "stored_at": 1e12,
+                    }
+                }
+            }
+        )
+        cache = ResponseCache(mock_hass)
+        await cache.async_load()
+        await cache.async_load()
+
+        assert cache.get("https://api/x")["data"] == ["de"]
+        mock_store.async_load.assert_called_once()
+
+    async def test_expired_entries_are_dropped(self, mock_hass: MagicMock, mock_store: MagicMock) -> None:
+        cache = ResponseCache(mock_hass, ttl=60)
+        await cache.async_load()
+
+        with patch("custom_components.wakeword_installer.response_cache.time.time", return_value=1000):
+            cache.set("https://api/x", ["en"], etag='"v1"')
+        with patch("custom_components.wakeword_installer.response_cache.time.time", return_value=1100):
+            assert cache.get("https://api/x") is None
+
+    async def test_immutable_entries_do_not_expire(self, mock_hass: MagicMock, mock_store: MagicMock) -> None:
+        cache = ResponseCache(mock_hass, ttl=60)
+        await cache.async_load()
+
+        with patch("custom_components.wakeword_installer.response_cache.time.time", return_value=1000):
+            cache.set("https://api/x", ["en"], immutable=True)
+        with patch("custom_components.wakeword_installer.response_cache.time.time", return_value=1e9):
+            assert cache.get("https://api/x")["data"] == ["en"]
+
+    async def test_evicts_least_recently_used(self, mock_hass: MagicMock, mock_store: MagicMock) -> None:
+        cache = ResponseCache(mock_hass, max_entries=2)
+        await cache.async_load()
+
+        cache.set("https://api/a", 1, etag='"a"')
+        cache.set("https://api/b", 2, etag='"b"')
+        cache.touch("https://api/a")
+        cache.set("https://api/c", 3, etag='"c"')
+
+        assert cache.get("https://api/a") is not None
+        assert cache.get("https://api/b") is None
+        assert cache.get("https://api/c") is not None
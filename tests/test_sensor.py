@@ -0,0 +1,112 @@
+"""Tests for the install state sensors."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.wakeword_installer.binary_sensor import (
+    WakewordUpdateAvailableSensor,
+)
+from custom_components.wakeword_installer.install_state import InstallState
+from custom_components.wakeword_installer.sensor import (
+    SENSORS,
+    WakewordInstallSensor,
+)
+
+REPO = {"repo_name": "foo", "repo_url": "https://github.com/t/foo"}
+
+
+@pytest.fixture
+async def repo_manager(mock_hass: MagicMock, mock_store: MagicMock) -> MagicMock:
+    """Create a repository manager with an installed repository."""
+    state = InstallState(mock_hass)
+    await state.async_load()
+    state.set_repository("foo", REPO["repo_url"], "a" * 40, ["en", "de"])
+    state.add_file("foo_en_a.tflite", "foo", "en", "en/a.tflite", 1000, "0" * 64)
+    state.add_file("foo_de_a.tflite", "foo", "de", "de/a.tflite", 500, "1" * 64)
+    manager = MagicMock()
+    manager.install_state = state
+    manager.install_durations = {"foo": 2.5}
+    return manager
+
+
+def _sensors(
+    repo_manager: MagicMock, entry: MagicMock
+) -> dict[str, WakewordInstallSensor]:
+    return {
+        description.key: WakewordInstallSensor(repo_manager, entry, REPO, description)
+        for description in SENSORS
+    }
+
+
+@pytest.mark.asyncio
+class TestInstallSensors:
+    """Test the sensors reading the install state."""
+
+    async def test_values_come_from_install_state(
+        self, repo_manager: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        sensors = _sensors(repo_manager, mock_config_entry)
+
+        assert sensors["models"].native_value == 2
+        assert sensors["languages"].native_value == 2
+        assert sensors["languages"].extra_state_attributes == {
+            "languages": ["de", "en"]
+        }
+        assert sensors["size"].native_value == 1500
+        assert sensors["installed_commit"].native_value == "a" * 7
+        assert sensors["installed_commit"].extra_state_attributes == {
+            "commit": "a" * 40
+        }
+        assert sensors["last_update_duration"].native_value == 2.5
+        assert sensors["models"].unique_id == "test_entry_id_foo_models"
+
+    async def test_values_follow_removals(
+        self, repo_manager: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        sensors = _sensors(repo_manager, mock_config_entry)
+        repo_manager.install_state.remove_file("foo_en_a.tflite")
+        repo_manager.install_state.remove_repository("foo")
+
+        assert sensors["models"].native_value == 1
+        assert sensors["size"].native_value == 500
+        assert sensors["installed_commit"].native_value is None
+
+    async def test_unknown_repository(
+        self, repo_manager: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        repo = {"repo_name": "bar", "repo_url": "https://github.com/t/bar"}
+        sensors = {
+            description.key: WakewordInstallSensor(
+                repo_manager, mock_config_entry, repo, description
+            )
+            for description in SENSORS
+        }
+
+        assert sensors["models"].native_value == 0
+        assert sensors["size"].native_value == 0
+        assert sensors["last_update_duration"].native_value is None
+
+
+@pytest.mark.asyncio
+class TestUpdateAvailableSensor:
+    """Test the update available binary sensor."""
+
+    async def test_compares_latest_with_installed_commit(
+        self, repo_manager: MagicMock, mock_config_entry: MagicMock
+    ) -> None:
+        coordinator = MagicMock()
+        coordinator.repo_manager = repo_manager
+        coordinator.data = {"foo": {"latest_commit": "a" * 40}}
+        sensor = WakewordUpdateAvailableSensor(coordinator, mock_config_entry, REPO)
+
+        assert sensor.is_on is False
+
+        coordinator.data = {"foo": {"latest_commit": "b" * 40}}
+
+        assert sensor.is_on is True
+
+        coordinator.data = {}
+
+        assert sensor.is_on is None
@@ -0,0 +1,148 @@
+"""Tests for local and mirrored repository sources."""
+from __future__ import annotations
+
+import io
+import os
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from custom_components.wakeword_installer.const import DEFAULT_PATH_LAYOUT
+from custom_components.wakeword_installer.layout import PathLayout
+from custom_components.wakeword_installer.sources import (
+    ArchiveReader,
+    fingerprint,
+    has_wrapping_root,
+    list_languages,
+    local_path,
+    mirror_url,
+    source_name,
+)
+
+
+class TestLocalPath:
+    """Test recognizing local sources."""
+
+    @pytest.mark.parametrize(
+        ("repo_url", "expected"),
+        [
+            ("/share/wakewords", Path("/share/wakewords")),
+            ("file:///share/my%20models.zip", Path("/share/my models.zip")),
+            ("https://github.com/test/wakewords", None),
+            ("github.com/test/wakewords", None),
+        ],
+    )
+    def test_local_path(self, repo_url: str, expected: Path | None) -> None:
+        assert local_path(repo_url) == expected
+
+    @pytest.mark.parametrize(
+        ("path", "expected"),
+        [
+            ("/share/wakewords", "wakewords"),
+            ("/share/wakewords.zip", "wakewords"),
+            ("/share/wakewords.tar.gz", "wakewords"),
+        ],
+    )
+    def test_source_name(self, path: str, expected: str) -> None:
+        assert source_name(Path(path)) == expected
+
+
+class TestMirrorUrl:
+    """Test redirecting GitHub URLs to a mirror."""
+
+    def test_rewrites_github_hosts(self) -> None:
+        assert (
+            mirror_url("https://github.com/t/r/archive/HEAD.zip", "http://cache:8080/")
+            == "http://cache:8080/github.com/t/r/archive/HEAD.zip"
+        )
+        assert (
+            mirror_url("https://api.github.com/repos/t/r/contents?ref=v1", "http://cache")
+            == "http://cache/api.github.com/repos/t/r/contents?ref=v1"
+        )
+
+    def test_keeps_other_urls(self) -> None:
+        assert mirror_url("https://example.com/a.zip", "http://cache") == (
+            "https://example.com/a.zip"
+        )
+        assert mirror_url("https://github.com/t/r", None) == "https://github.com/t/r"
+
+
+class TestArchiveReader:
+    """Test reading zip archives and tarballs."""
+
+    def test_tarball_skips_links_and_leading_dot(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "models.tgz"
+            with tarfile.open(archive, "w:gz") as tar:
+                info = tarfile.TarInfo("./en/hey.tflite")
+                info.size = 5
+                tar.addfile(info, io.BytesIO(b"model"))
+                link = tarfile.TarInfo("./en/link.tflite")
+                link.type = tarfile.SYMTYPE
+                link.linkname = "/etc/passwd"
+                tar.addfile(link)
+
+            with ArchiveReader(archive) as reader:
+                assert reader.entries() == [("en/hey.tflite", 5)]
+                with reader.open("en/hey.tflite") as source:
+                    assert source.read() == b"model"
+
+    def test_zip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "models.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("repo-main/en/", b"")
+                zf.writestr("repo-main/en/hey.tflite", b"model")
+
+            with ArchiveReader(archive) as reader:
+                assert reader.entries() == [("repo-main/en/hey.tflite", 5)]
+
+    def test_wrapping_root(self) -> None:
+        layout = PathLayout("{language}/*.tflite")
+        assert has_wrapping_root(
+            ["repo-main/en/a.tflite", "repo-main/de/b.tflite"], layout
+        )
+        assert not has_wrapping_root(["en/a.tflite", "de/b.tflite"], layout)
+        assert not has_wrapping_root(["en/a.tflite", "en/b.tflite"], layout)
+        assert not has_wrapping_root(["repo-main/en/a.tflite", "README.md"], layout)
+
+
+class TestLocalSources:
+    """Test listing and fingerprinting local sources."""
+
+    def test_list_languages_of_archive_with_root(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "models.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("repo-main/en/hey.tflite", b"model")
+                zf.writestr("repo-main/de/hallo.tflite", b"model")
+                zf.writestr("repo-main/README.md", b"readme")
+
+            assert list_languages(archive, PathLayout(DEFAULT_PATH_LAYOUT)) == ["de", "en"]
+
+    def test_list_languages_of_single_language_archive(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            archive = Path(tmpdir) / "models.zip"
+            with zipfile.ZipFile(archive, "w") as zf:
+                zf.writestr("en/a.tflite", b"model")
+                zf.writestr("en/b.tflite", b"model")
+
+            assert list_languages(archive, PathLayout(DEFAULT_PATH_LAYOUT)) == ["en"]
+
+    def test_fingerprint_follows_models(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "en").mkdir()
+            model = root / "en" / "hey.tflite"
+            model.write_bytes(b"model")
+            first = fingerprint(root)
+
+            (root / "README.md").write_bytes(b"readme")
+            assert fingerprint(root) == first
+
+            model.write_bytes(b"changed")
+            os.utime(model, ns=(0, 0))
+            assert fingerprint(root) != first
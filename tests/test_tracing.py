@@ -0,0 +1,81 @@
+"""Tests for operation traces."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.wakeword_installer import tracing
+from custom_components.wakeword_installer.tracing import TraceRecorder
+from custom_components.wakeword_installer.worker_pool import WorkerPool
+
+
+class TestTraceRecorder:
+    """Test recording traces."""
+
+    def test_records_phases_and_counters(self) -> None:
+        recorder = TraceRecorder()
+
+        with recorder.trace("install", "repo"):
+            with tracing.phase("download"):
+                pass
+            with tracing.phase("download"):
+                pass
+            tracing.count("bytes_downloaded", 100)
+            tracing.count("retries")
+
+        trace = recorder.as_list()[0]
+        assert trace["operation"] == "install"
+        assert trace["repository"] == "repo"
+        assert trace["duration"] >= trace["phases"]["download"] >= 0
+        assert trace["counters"] == {"bytes_downloaded": 100, "retries": 1}
+
+    def test_without_trace_nothing_is_recorded(self) -> None:
+        recorder = TraceRecorder()
+
+        with tracing.phase("download"):
+            tracing.count("retries")
+
+        assert recorder.as_list() == []
+
+    def test_records_errors(self) -> None:
+        recorder = TraceRecorder()
+
+        with pytest.raises(OSError), recorder.trace("remove"):
+            raise OSError("permission denied")
+
+        assert recorder.as_list()[0]["error"] == "permission denied"
+
+    def test_keeps_most_recent_traces(self) -> None:
+        recorder = TraceRecorder(history=3)
+        for index in range(5):
+            with recorder.trace("install", "repo%d" % index):
+                pass
+
+        assert [trace["repository"] for trace in recorder.as_list()] == [
+            "repo4",
+            "repo3",
+            "repo2",
+        ]
+        assert len(recorder.as_list(limit=1)) == 1
+
+
+@pytest.mark.asyncio
+class TestTraceContext:
+    """Test that traces follow work onto worker threads."""
+
+    async def test_worker_jobs_add_to_current_trace(self) -> None:
+        recorder = TraceRecorder()
+        pool = WorkerPool(1)
+
+        def _job() -> None:
+            with tracing.phase("decompress"):
+                tracing.count("files_installed")
+
+        try:
+            with recorder.trace("install"):
+                await pool.async_run(_job)
+        finally:
+            pool.shutdown()
+
+        trace = recorder.as_list()[0]
+        assert "decompress" in trace["phases"]
+        assert trace["counters"] == {"files_installed": 1}
@@ -0,0 +1,70 @@
+"""Tests for the integration's worker pool."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from custom_components.wakeword_installer.worker_pool import (
+    THREAD_NAME_PREFIX,
+    WorkerPool,
+)
+
+
+@pytest.mark.asyncio
+class TestWorkerPool:
+    """Test running jobs on the worker pool."""
+
+    async def test_runs_jobs_on_own_threads(self) -> None:
+        pool = WorkerPool(2)
+        try:
+            name = await pool.async_run(lambda: threading.current_thread().name)
+        finally:
+            pool.shutdown()
+
+        assert name.startswith(THREAD_NAME_PREFIX)
+
+    async def test_records_time_waiting_for_a_worker(self) -> None:
+        pool = WorkerPool(1)
+        try:
+            await asyncio.gather(
+                pool.async_run(time.sleep, 0.05), pool.async_run(time.sleep, 0.05)
+            )
+        finally:
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert stats.workers == 1
+        assert stats.queued == stats.running == 0
+        assert stats.completed == 2
+        assert stats.wait_seconds_max >= 0.04
+        assert stats.wait_seconds_mean == stats.wait_seconds_total / 2
+
+    async def test_errors_are_raised_and_counted(self) -> None:
+        pool = WorkerPool(1)
+
+        def _fail() -> None:
+            raise OSError("disk full")
+
+        try:
+            with pytest.raises(OSError):
+                await pool.async_run(_fail)
+        finally:
+            pool.shutdown()
+
+        assert pool.stats().completed == 1
+
+    async def test_resize_and_reuse_after_shutdown(self) -> None:
+        pool = WorkerPool(1)
+        await pool.async_run(time.sleep, 0)
+        pool.set_max_workers(3)
+
+        try:
+            assert await pool.async_run(sum, [1, 2]) == 3
+        finally:
+            pool.shutdown()
+
+        assert pool.max_workers == 3
+        assert pool.stats().completed == 2